@@ -0,0 +1,195 @@
+"""Convert many Figma files in one process, sharing connections, caches and worker pools.
+
+Usage: python batch.py manifest.json [--token TOKEN] [--jobs 4] [--requests 16] [--report report.json]
+
+The manifest is a JSON list of jobs, or an object with "token", "defaults" and "jobs":
+
+    {"token": "...", "defaults": {"target": "react", "theme": "lean"},
+     "jobs": [{"file": "<url or id>", "output": "out/home"},
+              {"file": "<url or id>", "output": "out/admin", "target": "tk-layout"}]}
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import core
+from tkforge import convert_figma_to_react, convert_figma_to_static, convert_figma_to_tk
+from themes import DEFAULT_THEME
+from progress import Progress, ProgressState
+from prune import PRUNE_RULES
+from session import SharedTransport
+from utils import extract_figma_id
+
+TARGETS = ('react', 'static', 'tk', 'tk-layout')
+
+class JobOutput(io.TextIOBase):
+    """Stand-in for sys.stdout that keeps each job's messages apart
+
+    Text written in the context of a job that registered a buffer goes to that buffer,
+    anything else to the real stream. The buffer is held in a context variable, so the
+    worker threads the pipeline starts with a copy of the job's context write to it too.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._buffer = contextvars.ContextVar('job_output', default=None)
+
+    def capture(self, buffer):
+        self._buffer.set(buffer)
+
+    def write(self, text):
+        return (self._buffer.get() or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+def load_manifest(path: str, token: str = None) -> List[Dict[str, Any]]:
+    """Jobs of a manifest with defaults applied, raising ValueError on invalid entries"""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        manifest = {'jobs': manifest}
+
+    defaults = {'target': 'react', 'theme': DEFAULT_THEME, **manifest.get('defaults', {})}
+    token = token or manifest.get('token') or os.environ.get('FIGMA_TOKEN')
+    jobs = []
+
+    for index, entry in enumerate(manifest.get('jobs', [])):
+        job = {**defaults, **entry}
+        job.setdefault('token', token)
+        if not job.get('file'):
+            raise ValueError(f"Job {index} has no 'file'")
+        if not job.get('token'):
+            raise ValueError(f"Job {index} has no token, pass --token or set FIGMA_TOKEN")
+        if job['target'] not in TARGETS:
+            raise ValueError(f"Job {index} has unknown target '{job['target']}', expected one of: {', '.join(TARGETS)}")
+        if set(job.get('keep', ())) - set(PRUNE_RULES):
+            raise ValueError(f"Job {index} keeps an unknown pruning rule, expected some of: {', '.join(PRUNE_RULES)}")
+        job['file'] = extract_figma_id(job['file'])
+        job.setdefault('output', os.path.join('batch', f"{job['file']}-{job['target']}"))
+        jobs.append(job)
+
+    return jobs
+
+def run_job(job: Dict[str, Any], output: JobOutput, executor=None) -> Dict[str, Any]:
+    """Convert one manifest entry and return its report row"""
+    log = io.StringIO()
+    output.capture(log)
+    progress = Progress()
+    start = time.perf_counter()
+
+    try:
+        if job['target'] == 'react':
+            ok = convert_figma_to_react(job['file'], job['token'], job['output'], job.get('routes', False),
+                                        job.get('virtualize', False), job['theme'], progress, fonts_dir=job.get('fonts_dir'),
+                                        keep=job.get('keep', ()), workers=job.get('workers'))
+        elif job['target'] == 'static':
+            ok = convert_figma_to_static(job['file'], job['token'], job['output'], job['theme'], progress,
+                                         fonts_dir=job.get('fonts_dir'), keep=job.get('keep', ()))
+        else:
+            ok = convert_figma_to_tk(job['file'], job['token'], job['output'], job['target'] == 'tk-layout',
+                                     job.get('workers'), progress, executor=executor, keep=job.get('keep', ()))
+    except Exception as e:
+        print(f"Error converting {job['file']}: {str(e)}")
+        ok = False
+    finally:
+        output.capture(None)
+
+    state = ProgressState()
+    while not progress.events.empty():
+        state.update(progress.events.get_nowait())
+
+    row = {
+        'file': job['file'],
+        'target': job['target'],
+        'output': os.path.abspath(job['output']),
+        'ok': bool(ok),
+        'seconds': round(time.perf_counter() - start, 3),
+        'frames': state.frames,
+        'images': state.images,
+        'files_written': state.files,
+        'pruned': state.pruned,
+        'bytes': state.bytes
+    }
+    if not ok:
+        row['log'] = log.getvalue().strip().splitlines()[-20:]
+    return row
+
+def run_batch(jobs: List[Dict[str, Any]], concurrency: int = 4, max_requests: int = 16, workers: int = None) -> Dict[str, Any]:
+    """Run the jobs `concurrency` at a time over one shared transport and Tk process pool"""
+    transport = SharedTransport(max_requests=max_requests)
+    previous, core.transport = core.transport, transport
+    output = JobOutput(sys.stdout)
+    sys.stdout = output
+
+    tk_jobs = any(job['target'] in ('tk', 'tk-layout') for job in jobs)
+    executor = ProcessPoolExecutor(max_workers=workers) if tk_jobs else None
+    start = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            rows = list(pool.map(lambda job: run_job(job, output, executor), jobs))
+    finally:
+        sys.stdout = output.stream
+        core.transport = previous
+        transport.close()
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        'seconds': round(time.perf_counter() - start, 3),
+        'jobs': len(rows),
+        'ok': sum(row['ok'] for row in rows),
+        'failed': sum(not row['ok'] for row in rows),
+        'cache': {'hits': transport.cache.hits, 'misses': transport.cache.misses, 'bytes': transport.cache.bytes},
+        'files': rows
+    }
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'file':<28} {'target':<10} {'status':<7} {'seconds':>8} {'frames':>7} {'images':>7} {'MB':>8}")
+    for row in report['files']:
+        status = 'ok' if row['ok'] else 'FAILED'
+        print(f"{row['file'][:28]:<28} {row['target']:<10} {status:<7} {row['seconds']:>8.2f} {row['frames']:>7} {row['images']:>7} {row['bytes'] / 1e6:>8.1f}")
+    cache = report['cache']
+    print(f"\n{report['ok']}/{report['jobs']} converted in {report['seconds']:.1f}s, "
+          f"{report['failed']} failed, cache {cache['hits']} hits / {cache['misses']} misses")
+    for row in report['files']:
+        if not row['ok']:
+            print(f"\n❌ {row['file']} ({row['target']}):")
+            print('\n'.join(f"   {line}" for line in row.get('log', [])))
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Convert every Figma file listed in a manifest")
+    parser.add_argument("manifest", help="JSON manifest of jobs")
+    parser.add_argument("--token", default=None, help="Figma access token for jobs without one, defaults to FIGMA_TOKEN")
+    parser.add_argument("--jobs", type=int, default=4, help="Files converted concurrently")
+    parser.add_argument("--requests", type=int, default=16, help="Figma API and image requests in flight across all files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes shared by all Tk jobs, defaults to the CPU count")
+    parser.add_argument("--report", metavar="REPORT_JSON", default=None, help="Also write the summary report as JSON")
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.manifest, args.token)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {str(e)}")
+        sys.exit(2)
+
+    report = run_batch(jobs, args.jobs, args.requests, args.workers)
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to: {os.path.abspath(args.report)}")
+
+    sys.exit(0 if report['failed'] == 0 else 1)
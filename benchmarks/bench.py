@@ -0,0 +1,169 @@
+"""Benchmark suite for the conversion pipeline against a local Figma API stub.
+
+Runs core.parse_file, react.react_code, tk.tk_code and ReactGenerator.generate on a
+synthetic document, reports nodes/s and peak memory, and compares them with the
+baselines in benchmarks/baseline.json.
+
+A run without a baseline recorded for the same configuration fails, so a
+regression gate can never pass by comparing against nothing; --no-compare only
+reports the numbers.
+
+Usage: python benchmarks/bench.py [--frames 4] [--nodes 500] [--update-baseline | --no-compare] [--threshold 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import core
+from react import react_code
+from tk import tk_code
+from react_generator.generator import ReactGenerator
+from synthetic import synthetic_document, count_nodes
+from stub_server import StubServer
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+FILE_KEY = 'synthetic'
+
+def cases(parsed):
+    """Benchmark name -> callable taking a fresh output folder"""
+    return {
+        'parse_file': lambda out: core.parse_file(FILE_KEY, 'token', True, out),
+        'react_code': lambda out: react_code(parsed, os.path.join(out, 'reactapp')),
+        'tk_code': lambda out: tk_code(FILE_KEY, 'token', out, workers=1),
+        'react_generator': lambda out: ReactGenerator(out).generate(parsed)
+    }
+
+def measure(func, repeat):
+    """Best wall time over `repeat` runs, then peak traced memory from one extra run"""
+    best = float('inf')
+    for _ in range(repeat):
+        out = tempfile.mkdtemp(prefix='tkforge-bench-')
+        try:
+            start = time.perf_counter()
+            func(out)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            shutil.rmtree(out, ignore_errors=True)
+
+    # tracemalloc slows everything down, so memory gets its own pass
+    out = tempfile.mkdtemp(prefix='tkforge-bench-')
+    tracemalloc.start()
+    try:
+        func(out)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(out, ignore_errors=True)
+
+    return best, peak
+
+def load_baseline():
+    if not os.path.exists(BASELINE):
+        return {}
+    with open(BASELINE, encoding='utf-8') as f:
+        return json.load(f)
+
+def regressions(name, result, baseline, threshold):
+    """Messages for every metric worse than its baseline by more than `threshold`"""
+    messages = []
+    if result['nodes_per_s'] < baseline['nodes_per_s'] * (1 - threshold):
+        messages.append(f"{name}: {result['nodes_per_s']:,.0f} nodes/s vs baseline {baseline['nodes_per_s']:,.0f}")
+    # Ignore growth below 1 MB, small peaks are mostly noise
+    if result['peak_mb'] > max(baseline['peak_mb'], 1.0) * (1 + threshold):
+        messages.append(f"{name}: peak {result['peak_mb']:.1f} MB vs baseline {baseline['peak_mb']:.1f} MB")
+    return messages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=4)
+    parser.add_argument('--nodes', type=int, default=500)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--images', type=float, default=0.02, help='Share of nodes that are images')
+    parser.add_argument('--components', type=int, default=0, help='Figma components in the document')
+    parser.add_argument('--instances', type=float, default=0.0, help='Share of nodes that are instances of them')
+    parser.add_argument('--hidden', type=float, default=0.0, help='Share of layers that are invisible')
+    parser.add_argument('--api-latency', type=float, default=0.0, help='Seconds added to each API request')
+    parser.add_argument('--cdn-latency', type=float, default=0.0, help='Seconds added to each image download')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='Run only these benchmarks')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown or memory growth, as a fraction')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--no-compare', action='store_true', help='Only report, without a baseline to compare with')
+    args = parser.parse_args()
+
+    document = synthetic_document(args.frames, args.nodes, args.depth, args.images,
+                                  components=args.components, instances=args.instances, hidden=args.hidden)
+    nodes = count_nodes(document)
+    config = {'frames': args.frames, 'nodes': args.nodes, 'depth': args.depth, 'images': args.images,
+              'components': args.components, 'instances': args.instances, 'hidden': args.hidden,
+              'api_latency': args.api_latency, 'cdn_latency': args.cdn_latency}
+
+    baseline = load_baseline()
+    missing = None
+    if not baseline:
+        missing = f"No baseline in {BASELINE}"
+    elif baseline.get('config') != config:
+        missing = f"Baseline was recorded with {baseline.get('config')}, not {config}"
+    if missing and not args.update_baseline:
+        baseline = {}
+
+    results = {}
+    failures = []
+
+    with StubServer({FILE_KEY: document}, args.api_latency, args.cdn_latency) as server:
+        core.FIGMA_API = server.url
+        parsed = core.parse_file(FILE_KEY, 'token', False)
+        if not parsed:
+            print("Could not parse the synthetic document")
+            sys.exit(1)
+
+        print(f"{args.frames} frames, {nodes:,} nodes")
+        print(f"{'benchmark':<16} {'seconds':>9} {'nodes/s':>12} {'peak MB':>9} {'vs base':>8}")
+
+        for name, func in cases(parsed).items():
+            if args.only and name not in args.only:
+                continue
+            seconds, peak = measure(func, args.repeat)
+            results[name] = {'seconds': round(seconds, 4), 'nodes_per_s': round(nodes / seconds, 1), 'peak_mb': round(peak / 1e6, 2)}
+
+            previous = baseline.get('results', {}).get(name)
+            change = f"{results[name]['nodes_per_s'] / previous['nodes_per_s']:>7.2f}x" if previous else f"{'-':>8}"
+            print(f"{name:<16} {seconds:>9.3f} {nodes / seconds:>12,.0f} {peak / 1e6:>9.2f} {change}")
+
+            if previous:
+                failures.extend(regressions(name, results[name], previous, args.threshold))
+            elif not missing:
+                failures.append(f"{name}: no baseline")
+
+    if args.update_baseline:
+        merged = baseline.get('results', {}) if baseline else {}
+        merged.update(results)
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': merged}, f, indent=2)
+        print(f"Baseline written to {BASELINE}")
+        return
+
+    if args.no_compare:
+        return
+
+    if missing:
+        print(f"\n{missing}, nothing to compare with. Record one with --update-baseline, or pass --no-compare")
+        sys.exit(1)
+
+    if failures:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        print('\n'.join(f"  {message}" for message in failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
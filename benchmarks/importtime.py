@@ -0,0 +1,84 @@
+"""Startup cost of the CLI: import time per module and time to first output.
+
+Runs `python -X importtime tkforge.py --help` in fresh interpreters and reports the
+slowest imports plus the wall time until the first byte of output. With --compare REF
+the same is measured on a git revision of the repo, e.g. --compare HEAD~1.
+
+Usage: python benchmarks/importtime.py [--runs 5] [--compare REF] [--script gui.py]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def first_output(folder, script, args):
+    """Seconds from spawning the interpreter to its first byte of stdout"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script] + args, cwd=folder, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - start
+    process.communicate()
+    return elapsed
+
+def import_times(folder, script, args):
+    """Cumulative import time per top-level module, in seconds"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', script] + args, cwd=folder,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented, keep the modules imported by the script itself
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+def measure(folder, script, args, runs):
+    firsts = [first_output(folder, script, args) for _ in range(runs)]
+    imports = import_times(folder, script, args)
+    return statistics.median(firsts), imports
+
+def checkout(ref):
+    """Export a git revision of the repo into a temporary folder"""
+    folder = tempfile.mkdtemp(prefix='tkforge-importtime-')
+    archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, stdout=subprocess.PIPE, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', folder], input=archive, check=True)
+    return folder
+
+def report(label, first, imports, top):
+    print(f"{label}: first output after {first * 1000:.1f} ms, imports {sum(imports.values()) * 1000:.1f} ms")
+    for name, seconds in sorted(imports.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<28} {seconds * 1000:>8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default='tkforge.py')
+    parser.add_argument('--args', nargs='*', default=['--help'], help='Arguments passed to the script')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list')
+    parser.add_argument('--compare', metavar='REF', default=None, help='Also measure this git revision')
+    args = parser.parse_args()
+
+    first, imports = measure(ROOT, args.script, args.args, args.runs)
+    report('working tree', first, imports, args.top)
+
+    if args.compare:
+        folder = checkout(args.compare)
+        try:
+            before, before_imports = measure(folder, args.script, args.args, args.runs)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        print()
+        report(args.compare, before, before_imports, args.top)
+        print(f"\nfirst output {before * 1000:.1f} ms -> {first * 1000:.1f} ms ({before / first:.2f}x)")
+
+if __name__ == '__main__':
+    main()
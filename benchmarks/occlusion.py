@@ -0,0 +1,123 @@
+"""Occlusion culling and stacking on large frames: grid index against pairwise checks.
+
+Builds frames of N random sibling layers, a share of them opaque, and times
+spatial.cull and spatial.stacking. Up to --pairwise-limit nodes the same work is
+also done with plain O(n^2) loops, to check the results match and show the gap.
+Before timing, a nested group is parsed to check its z-indexes stay inside it.
+
+Usage: python benchmarks/occlusion.py [--sizes 1000 5000 10000 50000] [--opaque 0.3]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial import bounds, contains, intersects, is_opaque, painted_bounds, cull, stacking
+
+FRAME_WIDTH = 1440
+
+def synthetic_layers(count, opaque, seed=0):
+    """Random sibling layers on a frame tall enough to keep the density of a real page"""
+    rng = random.Random(seed)
+    height = max(4000, count * 12)
+    layers = []
+
+    for n in range(count):
+        width, tall = rng.randint(8, 320), rng.randint(8, 240)
+        box = {'x': rng.randint(0, FRAME_WIDTH - width), 'y': rng.randint(-100, height), 'width': width, 'height': tall}
+        alpha = 1 if rng.random() < opaque else 0.5
+        layers.append({
+            'id': f'{n}:1',
+            'type': rng.choice(['RECTANGLE', 'FRAME', 'TEXT']),
+            'absoluteBoundingBox': box,
+            'fills': [{'type': 'SOLID', 'color': {'r': 0, 'g': 0, 'b': 0, 'a': alpha}}]
+        })
+
+    return layers, (0, 0, FRAME_WIDTH, height)
+
+def pairwise_cull(children, clip):
+    kept = []
+    occluders = []
+    for node in reversed(children):
+        box = painted_bounds(node)
+        if not intersects(clip, box) or any(contains(other, box) for other in occluders):
+            continue
+        kept.append(node)
+        if is_opaque(node):
+            occluders.append(bounds(node))
+    kept.reverse()
+    return kept
+
+def pairwise_stacking(boxes):
+    levels = []
+    for j, box in enumerate(boxes):
+        levels.append(max((levels[i] for i in range(j) if intersects(boxes[i], box)), default=-1) + 1)
+    return levels
+
+def layer(id, x, y, width, height, children=None):
+    node = {'id': id, 'name': f'box {id}', 'type': 'FRAME' if children else 'RECTANGLE',
+            'absoluteBoundingBox': {'x': x, 'y': y, 'width': width, 'height': height},
+            'fills': [{'type': 'SOLID', 'color': {'r': 0, 'g': 0, 'b': 0, 'a': 0.5}}]}
+    if children:
+        node['children'] = children
+    return node
+
+def check_nested_stacking():
+    """Group A holds a chain of overlapping children and its sibling B is painted over it.
+    The children get z-indexes, so A must isolate them or c2 would paint above B."""
+    import core
+    from stub_server import StubServer
+
+    group = layer('a', 0, 0, 300, 100, [layer('c0', 0, 0, 100, 100), layer('c1', 50, 0, 100, 100), layer('c2', 100, 0, 100, 100)])
+    frame = {'id': 'f', 'name': 'Frame', 'type': 'FRAME', 'absoluteBoundingBox': {'x': 0, 'y': 0, 'width': 400, 'height': 200},
+             'children': [group, layer('b', 0, 0, 300, 100)]}
+    document = {'name': 'Nested', 'components': {},
+                'document': {'id': '0:0', 'type': 'DOCUMENT', 'children': [{'id': '0:1', 'type': 'CANVAS', 'children': [frame]}]}}
+
+    with StubServer({'nested': document}) as server:
+        core.FIGMA_API = server.url
+        a, b = core.parse_file('nested', 'token', download_images=False, keep=('occluded',))[0].components
+    assert [child.style.get('zIndex') for child in a.children] == [None, 1, 2], 'nested children not stacked'
+    assert b.style.get('zIndex') == 1 and a.style.get('zIndex') is None, 'siblings not stacked'
+    assert a.style.get('isolation') == 'isolate', 'nested z-indexes leak out of their group'
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 50000])
+    parser.add_argument('--opaque', type=float, default=0.3, help='Share of layers that hide what is below them')
+    parser.add_argument('--pairwise-limit', type=int, default=5000, help='Largest frame also run with pairwise checks')
+    args = parser.parse_args()
+
+    check_nested_stacking()
+    print(f"{'nodes':>7} {'culled':>7} {'overlap':>8} {'cull ms':>9} {'stack ms':>9} {'pairwise ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        layers, clip = synthetic_layers(size, args.opaque)
+        (kept, dropped), cull_time = timed(cull, layers, clip)
+        boxes = [bounds(node) for node in kept]
+        levels, stack_time = timed(stacking, boxes)
+
+        pairwise = '-'
+        speedup = '-'
+        if size <= args.pairwise_limit:
+            naive_kept, naive_cull = timed(pairwise_cull, layers, clip)
+            naive_levels, naive_stack = timed(pairwise_stacking, boxes)
+            assert [node['id'] for node in naive_kept] == [node['id'] for node in kept], 'culling differs'
+            assert naive_levels == levels, 'stacking differs'
+            pairwise = f'{(naive_cull + naive_stack) * 1000:.1f}'
+            speedup = f'{(naive_cull + naive_stack) / (cull_time + stack_time):.1f}x'
+
+        overlapping = sum(1 for level in levels if level)
+        print(f"{size:>7} {sum(map(len, dropped.values())):>7} {overlapping:>8} {cull_time * 1000:>9.1f} "
+              f"{stack_time * 1000:>9.1f} {pairwise:>12} {speedup:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Local stand-in for the Figma REST API and its image CDN.
+
+Serves GET /v1/files/<key>, GET /v1/files/<key>/images, GET /v1/images/<key>?ids=...&scale=...
+and GET /cdn/<id>.png with a configurable delay per request. Point the pipeline at
+it with FIGMA_API_URL=<server.url> or by setting core.FIGMA_API.
+"""
+
+import gzip
+import json
+import time
+import zlib
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from typing import Any, Dict
+
+def png(width: int = 1, height: int = 1) -> bytes:
+    """A valid, blank RGBA PNG of the given size"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    rows = b''.join(b'\x00' + b'\x00' * width * 4 for _ in range(height))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(rows))
+        + chunk(b'IEND', b'')
+    )
+
+def image_refs(document: Dict[str, Any]) -> set:
+    """imageRefs of every image fill in a document"""
+    refs = set()
+    pending = [document.get('document', {})]
+    while pending:
+        node = pending.pop()
+        refs.update(fill['imageRef'] for fill in node.get('fills', []) if fill.get('imageRef'))
+        pending.extend(node.get('children', []))
+    return refs
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body: bytes, content_type: str, status: int = 200, encoding: str = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        server.requests += 1
+
+        if parts[:2] == ['v1', 'files'] and len(parts) == 3:
+            time.sleep(server.api_latency)
+            document = server.files.get(parts[2])
+            if document is None:
+                return self.send_body(b'{"status":404,"err":"Not found"}', 'application/json', 404)
+            # Gzipped like the real API when the client accepts it
+            compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+            return self.send_body(server.encoded(parts[2], document, compress), 'application/json', encoding='gzip' if compress else None)
+
+        if parts[:2] == ['v1', 'files'] and parts[3:] == ['images']:
+            time.sleep(server.api_latency)
+            document = server.files.get(parts[2])
+            if document is None:
+                return self.send_body(b'{"status":404,"err":"Not found"}', 'application/json', 404)
+            images = {ref: f"{server.url}/cdn/{quote(ref, safe='')}" for ref in image_refs(document)}
+            return self.send_body(json.dumps({'error': False, 'status': 200, 'meta': {'images': images}}).encode(), 'application/json')
+
+        if parts[:2] == ['v1', 'images'] and len(parts) == 3:
+            time.sleep(server.api_latency)
+            query = parse_qs(url.query)
+            ids = query.get('ids', [''])[0].split(',')
+            scale = query.get('scale', ['1'])[0]
+            images = {i: f"{server.url}/cdn/{quote(i, safe='')}@{scale}.png" for i in ids if i}
+            return self.send_body(json.dumps({'err': None, 'images': images}).encode(), 'application/json')
+
+        if parts[0] == 'cdn' and len(parts) == 2:
+            time.sleep(server.cdn_latency)
+            server.images.add(unquote(parts[1]))
+            return self.send_body(server.image, 'image/png')
+
+        self.send_body(b'{"status":404,"err":"Not found"}', 'application/json', 404)
+
+class StubServer(ThreadingHTTPServer):
+    """Figma API stub on an ephemeral localhost port, usable as a context manager
+
+    `files` maps file keys to GET /v1/files responses; latencies are in seconds.
+    """
+    daemon_threads = True
+
+    def __init__(self, files: Dict[str, Any], api_latency: float = 0.0, cdn_latency: float = 0.0, image_size: int = 64):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.files = files
+        self.api_latency = api_latency
+        self.cdn_latency = cdn_latency
+        self.image = png(image_size, image_size)
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+        self.requests = 0
+        self.images = set()
+        self._encoded = {}
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def encoded(self, key: str, document: Dict[str, Any], compress: bool = False) -> bytes:
+        """Serialise (and compress) each document once so the stub does not dominate the timings"""
+        if (key, compress) not in self._encoded:
+            body = json.dumps(document).encode()
+            self._encoded[key, compress] = gzip.compress(body, 6) if compress else body
+        return self._encoded[key, compress]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
+
+if __name__ == '__main__':
+    import argparse
+    from synthetic import synthetic_document
+
+    parser = argparse.ArgumentParser(description='Serve a synthetic Figma file on localhost')
+    parser.add_argument('--frames', type=int, default=4)
+    parser.add_argument('--nodes', type=int, default=500)
+    parser.add_argument('--api-latency', type=float, default=0.05)
+    parser.add_argument('--cdn-latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    with StubServer({'synthetic': synthetic_document(args.frames, args.nodes)}, args.api_latency, args.cdn_latency) as server:
+        print(f"FIGMA_API_URL={server.url}  file key: synthetic  (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
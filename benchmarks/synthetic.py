@@ -0,0 +1,155 @@
+"""Synthetic Figma documents of configurable size for benchmarks."""
+
+import copy
+import random
+from typing import Any, Dict, List
+
+# Layer names follow the "<type> <label>" convention core.parse_frame maps to elements
+KINDS = {
+    'rectangle': 'RECTANGLE',
+    'oval': 'ELLIPSE',
+    'text': 'TEXT',
+    'heading': 'TEXT',
+    'button': 'RECTANGLE',
+    'textbox': 'RECTANGLE',
+    'line': 'LINE',
+    'group': 'FRAME'
+}
+
+def color(rng: random.Random, alpha: float = 1) -> Dict[str, float]:
+    return {'r': rng.random(), 'g': rng.random(), 'b': rng.random(), 'a': alpha}
+
+def effect(rng: random.Random) -> Dict[str, Any]:
+    kind = rng.choice(['DROP_SHADOW', 'INNER_SHADOW', 'LAYER_BLUR', 'BACKGROUND_BLUR'])
+    data = {'type': kind, 'visible': True, 'radius': rng.randint(1, 20)}
+    if kind.endswith('SHADOW'):
+        data.update({'color': color(rng, 0.25), 'offset': {'x': rng.randint(-8, 8), 'y': rng.randint(-8, 8)}})
+    return data
+
+def synthetic_instance(rng: random.Random, ids, master: Dict[str, Any], x, y) -> Dict[str, Any]:
+    """A copy of a component master moved to (x, y), overriding some of its text"""
+    node = copy.deepcopy(master)
+    dx, dy = x - master['absoluteBoundingBox']['x'], y - master['absoluteBoundingBox']['y']
+    stack = [node]
+    while stack:
+        layer = stack.pop()
+        layer['id'] = f'I{next(ids)}:1'
+        layer['absoluteBoundingBox'] = {**layer['absoluteBoundingBox'], 'x': layer['absoluteBoundingBox']['x'] + dx,
+                                        'y': layer['absoluteBoundingBox']['y'] + dy}
+        if 'characters' in layer and rng.random() < 0.5:
+            layer['characters'] = rng.choice(['Buy now', 'Learn more', 'Sign up', 'Continue'])
+        stack.extend(layer.get('children', []))
+    node.update({'type': 'INSTANCE', 'componentId': master['id']})
+    return node
+
+def synthetic_node(rng: random.Random, ids, x, y, width, height, depth, options) -> Dict[str, Any]:
+    """One node, with children when it is a group and depth remains"""
+    if options['masters'] and rng.random() < options['instances']:
+        master = rng.choice(options['masters'])
+        bounds = master['absoluteBoundingBox']
+        return synthetic_instance(rng, ids, master, x + rng.randint(0, max(0, width - bounds['width'])),
+                                  y + rng.randint(0, max(0, height - bounds['height'])))
+
+    kind = 'image' if rng.random() < options['images'] else rng.choice(list(KINDS))
+    if kind == 'group' and depth <= 1:
+        kind = 'rectangle'
+
+    w = rng.randint(8, max(8, width // 2))
+    h = rng.randint(8, max(8, height // 4))
+    left = x + rng.randint(0, max(0, width - w))
+    top = y + rng.randint(0, max(0, height - h))
+
+    node = {
+        'id': f'{next(ids)}:1',
+        'name': f'{kind} {rng.choice(["hero", "card", "title", "icon", "cta", ""])}'.strip(),
+        'type': KINDS.get(kind, 'RECTANGLE'),
+        'visible': True,
+        'absoluteBoundingBox': {'x': left, 'y': top, 'width': w, 'height': h},
+        'constraints': {'horizontal': 'LEFT', 'vertical': 'TOP'},
+        'fills': [{'type': 'SOLID', 'color': color(rng)}],
+        'strokes': [],
+        'effects': []
+    }
+
+    if kind == 'image':
+        node['fills'] = [{'type': 'IMAGE', 'scaleMode': 'FILL', 'imageRef': f'ref{rng.randint(0, options["image_refs"])}'}]
+    if rng.random() < options['effects']:
+        node['effects'] = [effect(rng)]
+    if options['hidden'] and rng.random() < options['hidden']:
+        node['visible'] = False
+    if rng.random() < 0.2:
+        node['strokes'] = [{'type': 'SOLID', 'color': color(rng)}]
+        node['strokeWeight'] = rng.randint(1, 4)
+    if rng.random() < 0.3:
+        node['cornerRadius'] = rng.randint(2, 16)
+    if node['type'] == 'TEXT':
+        node['characters'] = ' '.join(rng.choice(['Lorem', 'ipsum', 'dolor', 'sit', 'amet']) for _ in range(rng.randint(1, 12)))
+        node['style'] = {'fontFamily': rng.choice(['Inter', 'Roboto']), 'fontWeight': rng.choice([400, 600, 700]), 'fontSize': rng.randint(12, 48)}
+    if kind == 'group':
+        if rng.random() < 0.5:
+            node.update({'layoutMode': rng.choice(['HORIZONTAL', 'VERTICAL']), 'itemSpacing': rng.randint(0, 24),
+                         'paddingLeft': 8, 'paddingRight': 8, 'paddingTop': 8, 'paddingBottom': 8})
+        node['children'] = [
+            synthetic_node(rng, ids, left, top, w, h, depth - 1, options)
+            for _ in range(rng.randint(1, options['fanout']))
+        ]
+
+    return node
+
+def synthetic_masters(rng: random.Random, ids, count: int, options) -> List[Dict[str, Any]]:
+    """Component masters: small groups of layers, as a design system button or card would be"""
+    masters = []
+    for _ in range(count):
+        leaves = {**options, 'images': 0, 'masters': []}
+        master = synthetic_node(rng, ids, 0, 0, 320, 640, 1, leaves)
+        bounds = master['absoluteBoundingBox']
+        master.update({
+            'type': 'COMPONENT',
+            'name': f"group {rng.choice(['button', 'card', 'badge', 'chip'])}",
+            'layoutMode': 'HORIZONTAL', 'itemSpacing': 8, 'counterAxisAlignItems': 'CENTER',
+            'paddingLeft': 12, 'paddingRight': 12, 'paddingTop': 8, 'paddingBottom': 8,
+            'children': [synthetic_node(rng, ids, bounds['x'], bounds['y'], bounds['width'], bounds['height'], 1, leaves)
+                         for _ in range(rng.randint(2, max(2, options['fanout'])))]
+        })
+        master.pop('characters', None)
+        master.pop('style', None)
+        masters.append(master)
+    return masters
+
+def synthetic_document(frames: int = 4, nodes: int = 500, depth: int = 2, images: float = 0.05,
+                       effects: float = 0.2, fanout: int = 4, image_refs: int = 20, seed: int = 0,
+                       components: int = 0, instances: float = 0.0, hidden: float = 0.0) -> Dict[str, Any]:
+    """A GET /v1/files response with `frames` frames of `nodes` top-level nodes each
+
+    With `components` masters, a share `instances` of the nodes are instances of them.
+    A share `hidden` of the layers is invisible, like leftover variants in real files.
+    """
+    rng = random.Random(seed)
+    ids = iter(range(1, 10 ** 9))
+    options = {'images': images, 'effects': effects, 'fanout': fanout, 'image_refs': image_refs, 'instances': instances, 'hidden': hidden, 'masters': []}
+    options['masters'] = synthetic_masters(rng, ids, components, options)
+    children = []
+
+    for index in range(frames):
+        x, y = index * 1600, 0
+        width, height = 1440, rng.choice([900, 2400, 6000])
+        children.append({
+            'id': f'{next(ids)}:0',
+            'name': f'Frame {index + 1}',
+            'type': 'FRAME',
+            'absoluteBoundingBox': {'x': x, 'y': y, 'width': width, 'height': height},
+            'fills': [{'type': 'SOLID', 'color': color(rng)}],
+            'effects': [],
+            'children': [synthetic_node(rng, ids, x, y, width, height, depth, options) for _ in range(nodes)]
+        })
+
+    return {
+        'name': 'Synthetic',
+        'version': str(seed),
+        'components': {master['id']: {'key': master['id'], 'name': master['name'], 'description': ''} for master in options['masters']},
+        'document': {'id': '0:0', 'type': 'DOCUMENT', 'children': [{'id': '0:1', 'type': 'CANVAS', 'name': 'Page 1', 'children': children}]}
+    }
+
+def count_nodes(document: Dict[str, Any]) -> int:
+    """Top-level nodes of every frame, i.e. what parse_file turns into components"""
+    return sum(len(frame.get('children', [])) for frame in document['document']['children'][0]['children'])
@@ -0,0 +1,102 @@
+"""Compare the generated-code Tk target with the layout file + shared runtime target.
+
+Usage: python benchmarks/tk_layout.py [--frames 4] [--nodes 5000]
+
+Startup is measured by running the generated entry point with Tk's mainloop
+replaced by a single update, so it needs a display; it is skipped otherwise.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import py_compile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tk import tk_generate
+from ir import Frame, Node
+
+KINDS = ['rectangle', 'oval', 'line', 'text', 'label', 'textbox', 'textarea']
+
+STARTUP = '''import sys, time, runpy, tkinter
+start = time.perf_counter()
+def mainloop(self, n=0):
+    self.update()
+    print(time.perf_counter() - start)
+    self.destroy()
+tkinter.Tk.mainloop = mainloop
+runpy.run_path(sys.argv[1], run_name="__main__")
+'''
+
+def synthetic_frames(frames, nodes, seed=0):
+    """Build parse_file-shaped frames made of simple, asset-free nodes"""
+    rng = random.Random(seed)
+    output = []
+
+    for index in range(1, frames + 1):
+        components = []
+        for n in range(nodes):
+            kind = rng.choice(KINDS)
+            x, y, width, height = rng.randint(0, 1200), rng.randint(0, 4000), rng.randint(10, 300), rng.randint(10, 120)
+            node = Node(f'{index}:{n}', f'{kind} item {n}', kind, 'div', {
+                'left': f'{x}px',
+                'top': f'{y}px',
+                'width': f'{width}px',
+                'height': f'{height}px',
+                'backgroundColor': f'#{rng.randint(0, 0xffffff):06x}',
+                'color': '#000000',
+                'fontSize': '14px'
+            }, text=f'Item {n}')
+            node.box = (x, y, width, height)
+            components.append(node)
+        output.append(Frame(components, 1440, 4096, '#ffffff', f'Frame {index}', index))
+
+    return output
+
+def startup(path):
+    """Seconds from interpreter start of the entry point to the first drawn frame"""
+    result = subprocess.run([sys.executable, '-c', STARTUP, path], capture_output=True, text=True, cwd=os.path.dirname(path))
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def folder_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def measure(parsed, layout):
+    out = tempfile.mkdtemp(prefix='tkforge-bench-')
+    start = time.perf_counter()
+    tk_generate(parsed, out, layout)
+    generate = time.perf_counter() - start
+
+    folder = os.path.join(out, 'TkForge')
+    scripts = [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith('.py')]
+    start = time.perf_counter()
+    for script in scripts:
+        py_compile.compile(script, doraise=True)
+    compile_time = time.perf_counter() - start
+
+    entry = next(script for script in scripts if not script.endswith('tkforge_runtime.py'))
+    return {'generate': generate, 'compile': compile_time, 'bytes': folder_size(folder), 'startup': startup(entry)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=4)
+    parser.add_argument('--nodes', type=int, default=5000)
+    args = parser.parse_args()
+
+    parsed = synthetic_frames(args.frames, args.nodes)
+    results = {'code': measure(parsed, False), 'layout': measure(parsed, True)}
+
+    print(f"{args.frames} frames x {args.nodes} nodes")
+    print(f"{'target':<8} {'generate':>10} {'compile':>10} {'size':>12} {'startup':>10}")
+    for target, r in results.items():
+        startup_time = f"{r['startup']:.3f}s" if r['startup'] is not None else 'no display'
+        print(f"{target:<8} {r['generate']:>9.3f}s {r['compile']:>9.3f}s {r['bytes']:>10,}B {startup_time:>10}")
+
+if __name__ == '__main__':
+    main()
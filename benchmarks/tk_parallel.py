@@ -0,0 +1,61 @@
+"""Throughput of parallel Tk generation and byte-identical output across runs.
+
+Usage: python benchmarks/tk_parallel.py [--frames 32] [--nodes 5000] [--layout]
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tk import tk_generate
+from tk_layout import synthetic_frames
+
+def digest(folder):
+    """Hash every generated file, in a stable order"""
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            h.update(os.path.relpath(path, folder).encode())
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=32)
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--layout', action='store_true', help='Benchmark the layout target instead of generated scripts')
+    args = parser.parse_args()
+
+    parsed = synthetic_frames(args.frames, args.nodes)
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    digests = set()
+    serial = None
+
+    print(f"{args.frames} frames x {args.nodes} nodes, {cpus} CPUs")
+    print(f"{'pool':<10} {'workers':>7} {'seconds':>9} {'nodes/s':>12} {'speedup':>8}")
+
+    for processes in (False, True):
+        for workers in counts:
+            out = tempfile.mkdtemp(prefix='tkforge-bench-')
+            start = time.perf_counter()
+            tk_generate(parsed, out, args.layout, workers, processes)
+            elapsed = time.perf_counter() - start
+            serial = serial or elapsed
+            digests.add(digest(os.path.join(out, 'TkForge')))
+            pool = 'process' if processes else 'thread'
+            print(f"{pool:<10} {workers:>7} {elapsed:>9.3f} {args.frames * args.nodes / elapsed:>12,.0f} {serial / elapsed:>7.2f}x")
+
+    print('output identical across runs' if len(digests) == 1 else f'OUTPUT DIFFERS: {len(digests)} variants')
+    sys.exit(0 if len(digests) == 1 else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""JSON codec shared by the Figma client and the on-disk caches.
+
+Decodes and encodes with orjson or msgspec when one is installed and falls back
+to the json module otherwise; TKFORGE_JSON picks one by name. Everything works
+on UTF-8 bytes, so API responses are decoded straight from the body without
+first being turned into a str. Large documents are decoded with the garbage
+collector paused, which otherwise dominates the decode time.
+"""
+
+import gc
+import os
+import json
+import threading
+import importlib.util
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# urllib3 only decodes brotli bodies when one of these is installed
+BROTLI = any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi'))
+ACCEPT_ENCODING = 'br, gzip' if BROTLI else 'gzip'
+# Documents from this size on are decoded with the garbage collector paused
+GC_PAUSE_SIZE = 1 << 20
+
+_gc_lock = threading.Lock()
+_paused = 0
+_gc_enabled = True
+
+def _json_dumps(obj, indent=False):
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None,
+                      separators=None if indent else (',', ':')).encode('utf-8')
+
+def _orjson_dumps(obj, indent=False):
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+def _msgspec_loads(data):
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as e:
+        # Same error type as the other backends
+        raise ValueError(str(e)) from e
+
+def _msgspec_dumps(obj, indent=False):
+    data = msgspec.json.encode(obj)
+    return msgspec.json.format(data, indent=2) if indent else data
+
+# Backend name -> (loads, dumps), in order of preference
+BACKENDS: Dict[str, Tuple[Callable, Callable]] = {}
+if orjson is not None:
+    BACKENDS['orjson'] = (orjson.loads, _orjson_dumps)
+if msgspec is not None:
+    BACKENDS['msgspec'] = (_msgspec_loads, _msgspec_dumps)
+BACKENDS['json'] = (json.loads, _json_dumps)
+
+BACKEND = None
+_loads = _dumps = None
+
+def use(name: str = None) -> str:
+    """Switch to a backend by name, or to the fastest one installed, and return its name"""
+    global BACKEND, _loads, _dumps
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"JSON backend '{name}' is not installed, expected one of: {', '.join(BACKENDS)}")
+    BACKEND = name or next(iter(BACKENDS))
+    _loads, _dumps = BACKENDS[BACKEND]
+    return BACKEND
+
+@contextmanager
+def gc_paused():
+    """Hold off the cyclic garbage collector, which decoding millions of containers keeps waking up for nothing"""
+    global _paused, _gc_enabled
+    with _gc_lock:
+        if _paused == 0:
+            _gc_enabled = gc.isenabled()
+            gc.disable()
+        _paused += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _paused -= 1
+            if _paused == 0 and _gc_enabled:
+                gc.enable()
+
+def loads(data) -> Any:
+    """Decode JSON from bytes (or str), raising ValueError when it is invalid"""
+    if len(data) < GC_PAUSE_SIZE:
+        return _loads(data)
+    with gc_paused():
+        return _loads(data)
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode to compact UTF-8 JSON, or indented by two spaces"""
+    return _dumps(obj, indent)
+
+def load(path: str) -> Any:
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+def dump(obj: Any, path: str, indent: bool = False):
+    with open(path, 'wb') as f:
+        f.write(_dumps(obj, indent))
+
+try:
+    use(os.environ.get('TKFORGE_JSON') or None)
+except ValueError as e:
+    print(f"Warning: {str(e)}, using {use()}")
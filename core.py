@@ -1,67 +1,237 @@
 import os
+import base64
+import contextvars
 import requests
 import threading
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional
 from utils import rgb_to_hex, get_foreground_color
+from ir import Frame, Node, intern, intern_style, walk
+from progress import Cancelled, check, publish
+from tracing import count, span
+import codec
+import layout
+import prune
+import spatial
 
-def get_file(file: str, token: str) -> Dict[str, Any]:
-    """Fetch Figma file data with enhanced error handling"""
-    try:
-        response = requests.get(
-            f"https://api.figma.com/v1/files/{file}",
-            headers={'X-FIGMA-TOKEN': token},
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching Figma file: {str(e)}")
-        return None
+FIGMA_API = os.environ.get('FIGMA_API_URL', 'https://api.figma.com')
+# Anything with requests' get(); replay.Recorder and replay.Replayer swap in here
+transport = requests
+ASSETS_DIR = 'reactapp/src/assets'
+# Folder of the assets holding the original image fills, shared by all frames
+FILLS_DIR = 'fills'
+PLACEHOLDER_SIZE = 16
+# CSS object-fit of the image fill scale modes an <img> reproduces without a render
+OBJECT_FIT = {'FILL': 'cover', 'FIT': 'contain'}
+IMAGE_MAGIC = ((b'\x89PNG', 'png'), (b'\xff\xd8\xff', 'jpg'), (b'GIF8', 'gif'))
+
+# Element tag of each layer kind, the first word of a layer's name
+REACT_COMPONENTS = {
+    "image": "img",
+    "button": "button",
+    "label": "label",
+    "text": "p",
+    "heading": "h1",
+    "subheading": "h2",
+    "paragraph": "p",
+    "rectangle": "div",
+    "circle": "div",
+    "oval": "div",
+    "line": "hr",
+    "textbox": "input",
+    "textarea": "textarea",
+    "listbox": "select",
+    "checkbox": "input",
+    "radio": "input",
+    "slider": "input",
+    "dropdown": "select",
+    "link": "a",
+    "icon": "span",
+    "video": "video",
+    "audio": "audio",
+    "iframe": "iframe",
+    "svg": "svg",
+    "canvas": "canvas"
+}
+# Tags rendered without children
+VOID_TAGS = {'img', 'input', 'hr'}
+# Tags that matter even when they draw nothing
+INTERACTIVE_TAGS = {'input', 'button', 'select', 'textarea', 'a', 'iframe', 'video', 'audio', 'canvas'}
+
+def api_headers(token: str) -> Dict[str, str]:
+    """Headers of a Figma API request, asking for a compressed body"""
+    return {'X-FIGMA-TOKEN': token, 'Accept-Encoding': codec.ACCEPT_ENCODING}
+
+def get_file(file: str, token: str, progress=None) -> Dict[str, Any]:
+    """Fetch Figma file data with enhanced error handling
+
+    Transfer (with decompression) and JSON decoding are timed as separate spans.
+    """
+    with span('get_file', file=file) as trace:
+        try:
+            with span('get_file_transfer', file=file) as transfer:
+                response = transport.get(
+                    f"{FIGMA_API}/v1/files/{file}",
+                    headers=api_headers(token),
+                    timeout=30
+                )
+                response.raise_for_status()
+                content = response.content
+                transfer.add_bytes(int(response.headers.get('Content-Length') or len(content)))
+            trace.add_bytes(len(content))
+            publish(progress, 'file_fetched', bytes=len(content))
+
+            with span('get_file_decode', file=file, backend=codec.BACKEND,
+                      encoding=response.headers.get('Content-Encoding', 'identity')) as decode:
+                decode.add_bytes(len(content))
+                return codec.loads(content)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching Figma file: {str(e)}")
+            return None
+        except ValueError as e:
+            print(f"Error decoding Figma file: {str(e)}")
+            return None
 
-def download_image(file: str, id: str, name: str, token: str, out: str = None, frame: int = None) -> str:
+def download_image(file: str, id: str, name: str, token: str, out: str = None, frame: int = None, scale: float = 2, assets: str = ASSETS_DIR, progress=None) -> str:
     """Download image assets with enhanced error handling and retries"""
-    max_retries = 3
-    retry_count = 0
+    with span('download_image', name=name, scale=scale) as trace:
+        max_retries = 3
+        retry_count = 0
     
-    while retry_count < max_retries:
-        try:
-            response = requests.get(
-                f"https://api.figma.com/v1/images/{file}",
-                headers={'X-FIGMA-TOKEN': token},
-                params={'ids': id, 'format': 'png', 'scale': 2},
-                timeout=30
-            )
-            response.raise_for_status()
-            json_data = response.json()
-            image_url = json_data.get('images', {}).get(id)
+        while retry_count < max_retries:
+            try:
+                response = transport.get(
+                    f"{FIGMA_API}/v1/images/{file}",
+                    headers=api_headers(token),
+                    params={'ids': id, 'format': 'png', 'scale': scale},
+                    timeout=30
+                )
+                response.raise_for_status()
+                json_data = codec.loads(response.content)
+                image_url = json_data.get('images', {}).get(id)
 
-            if image_url:
-                if frame is not None:
-                    folder_path = os.path.join(out, 'ReactApp/src/assets', f'frame_{frame}') if out else os.path.join('ReactApp/src/assets', f'frame_{frame}')
-                else:
-                    folder_path = os.path.join(out, 'ReactApp/src/assets') if out else 'ReactApp/src/assets'
+                if image_url:
+                    if frame is not None:
+                        folder_path = os.path.join(out, assets, f'frame_{frame}') if out else os.path.join(assets, f'frame_{frame}')
+                    else:
+                        folder_path = os.path.join(out, assets) if out else assets
                     
-                os.makedirs(folder_path, exist_ok=True)
+                    os.makedirs(folder_path, exist_ok=True)
                 
-                file_name = f'{name}.png'
-                file_path = os.path.join(folder_path, file_name)
+                    file_name = f'{name}.png'
+                    file_path = os.path.join(folder_path, file_name)
                 
-                image_response = requests.get(image_url, timeout=30)
-                image_response.raise_for_status()
+                    image_response = transport.get(image_url, timeout=30)
+                    image_response.raise_for_status()
 
-                with open(file_path, 'wb') as f:
-                    f.write(image_response.content)
+                    with open(file_path, 'wb') as f:
+                        f.write(image_response.content)
 
-                return os.path.join(f'frame_{frame}' if frame is not None else '', file_name).replace('\\', '/')
+                    trace.add_bytes(len(image_response.content))
+                    publish(progress, 'image_done', name=file_name, bytes=len(image_response.content))
+
+                    return os.path.join(f'frame_{frame}' if frame is not None else '', file_name).replace('\\', '/')
             
-            return None
+                return None
         
-        except requests.exceptions.RequestException as e:
-            print(f"Error downloading image (attempt {retry_count + 1}/{max_retries}): {str(e)}")
-            retry_count += 1
-            if retry_count == max_retries:
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Error downloading image (attempt {retry_count + 1}/{max_retries}): {str(e)}")
+                retry_count += 1
+                if retry_count == max_retries:
+                    return None
+
+def get_image_fills(file: str, token: str) -> Dict[str, str]:
+    """Download URLs of the original image fills of a file, by imageRef"""
+    with span('get_image_fills', file=file):
+        try:
+            response = transport.get(
+                f"{FIGMA_API}/v1/files/{file}/images",
+                headers=api_headers(token),
+                timeout=30
+            )
+            response.raise_for_status()
+            return codec.loads(response.content).get('meta', {}).get('images') or {}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error fetching image fills, rendering every image instead: {str(e)}")
+            return {}
+
+def image_extension(data: bytes) -> str:
+    """File extension of an image, from its first bytes"""
+    for magic, ext in IMAGE_MAGIC:
+        if data.startswith(magic):
+            return ext
+    return 'webp' if data[8:12] == b'WEBP' else 'png'
+
+def download_fill(url: str, ref: str, out: str = None, assets: str = ASSETS_DIR, progress=None) -> str:
+    """Download the original of an image fill once, named after its imageRef"""
+    with span('download_fill', ref=ref) as trace:
+        for attempt in range(3):
+            try:
+                response = transport.get(url, timeout=30)
+                response.raise_for_status()
+                break
+            except requests.exceptions.RequestException as e:
+                print(f"Error downloading image fill (attempt {attempt + 1}/3): {str(e)}")
+        else:
+            return None
+
+        folder_path = os.path.join(out, assets, FILLS_DIR) if out else os.path.join(assets, FILLS_DIR)
+        os.makedirs(folder_path, exist_ok=True)
+        file_name = f'{ref}.{image_extension(response.content)}'
+        with open(os.path.join(folder_path, file_name), 'wb') as f:
+            f.write(response.content)
+
+        trace.add_bytes(len(response.content))
+        publish(progress, 'image_done', name=file_name, bytes=len(response.content))
+        return f'{FILLS_DIR}/{file_name}'
+
+def plain_fill(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The image fill of a node that shows the original image as is, or None when it needs a render
+
+    Crops, tiling, paint filters, blending, masks, effects, strokes and children all
+    change the pixels, only a render from the images endpoint has them composited.
+    """
+    fills = [fill for fill in node.get('fills', []) if fill.get('visible', True)]
+    if len(fills) != 1 or fills[0].get('type') != 'IMAGE' or not fills[0].get('imageRef'):
+        return None
+    fill = fills[0]
+    if fill.get('scaleMode', 'FILL') not in OBJECT_FIT or fill.get('imageTransform') or fill.get('filters') or fill.get('rotation'):
+        return None
+    if fill.get('opacity', 1) < 1 or fill.get('blendMode', 'NORMAL') != 'NORMAL':
+        return None
+    if node.get('isMask') or node.get('children') or node.get('rotation'):
+        return None
+    if any(effect.get('visible', True) for effect in node.get('effects', [])):
+        return None
+    if node.get('strokeWeight', 1) > 0 and any(stroke.get('visible', True) for stroke in node.get('strokes', [])):
+        return None
+    return fill
+
+def image_placeholder(file: str, id: str, token: str, width: int, height: int) -> str:
+    """Render a tiny preview of an image node and return it as a data URI"""
+    scale = max(0.01, min(1, PLACEHOLDER_SIZE / max(width, height, 1)))
+
+    with span('image_placeholder') as trace:
+        try:
+            response = transport.get(
+                f"{FIGMA_API}/v1/images/{file}",
+                headers=api_headers(token),
+                params={'ids': id, 'format': 'png', 'scale': round(scale, 3)},
+                timeout=30
+            )
+            response.raise_for_status()
+            image_url = codec.loads(response.content).get('images', {}).get(id)
+
+            if not image_url:
                 return None
 
+            image_response = transport.get(image_url, timeout=30)
+            image_response.raise_for_status()
+            trace.add_bytes(len(image_response.content))
+            return 'data:image/png;base64,' + base64.b64encode(image_response.content).decode('ascii')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error rendering image placeholder: {str(e)}")
+            return None
+
 def parse_effects(effects: List[Dict[str, Any]]) -> Dict[str, str]:
     """Parse Figma effects into CSS styles"""
     styles = {}
@@ -102,10 +272,16 @@ def parse_constraints(constraints: Dict[str, str]) -> Dict[str, str]:
     
     return styles
 
-def parse_file(file: str, token: str, download_images: bool = True, out: str = None) -> List[Dict[str, Any]]:
-    """Parse Figma file with enhanced component mapping and responsive design"""
+def parse_file(file: str, token: str, download_images: bool = True, out: str = None, assets: str = ASSETS_DIR, srcset: bool = True, progress=None, cancel=None, keep: Iterable[str] = (), image_fills: bool = True, placeholders: bool = True) -> List[Frame]:
+    """Parse Figma file with enhanced component mapping and responsive design
+
+    Layers matched by a pruning rule (see prune.PRUNE_RULES) are skipped unless the rule is in `keep`.
+    With `image_fills`, image nodes showing an image fill as is get its original, downloaded
+    once per imageRef into FILLS_DIR; the others are rendered as PNG. `placeholders` renders
+    the blurred inline previews shown while images load, along with the 2x renders of `srcset`.
+    """
     output = []
-    result = get_file(file, token)
+    result = get_file(file, token, progress)
     
     if not result:
         return []
@@ -113,67 +289,126 @@ def parse_file(file: str, token: str, download_images: bool = True, out: str = N
     try:
         frames = result['document']['children'][0]['children']
         frame_count = 1 if len(frames) > 1 else 0
+        rules = prune.prune_rules(keep)
+        pruned_total = {}
+        pruned_lock = threading.Lock()
+
+        def interactive(node: Dict[str, Any]) -> bool:
+            return REACT_COMPONENTS.get(node.get('name', '').lower().split(' ')[0]) in INTERACTIVE_TAGS
+
+        fill_urls = None
+        # imageRef -> [lock, asset path, placeholder], filled by the first node showing the image
+        fills = {}
+        fills_lock = threading.Lock()
+
+        def original_fill(ref: str, node_id: str, bounds: Dict[str, float], frame_count: int) -> Optional[list]:
+            """Downloaded original of an image fill, or None to render the node instead"""
+            nonlocal fill_urls
+            with fills_lock:
+                # One request lists the originals of the whole file
+                if fill_urls is None:
+                    fill_urls = get_image_fills(file, token)
+                if not fill_urls.get(ref):
+                    return None
+                entry = fills.get(ref)
+                if entry is None:
+                    entry = fills[ref] = [threading.Lock(), None, None]
+                    publish(progress, 'image_queued', frame=frame_count, name=ref)
+            count('image_fills', 'nodes')
+            with entry[0]:
+                if entry[1] is None:
+                    count('image_fills', 'downloads')
+                    entry[1] = download_fill(fill_urls[ref], ref, out, assets, progress)
+                    if entry[1] and srcset and placeholders:
+                        entry[2] = image_placeholder(file, node_id, token, bounds['width'], bounds['height'])
+            return entry if entry[1] else None
 
         def parse_frame(frame: Dict[str, Any], frame_count: int):
             nonlocal output
             parsed = []
             image_count = 0
+            pruned = {}
+
+            def download(node: Node, name: str, bounds: Dict[str, float], layer: Dict[str, Any]):
+                """Fetch the 1x/2x renders and the inline placeholder of an image node
 
-            for i in frame['children']:
+                A plain image fill is not rendered: its original is shared by every node showing it.
+                """
+                fill = plain_fill(layer) if image_fills else None
+                if fill is not None:
+                    entry = original_fill(fill['imageRef'], node.id, bounds, frame_count)
+                    if entry is not None:
+                        node.image, node.placeholder = entry[1], entry[2]
+                        node.style['objectFit'] = intern(OBJECT_FIT[fill.get('scaleMode', 'FILL')])
+                        return
+                publish(progress, 'image_queued', frame=frame_count, name=name)
+                node.image = download_image(file, node.id, name, token, out, frame_count, 1, assets, progress)
+                if srcset:
+                    node.image2x = download_image(file, node.id, f'{name}@2x', token, out, frame_count, 2, assets, progress)
+                    # Emitters import the 2x render only next to a 1x one, so a lone 2x render stands in for it
+                    if node.image is None:
+                        node.image, node.image2x = node.image2x, None
+                    if placeholders:
+                        node.placeholder = image_placeholder(file, node.id, token, bounds['width'], bounds['height'])
+
+            def visible_children(children: List[Dict[str, Any]], parent: Dict[str, Any], clip) -> List[Dict[str, Any]]:
+                """Children worth parsing: visible ones, not hidden under an opaque sibling or clipped away"""
+                # Hidden children take no room in auto-layout, but dropping any other would move their siblings
+                if layout.is_auto_layout(parent):
+                    return prune.prune(children, rules & {'hidden'}, pruned)
+                kept = prune.prune(children, rules, pruned, interactive)
+                kept, dropped = spatial.cull(kept, clip if 'outside' in rules else None, 'occluded' in rules)
+                for rule, nodes in dropped.items():
+                    for node in nodes:
+                        prune.record(pruned, rule, node)
+                return kept
+
+            def stack(nodes: List[Node]) -> bool:
+                """Give explicit z-indexes to the absolutely positioned nodes that overlap, returning whether any got one"""
+                levels = spatial.stacking([node.box if node.style.get('position') == 'absolute' else None for node in nodes])
+                for node, level in zip(nodes, levels):
+                    if level:
+                        node.style['zIndex'] = level
+                return any(levels)
+
+            def parse_node(i: Dict[str, Any], parent: Dict[str, Any] = None, clip=None) -> Node:
+                nonlocal image_count
+                count('nodes', i.get('type', 'UNKNOWN'))
                 if 'absoluteBoundingBox' in i:
                     bounds = i['absoluteBoundingBox']
                 else:
                     bounds = i['absoluteRenderBounds']
                 
-                # Enhanced component mapping
-                react_components = {
-                    "image": "img",
-                    "button": "button",
-                    "label": "label",
-                    "text": "p",
-                    "heading": "h1",
-                    "subheading": "h2",
-                    "paragraph": "p",
-                    "rectangle": "div",
-                    "circle": "div",
-                    "oval": "div",
-                    "line": "hr",
-                    "textbox": "input",
-                    "textarea": "textarea",
-                    "listbox": "select",
-                    "checkbox": "input",
-                    "radio": "input",
-                    "slider": "input",
-                    "dropdown": "select",
-                    "link": "a",
-                    "icon": "span",
-                    "video": "video",
-                    "audio": "audio",
-                    "iframe": "iframe",
-                    "svg": "svg",
-                    "canvas": "canvas"
-                }
-                
                 name_parts = i['name'].lower().split(' ')
                 type = name_parts[0]
-                react_type = react_components.get(type, "div")
+                react_type = REACT_COMPONENTS.get(type, "div")
                 
-                # Initialize style with positioning
-                i['style'] = {
-                    'position': 'absolute',
-                    'left': f"{abs(int(frame['absoluteBoundingBox']['x']) - int(bounds['x']))}px",
-                    'top': f"{abs(int(frame['absoluteBoundingBox']['y']) - int(bounds['y']))}px",
-                    'width': f"{int(bounds['width'])}px",
-                    'height': f"{int(bounds['height'])}px"
-                }
+                if parent is None:
+                    # Frame-level layers keep their absolute position in the frame
+                    style = {
+                        'position': 'absolute',
+                        'left': f"{abs(int(frame['absoluteBoundingBox']['x']) - int(bounds['x']))}px",
+                        'top': f"{abs(int(frame['absoluteBoundingBox']['y']) - int(bounds['y']))}px",
+                        'width': f"{int(bounds['width'])}px",
+                        'height': f"{int(bounds['height'])}px"
+                    }
+                    
+                    # Add constraints-based styles
+                    if 'constraints' in i:
+                        style.update(parse_constraints(i['constraints']))
+                    style['maxWidth'] = '100%'
+                elif layout.in_flow(i, parent):
+                    # Placed by the parent's flex or grid layout
+                    style = layout.flow_style(i, parent, bounds)
+                else:
+                    style = layout.absolute_style(bounds, parent['absoluteBoundingBox'])
                 
-                # Add constraints-based styles
-                if 'constraints' in i:
-                    i['style'].update(parse_constraints(i['constraints']))
+                if layout.is_auto_layout(i):
+                    style.update(layout.container_style(i))
                 
                 # Add effects
                 if 'effects' in i:
-                    i['style'].update(parse_effects(i['effects']))
+                    style.update(parse_effects(i['effects']))
                 
                 # Process background color
                 bg_color = i.get('backgroundColor') or \
@@ -181,59 +416,79 @@ def parse_file(file: str, token: str, download_images: bool = True, out: str = N
                         (i.get('fills', [{}])[0].get('color') if i.get('fills') else None)
                 
                 if bg_color:
-                    i['style']['backgroundColor'] = rgb_to_hex(bg_color['r'], bg_color['g'], bg_color['b'])
+                    style['backgroundColor'] = rgb_to_hex(bg_color['r'], bg_color['g'], bg_color['b'])
                     fg = get_foreground_color(bg_color['r'], bg_color['g'], bg_color['b'])
-                    i['style']['color'] = fg
+                    style['color'] = fg
                 
                 # Process borders
-                if i.get('strokes'):
+                stroke_color = None
+                stroke_weight = i.get('strokeWeight', 1)
+                if i.get('strokes') and i['strokes'][0].get('color'):
                     stroke = i['strokes'][0]
                     stroke_color = rgb_to_hex(stroke['color']['r'], stroke['color']['g'], stroke['color']['b'])
-                    i['style']['border'] = f"{stroke.get('weight', 1)}px {stroke.get('type', 'solid')} {stroke_color}"
+                    style['border'] = f"{stroke_weight}px solid {stroke_color}"
                 
+                node = Node(i['id'], i['name'], type, react_type, style, stroke_color=stroke_color, stroke_weight=stroke_weight)
+                node.box = (int(bounds['x'] - frame['absoluteBoundingBox']['x']), int(bounds['y'] - frame['absoluteBoundingBox']['y']),
+                            int(bounds['width']), int(bounds['height']))
+                if i.get('type') == 'INSTANCE':
+                    node.component = intern(i['componentId'])
+                elif i.get('type') == 'COMPONENT':
+                    node.component = intern(i['id'])
+
                 # Process special components
                 if react_type == 'input':
-                    input_type = name_parts[1] if len(name_parts) > 1 else 'text'
-                    i['type'] = input_type
-                    if input_type in ['checkbox', 'radio']:
-                        i['checked'] = False
+                    node.input_type = name_parts[1] if len(name_parts) > 1 else 'text'
+                    if node.input_type in ['checkbox', 'radio']:
+                        node.checked = False
                 
                 elif react_type in ['h1', 'h2', 'p']:
-                    i['text'] = i.get('characters', '')
-                    style = i.get('style', {})
-                    i['style'].update({
-                        'fontFamily': style.get('fontFamily', 'inherit'),
-                        'fontSize': f"{int(style.get('fontSize', 16))}px",
-                        'fontWeight': style.get('fontWeight', 'normal'),
-                        'letterSpacing': f"{style.get('letterSpacing', 0)}px",
-                        'lineHeight': style.get('lineHeight', 1.5)
-                    })
+                    node.text = i.get('characters', '')
+                    # Figma's own TypeStyle of the text layer
+                    text_style = i.get('style', {})
+                    node.style.update(intern_style({
+                        'fontFamily': text_style.get('fontFamily', 'inherit'),
+                        'fontSize': f"{int(text_style.get('fontSize', 16))}px",
+                        'fontWeight': text_style.get('fontWeight', 'normal'),
+                        'letterSpacing': f"{text_style.get('letterSpacing', 0)}px",
+                        'lineHeight': f"{text_style['lineHeightPx']}px" if 'lineHeightPx' in text_style else 1.5
+                    }))
                 
                 elif react_type == 'img':
                     if download_images:
                         parts = i['name'].split(' ')
                         name = " ".join(parts[1:])
                         if not name.replace(' ', '') == '':
-                            download(name)
+                            download(node, name, bounds, i)
                         else:
                             image_count += 1
-                            download(str(image_count))
+                            download(node, str(image_count), bounds, i)
                 
                 # Add border radius for rounded components
                 if type in ['circle', 'oval']:
-                    i['style']['borderRadius'] = '50%'
+                    node.style['borderRadius'] = '50%'
                 elif 'cornerRadius' in i:
-                    i['style']['borderRadius'] = f"{i['cornerRadius']}px"
+                    node.style['borderRadius'] = intern(f"{i['cornerRadius']}px")
                 
-                # Add responsive design attributes
-                i['style']['maxWidth'] = '100%'
-                i['style']['boxSizing'] = 'border-box'
+                # Images are rendered with their children, void elements cannot hold any
+                if i.get('children') and react_type not in VOID_TAGS:
+                    clip = spatial.bounds(i) if i.get('clipsContent') else clip
+                    node.children = [parse_node(child, i, clip) for child in visible_children(i['children'], i, clip)]
+                    if any(child.style.get('position') == 'absolute' for child in node.children):
+                        node.style.setdefault('position', 'relative')
+                        # The children's z-indexes must only order them among themselves, not against the parent's siblings
+                        if stack(node.children):
+                            node.style['isolation'] = 'isolate'
                 
-                if 'layoutMode' in i:
-                    i['style']['display'] = 'flex'
-                    i['style']['flexDirection'] = 'column' if i['layoutMode'] == 'VERTICAL' else 'row'
-                
-                parsed.append(i)
+                return node
+
+            # Top-level frames clip their content unless told otherwise
+            clip = spatial.bounds(frame) if frame.get('clipsContent', True) else None
+            for i in visible_children(frame['children'], frame, clip):
+                if cancel is not None and cancel.cancelled:
+                    return
+                parsed.append(parse_node(i, clip=clip))
+            stack(parsed)
             
             # Process frame background
             frame_bg = frame.get('backgroundColor') or \
@@ -245,31 +500,59 @@ def parse_file(file: str, token: str, download_images: bool = True, out: str = N
             else:
                 frame_bg = "#ffffff"
             
-            output.append({
-                'components': parsed,
-                'frame': {
-                    'width': int(frame['absoluteBoundingBox']['width']),
-                    'height': int(frame['absoluteBoundingBox']['height']),
-                    'backgroundColor': frame_bg,
-                    'name': result['name'],
-                    'frameIndex': frame_count,
-                    'description': frame.get('description', ''),
-                    'effects': parse_effects(frame.get('effects', [])),
-                    'constraints': parse_constraints(frame.get('constraints', {'horizontal': 'LEFT', 'vertical': 'TOP'}))
-                }
-            })
-
-        threads = []
-        for frame in frames:
-            if frame["type"] == "FRAME":
-                thread = threading.Thread(target=parse_frame, args=(frame, frame_count,))
-                threads.append(thread)
-                thread.start()
-                frame_count += 1
-
-        for thread in threads:
-            thread.join()
+            for rule, (layers, size) in pruned.items():
+                count('pruned', rule, layers)
+                with pruned_lock:
+                    totals = pruned_total.setdefault(rule, [0, 0])
+                    totals[0] += layers
+                    totals[1] += size
+            publish(progress, 'nodes_pruned', frame=frame_count, nodes=sum(entry[0] for entry in pruned.values()),
+                    bytes=sum(entry[1] for entry in pruned.values()))
+            publish(progress, 'frame_parsed', frame=frame_count, nodes=sum(1 for _ in walk(parsed)))
+            output.append(Frame(
+                parsed,
+                int(frame['absoluteBoundingBox']['width']),
+                int(frame['absoluteBoundingBox']['height']),
+                frame_bg,
+                frame.get('name', result['name']),
+                frame_count,
+                frame.get('description', ''),
+                parse_effects(frame.get('effects', [])),
+                parse_constraints(frame.get('constraints', {'horizontal': 'LEFT', 'vertical': 'TOP'}))
+            ))
+
+            # Nothing refers to the raw JSON of the frame any more, let it go
+            frame.clear()
+
+        def traced_parse_frame(frame: Dict[str, Any], frame_count: int):
+            with span('parse_frame', frame=frame_count):
+                parse_frame(frame, frame_count)
+
+        publish(progress, 'frames_found', total=sum(1 for frame in frames if frame["type"] == "FRAME"))
+
+        with span('parse_file', file=file):
+            threads = []
+            for frame in frames:
+                if frame["type"] == "FRAME":
+                    # A copy of the caller's context keeps its job output capture, see batch.JobOutput
+                    thread = threading.Thread(target=contextvars.copy_context().run, args=(traced_parse_frame, frame, frame_count))
+                    threads.append(thread)
+                    thread.start()
+                    frame_count += 1
+
+            for thread in threads:
+                thread.join()
+
+        check(cancel)
+
+        # Frames finish in any order, keep the output in document order
+        output.sort(key=lambda frame_data: frame_data.index)
+
+        if pruned_total:
+            print(prune.prune_summary(pruned_total))
 
+    except Cancelled:
+        raise
     except KeyError as e:
         print(f"KeyError: {str(e)} - likely due to missing keys in JSON response")
     except Exception as e:
@@ -0,0 +1,218 @@
+"""Self-hosted, subset web fonts for the generated React app.
+
+Collects the families and weights text nodes use, finds them in a local font
+directory and subsets each face to the characters of the design. fontTools is
+optional: without it the matching font files are copied as they are. Subsets are
+cached on disk by font and glyph-set hash, so repeated runs only copy files.
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import importlib.util
+from typing import Any, Dict, List, Set, Tuple
+
+from ir import walk
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    subset = None
+
+FONTS_DIR = os.environ.get('TKFORGE_FONTS_DIR', 'fonts')
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'tkforge', 'fonts')
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf')
+FORMATS = {'.woff2': 'woff2', '.woff': 'woff', '.ttf': 'truetype', '.otf': 'opentype'}
+MIME_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+# Faces preloaded from index.html, the rest load on first use
+MAX_PRELOADS = 4
+# Theme text (body copy, headings) is not in the design, keep printable ASCII for it
+BASIC_LATIN = {chr(c) for c in range(0x20, 0x7f)}
+
+WEIGHT_NAMES = {
+    'thin': 100, 'hairline': 100, 'extralight': 200, 'ultralight': 200, 'light': 300,
+    'regular': 400, 'normal': 400, 'book': 400, 'medium': 500, 'semibold': 600,
+    'demibold': 600, 'bold': 700, 'extrabold': 800, 'ultrabold': 800, 'black': 900, 'heavy': 900
+}
+
+_index: Dict[str, Dict[str, Dict[Any, str]]] = {}
+_digests: Dict[Tuple[str, float, int], str] = {}
+
+def family_key(family: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', family.lower())
+
+def css_weight(weight: Any) -> int:
+    """Numeric CSS weight of a Figma or CSS font weight"""
+    if isinstance(weight, (int, float)):
+        return int(weight)
+    return WEIGHT_NAMES.get(str(weight).lower().replace('-', '').replace(' ', ''), 400)
+
+def used_fonts(frames: List[Any], theme_fonts: Dict[str, List[int]] = None) -> Dict[Tuple[str, int], Set[str]]:
+    """Characters drawn with each (family, weight) of the design and the theme"""
+    used: Dict[Tuple[str, int], Set[str]] = {}
+    inherited: Set[str] = set(BASIC_LATIN)
+
+    for frame in frames:
+        for node in walk(frame.components):
+            if not node.text:
+                continue
+            family = node.style.get('fontFamily', 'inherit')
+            if family == 'inherit':
+                inherited.update(node.text)
+            else:
+                used.setdefault((family, css_weight(node.style.get('fontWeight', 400))), set()).update(node.text)
+
+    # Text without its own family is drawn in the theme's fonts
+    for family, weights in (theme_fonts or {}).items():
+        for weight in weights:
+            used.setdefault((family, weight), set()).update(inherited)
+
+    return used
+
+def file_face(path: str) -> Tuple[str, Any]:
+    """Family and weight of a font file; 'variable' stands for every weight"""
+    if subset is not None:
+        try:
+            font = TTFont(path, lazy=True)
+            family = font['name'].getDebugName(16) or font['name'].getDebugName(1)
+            weight = 'variable' if 'fvar' in font else font['OS/2'].usWeightClass
+            font.close()
+            return family, weight
+        except Exception:
+            pass
+
+    # Fall back to the usual "Family-Weight.ext" file naming
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if '[' in stem:
+        return stem.split('[')[0], 'variable'
+    family, _, style = stem.partition('-')
+    style = style.lower().replace('italic', '')
+    return family, WEIGHT_NAMES.get(style, 400) if style else 400
+
+def container_rank(path: str) -> int:
+    return FONT_EXTENSIONS.index(os.path.splitext(path)[1].lower())
+
+def font_index(fonts_dir: str) -> Dict[str, Dict[Any, str]]:
+    """Family key -> weight -> path of the non-italic fonts in a directory tree"""
+    if fonts_dir not in _index:
+        index: Dict[str, Dict[Any, str]] = {}
+        for root, _, files in os.walk(fonts_dir):
+            for name in sorted(files):
+                if not name.lower().endswith(FONT_EXTENSIONS) or 'italic' in name.lower():
+                    continue
+                path = os.path.join(root, name)
+                family, weight = file_face(path)
+                faces = index.setdefault(family_key(family), {})
+                # Prefer the smallest container of a face: woff2, then woff, ttf, otf
+                if weight not in faces or container_rank(path) < container_rank(faces[weight]):
+                    faces[weight] = path
+        _index[fonts_dir] = index
+    return _index[fonts_dir]
+
+def resolve(family: str, weight: int, fonts_dir: str) -> Tuple[str, Any]:
+    """Path and weight of the closest available face of a family, or (None, None)"""
+    faces = font_index(fonts_dir).get(family_key(family))
+    if not faces:
+        return None, None
+    if 'variable' in faces:
+        return faces['variable'], 'variable'
+    closest = min(faces, key=lambda w: (abs(w - weight), w))
+    return faces[closest], closest
+
+def file_digest(path: str) -> str:
+    stat = os.stat(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    if key not in _digests:
+        with open(path, 'rb') as f:
+            _digests[key] = hashlib.sha1(f.read()).hexdigest()
+    return _digests[key]
+
+def subset_font(path: str, chars: Set[str], cache_dir: str = CACHE_DIR) -> str:
+    """Path of `path` subset to `chars`, as woff2 (woff without brotli), from the cache when possible"""
+    if subset is None:
+        return path
+
+    flavor = 'woff2' if importlib.util.find_spec('brotli') else 'woff'
+    glyphs = ''.join(sorted(chars))
+    key = hashlib.sha1(f"{file_digest(path)}:{flavor}:{glyphs}".encode()).hexdigest()
+    cached = os.path.join(cache_dir, f'{key}.{flavor}')
+
+    if not os.path.exists(cached):
+        options = subset.Options()
+        options.flavor = flavor
+        font = subset.load_font(path, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=[ord(c) for c in glyphs])
+        subsetter.subset(font)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename, concurrent runs may build the same subset
+        temp = f'{cached}.{os.getpid()}.tmp'
+        subset.save_font(font, temp, options)
+        os.replace(temp, cached)
+
+    return cached
+
+def build_fonts(frames: List[Any], theme_fonts: Dict[str, List[int]] = None, fonts_dir: str = FONTS_DIR) -> List[Dict[str, Any]]:
+    """Resolve and subset every face the app needs
+
+    Returns one dict per face with family, weight, the source file to ship and the
+    hashed file name it is published under. Faces missing locally are reported and
+    left to the CSS fallback fonts.
+    """
+    groups: Dict[Tuple[str, str], Tuple[Any, Set[str]]] = {}
+    missing = []
+
+    # Weights without a face of their own share the closest one, like CSS matching would
+    for (family, weight), chars in used_fonts(frames, theme_fonts).items():
+        path, face_weight = resolve(family, weight, fonts_dir) if os.path.isdir(fonts_dir) else (None, None)
+        if path is None:
+            missing.append(f'{family} {weight}')
+            continue
+        groups.setdefault((family, path), (face_weight, set()))[1].update(chars)
+
+    faces = []
+    for (family, path), (weight, chars) in sorted(groups.items(), key=lambda item: (-len(item[1][1]), item[0])):
+        source = subset_font(path, chars)
+        ext = os.path.splitext(source)[1].lower()
+        faces.append({
+            'family': family,
+            # A variable font covers the whole range in one file
+            'weight': '100 900' if weight == 'variable' else weight,
+            'source': source,
+            'format': FORMATS[ext],
+            'mime': MIME_TYPES[ext],
+            'file': f"{family_key(family)}-{weight}.{file_digest(source)[:8]}{ext}"
+        })
+
+    if missing:
+        where = f"in '{fonts_dir}'" if os.path.isdir(fonts_dir) else f"('{fonts_dir}' does not exist, see --fonts-dir)"
+        print(f"Warning: fonts not found {where}, text in them falls back to the system fonts: {', '.join(sorted(missing))}")
+    return faces
+
+def font_face_css(faces: List[Dict[str, Any]], url: str = '/fonts') -> str:
+    return ''.join(
+        f"""@font-face {{
+  font-family: '{face['family']}';
+  font-style: normal;
+  font-weight: {face['weight']};
+  font-display: swap;
+  src: url('{url}/{face['file']}') format('{face['format']}');
+}}
+
+""" for face in faces)
+
+def preload_links(faces: List[Dict[str, Any]], url: str = '/fonts') -> List[str]:
+    """Preload hints for the faces drawing the most characters"""
+    return [
+        f'<link rel="preload" href="{url}/{face["file"]}" as="font" type="{face["mime"]}" crossorigin>'
+        for face in faces[:MAX_PRELOADS]
+    ]
+
+def write_fonts(faces: List[Dict[str, Any]], output_path: str):
+    """Copy the faces into public/fonts, where Vite serves them unchanged"""
+    folder = os.path.join(output_path, 'public', 'fonts')
+    os.makedirs(folder, exist_ok=True)
+    for face in faces:
+        shutil.copyfile(face['source'], os.path.join(folder, face['file']))
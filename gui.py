@@ -7,8 +7,8 @@ import random
 import threading
 import webbrowser
 import tkinter as tk
-from tk import tk_code
-from utils import extract_figma_id, has_update
+from utils import extract_figma_id, check_update_in_background
+from progress import Cancelled, CancelToken, Progress, ProgressState
 from tkinter import filedialog, messagebox
 
 def load_asset(path):
@@ -88,6 +88,38 @@ main_layout = tk.PhotoImage(file=load_asset("image_1.png"))
 
 main_canvas.create_image(383, 253, image=main_layout)
 
+progress_text = progress_canvas.create_text(392, 470, text="", fill="#000000", font=("Arial", -12))
+
+# Progress reporting
+
+progress = None
+cancel = None
+
+def poll_progress(state):
+    # Runs on the Tk mainloop, so it only drains what is already queued
+    if progress is None:
+        return
+    while not progress.events.empty():
+        state.update(progress.events.get_nowait())
+    progress_canvas.itemconfigure(progress_text, text=state.summary())
+    root.after(100, poll_progress, state)
+
+def cancel_generation():
+    if cancel is not None:
+        cancel.cancel()
+        progress_canvas.itemconfigure(progress_text, text="Cancelling...")
+
+cancel_button = tk.Button(
+    progress_gui,
+    text="Cancel",
+    relief="flat",
+    borderwidth=0,
+    highlightthickness=0,
+    command=cancel_generation
+)
+
+cancel_button.place(x=660, y=458, width=60, height=24)
+
 # Placeholder code
 
 class TkForge_Entry(tk.Entry):
@@ -180,6 +212,7 @@ def generate():
     output = outpath_input.get()
 
     def generate_code_threaded():
+        global progress, cancel
         nonlocal token, file, output
         if token == "" or token in placeholders:
             clear_token_input(False)
@@ -207,9 +240,22 @@ def generate():
                     return
             
         toggle_gui()
-        code = tk_code(extract_figma_id(file), token, output)
-
-        if code == None:
+        progress, cancel = Progress(), CancelToken()
+        root.after(0, poll_progress, ProgressState())
+
+        try:
+            # Imported on first use so the window opens without loading requests and the generator
+            from tk import tk_code
+            code = tk_code(extract_figma_id(file), token, output, progress=progress, cancel=cancel)
+        except Cancelled:
+            code = False
+        finally:
+            progress = None
+
+        if code == False:
+            messagebox.showinfo('Cancelled', 'The conversion was cancelled.')
+            toggle_gui()
+        elif code == None:
             messagebox.showerror('Invalid token or file', 'The file ID, token or output path that you provided is invalid!')
             toggle_gui()
         elif code == True:
@@ -273,9 +319,14 @@ donate_button = tk.Button(
 
 donate_button.place(x=371, y=446, width=343, height=34)
 
-update = has_update()
-if update == True:
-    messagebox.showinfo('New update!', "Update your version of TkForge to get the latest features! https://github.com/axorax/tkforge/releases")
+def poll_update(update):
+    """Show the update notice once the background check finishes, without blocking startup"""
+    if not update.done():
+        root.after(500, poll_update, update)
+    elif update.result():
+        messagebox.showinfo('New update!', "Update your version of TkForge to get the latest features! https://github.com/axorax/tkforge/releases")
+
+root.after(500, poll_update, check_update_in_background())
 
 root.resizable(False, False)
 root.mainloop()
@@ -0,0 +1,77 @@
+"""Compact intermediate representation passed from core.parse_file to the emitters.
+
+Only what the React and Tk emitters read is kept, so the raw Figma JSON of a frame
+can be released once it is parsed. Tag names, kinds and style keys and values
+repeat across thousands of nodes and are interned.
+"""
+
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+intern = sys.intern
+
+def intern_style(style: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a style dict with interned keys and string values"""
+    return {intern(key): intern(value) if isinstance(value, str) else value for key, value in style.items()}
+
+class Node:
+    """A parsed layer: its element tag, CSS style and content"""
+    __slots__ = ('id', 'name', 'kind', 'tag', 'style', 'text', 'input_type', 'checked',
+                 'image', 'image2x', 'placeholder', 'stroke_color', 'stroke_weight', 'box', 'children', 'component')
+
+    def __init__(self, id: str, name: str, kind: str, tag: str, style: Dict[str, Any], text: str = '',
+                 input_type: str = None, checked: bool = None, stroke_color: str = None, stroke_weight: float = 1):
+        self.id = id
+        self.name = name
+        # First word of the layer name ("button", "textbox" ...), picks the element
+        self.kind = intern(kind)
+        self.tag = intern(tag)
+        self.style = intern_style(style)
+        self.text = text
+        self.input_type = intern(input_type) if input_type else None
+        self.checked = checked
+        self.image: Optional[str] = None
+        self.image2x: Optional[str] = None
+        self.placeholder: Optional[str] = None
+        self.stroke_color = stroke_color
+        self.stroke_weight = stroke_weight
+        # x, y, width, height in the frame, wherever the browser ends up placing the node
+        self.box = (0, 0, 0, 0)
+        # Nested layers, in document (and auto-layout) order
+        self.children: List['Node'] = []
+        # Id of the Figma component this node is an instance (or the master) of
+        self.component: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """Layer name without its leading kind, e.g. the alt text of an image"""
+        return ' '.join(self.name.split(' ')[1:])
+
+    def __repr__(self):
+        return f"Node({self.kind!r}, {self.name!r})"
+
+def walk(nodes: List[Node]) -> Iterator[Node]:
+    """Nodes and their descendants, parents before children"""
+    for node in nodes:
+        yield node
+        if node.children:
+            yield from walk(node.children)
+
+class Frame:
+    """A parsed top-level frame and its nodes, in document order"""
+    __slots__ = ('components', 'width', 'height', 'background_color', 'name', 'index', 'description', 'effects', 'constraints')
+
+    def __init__(self, components: List[Node], width: int, height: int, background_color: str, name: str, index: int,
+                 description: str = '', effects: Dict[str, str] = None, constraints: Dict[str, str] = None):
+        self.components = components
+        self.width = width
+        self.height = height
+        self.background_color = background_color
+        self.name = name
+        self.index = index
+        self.description = description
+        self.effects = effects or {}
+        self.constraints = constraints or {}
+
+    def __repr__(self):
+        return f"Frame({self.name!r}, {len(self.components)} nodes)"
@@ -0,0 +1,116 @@
+"""Translate Figma auto-layout into CSS flexbox and grid.
+
+Children of an auto-layout container are laid out by the browser (gap, padding,
+alignment, hug/fill sizing) instead of being absolutely positioned one by one.
+Absolute positioning remains for frame-level nodes, children of plain groups and
+children Figma itself marks as absolutely positioned.
+"""
+
+from typing import Any, Dict, Optional
+
+JUSTIFY = {'MIN': 'flex-start', 'CENTER': 'center', 'MAX': 'flex-end', 'SPACE_BETWEEN': 'space-between'}
+ALIGN = {'MIN': 'flex-start', 'CENTER': 'center', 'MAX': 'flex-end', 'BASELINE': 'baseline'}
+
+def is_auto_layout(node: Dict[str, Any]) -> bool:
+    return node.get('layoutMode') in ('HORIZONTAL', 'VERTICAL', 'GRID')
+
+def in_flow(node: Dict[str, Any], parent: Optional[Dict[str, Any]]) -> bool:
+    """Whether the browser positions the node as part of its parent's auto-layout"""
+    return parent is not None and is_auto_layout(parent) and node.get('layoutPositioning') != 'ABSOLUTE'
+
+def px(value: float) -> str:
+    return f"{int(round(value))}px"
+
+def sizing(node: Dict[str, Any], parent: Optional[Dict[str, Any]], axis: str) -> str:
+    """FIXED, HUG or FILL sizing of a node along 'HORIZONTAL' or 'VERTICAL'"""
+    explicit = node.get(f"layoutSizing{axis.title()}")
+    if explicit:
+        return explicit
+
+    # Files saved before layoutSizing* existed only have the older properties
+    if parent is not None and is_auto_layout(parent):
+        if parent['layoutMode'] == axis and node.get('layoutGrow') == 1:
+            return 'FILL'
+        if parent['layoutMode'] not in (axis, 'GRID') and node.get('layoutAlign') == 'STRETCH':
+            return 'FILL'
+
+    if node.get('layoutMode') in ('HORIZONTAL', 'VERTICAL'):
+        mode = node.get('primaryAxisSizingMode' if node['layoutMode'] == axis else 'counterAxisSizingMode', 'FIXED')
+        return 'HUG' if mode == 'AUTO' else 'FIXED'
+
+    resize = node.get('textAutoResize')
+    if resize == 'WIDTH_AND_HEIGHT' or (resize == 'HEIGHT' and axis == 'VERTICAL'):
+        return 'HUG'
+    return 'FIXED'
+
+def flow_style(node: Dict[str, Any], parent: Dict[str, Any], bounds: Dict[str, float]) -> Dict[str, str]:
+    """Size of an auto-layout child; its position is left to the browser"""
+    style = {}
+    main = parent['layoutMode']
+
+    for axis, prop in (('HORIZONTAL', 'width'), ('VERTICAL', 'height')):
+        mode = sizing(node, parent, axis)
+        if mode == 'FIXED':
+            style[prop] = px(bounds[prop])
+        elif mode == 'FILL':
+            if axis == main:
+                style['flex'] = '1 1 0'
+                style[f"min{prop.title()}"] = '0'
+            elif main == 'GRID':
+                style[f"{'justify' if axis == 'HORIZONTAL' else 'align'}Self"] = 'stretch'
+            else:
+                style['alignSelf'] = 'stretch'
+
+    # Figma never squeezes fixed children, flex items shrink by default
+    if main != 'GRID' and sizing(node, parent, main) == 'FIXED':
+        style['flexShrink'] = '0'
+
+    return style
+
+def container_style(node: Dict[str, Any]) -> Dict[str, str]:
+    """display, direction, gap, padding and alignment of an auto-layout container"""
+    style = {}
+    mode = node['layoutMode']
+
+    if mode == 'GRID':
+        style['display'] = 'grid'
+        columns = node.get('gridColumnCount', 1)
+        style['gridTemplateColumns'] = f"repeat({columns}, minmax(0, 1fr))"
+        if node.get('gridRowGap'):
+            style['rowGap'] = px(node['gridRowGap'])
+        if node.get('gridColumnGap'):
+            style['columnGap'] = px(node['gridColumnGap'])
+    else:
+        style['display'] = 'flex'
+        style['flexDirection'] = 'row' if mode == 'HORIZONTAL' else 'column'
+        primary = node.get('primaryAxisAlignItems', 'MIN')
+        if primary != 'MIN':
+            style['justifyContent'] = JUSTIFY.get(primary, 'flex-start')
+        # CSS stretches items by default, Figma aligns them to the start
+        style['alignItems'] = ALIGN.get(node.get('counterAxisAlignItems', 'MIN'), 'flex-start')
+        # Gaps are ignored by Figma when items are spaced apart
+        if node.get('itemSpacing') and primary != 'SPACE_BETWEEN':
+            style['gap'] = px(node['itemSpacing'])
+        if node.get('layoutWrap') == 'WRAP':
+            style['flexWrap'] = 'wrap'
+            if node.get('counterAxisSpacing'):
+                style['rowGap' if mode == 'HORIZONTAL' else 'columnGap'] = px(node['counterAxisSpacing'])
+
+    padding = [node.get(f'padding{side}', 0) or 0 for side in ('Top', 'Right', 'Bottom', 'Left')]
+    if any(padding):
+        if padding[0] == padding[2] and padding[1] == padding[3]:
+            style['padding'] = px(padding[0]) if padding[0] == padding[1] else f"{px(padding[0])} {px(padding[1])}"
+        else:
+            style['padding'] = ' '.join(px(p) for p in padding)
+
+    return style
+
+def absolute_style(bounds: Dict[str, float], origin: Dict[str, float]) -> Dict[str, str]:
+    """Pixel position of a node inside the box of its positioned ancestor"""
+    return {
+        'position': 'absolute',
+        'left': px(bounds['x'] - origin['x']),
+        'top': px(bounds['y'] - origin['y']),
+        'width': px(bounds['width']),
+        'height': px(bounds['height'])
+    }
@@ -0,0 +1,119 @@
+"""Dependencies of a generated React app, derived from what its sources import.
+
+Every package a generated file imports is declared, and nothing else: no UI kit
+or animation library unless some component actually uses it.
+"""
+
+import os
+import re
+import json
+from typing import Dict, Iterable, List, Set
+
+# Bare module specifiers of static, side-effect and dynamic imports
+IMPORT = re.compile(r"""(?:^import\b[^'"]*|\bimport\(\s*)['"]([^'"./][^'"]*)['"]""", re.M)
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+
+# Runtime packages the emitters may reference
+VERSIONS = {
+    'react': '^18.2.0',
+    'react-dom': '^18.2.0',
+    'styled-components': '^6.0.7',
+    'framer-motion': '^10.16.1',
+    '@mui/material': '^5.14.5',
+    '@emotion/react': '^11.11.1',
+    '@emotion/styled': '^11.11.0'
+}
+
+# Packages that only work with others installed next to them
+PEERS = {
+    'react-dom': ['react'],
+    'styled-components': ['react', 'react-dom'],
+    'framer-motion': ['react', 'react-dom'],
+    '@mui/material': ['react', 'react-dom', '@emotion/react', '@emotion/styled']
+}
+
+# Type packages for runtime packages that ship without typings
+TYPES = {
+    'react': ('@types/react', '^18.2.21'),
+    'react-dom': ('@types/react-dom', '^18.2.7')
+}
+
+# What `npm run dev` and `npm run build` need whatever the app uses
+BUILD_TOOLS = {
+    '@vitejs/plugin-react': '^4.0.4',
+    'typescript': '^5.2.2',
+    'vite': '^4.4.9'
+}
+
+SCRIPTS = {
+    'dev': 'vite',
+    'start': 'vite',
+    'build': 'tsc && vite build',
+    'preview': 'vite preview'
+}
+
+def package_name(specifier: str) -> str:
+    """Package of a module specifier, 'react-dom/client' -> 'react-dom'"""
+    parts = specifier.split('/')
+    return '/'.join(parts[:2]) if specifier.startswith('@') else parts[0]
+
+def source_packages(sources: Iterable[str]) -> Set[str]:
+    """Packages imported by source texts"""
+    return {package_name(specifier) for source in sources for specifier in IMPORT.findall(source)}
+
+def imported_packages(src_dir: str, recursive: bool = True) -> Set[str]:
+    """Packages imported by the sources of a generated app, or only by those directly in src_dir"""
+    packages = set()
+    for root, dirs, files in os.walk(src_dir):
+        for file in files:
+            if file.endswith(SOURCE_EXTENSIONS):
+                with open(os.path.join(root, file), encoding='utf-8') as f:
+                    packages |= source_packages([f.read()])
+        if not recursive:
+            break
+    return packages
+
+def resolve(packages: Iterable[str]) -> List[str]:
+    """Packages with their peers, sorted"""
+    resolved = set()
+    pending = list(packages)
+    while pending:
+        package = pending.pop()
+        if package not in resolved:
+            resolved.add(package)
+            pending.extend(PEERS.get(package, []))
+    return sorted(resolved)
+
+def package_json(name: str, packages: Iterable[str]) -> Dict[str, object]:
+    """package.json declaring the given runtime packages, their peers, typings and the build tools"""
+    dependencies = {}
+    for package in resolve(packages):
+        if package not in VERSIONS:
+            print(f"Warning: generated code imports unknown package '{package}', declaring it as latest")
+        dependencies[package] = VERSIONS.get(package, 'latest')
+
+    dev_dependencies = dict(TYPES[package] for package in dependencies if package in TYPES)
+    dev_dependencies.update(BUILD_TOOLS)
+
+    return {
+        'name': name,
+        'version': '0.1.0',
+        'private': True,
+        'type': 'module',
+        'scripts': SCRIPTS,
+        'dependencies': dependencies,
+        'devDependencies': dict(sorted(dev_dependencies.items()))
+    }
+
+def write_package_json(app_path: str, packages: Iterable[str] = None, name: str = 'jarvis-interface') -> Dict[str, object]:
+    """Write the package.json of a generated app, for `packages` or else for the packages its sources import"""
+    if packages is None:
+        packages = imported_packages(os.path.join(app_path, 'src'))
+    content = package_json(name, packages)
+    with open(os.path.join(app_path, 'package.json'), 'w') as f:
+        json.dump(content, f, indent=2)
+    return content
+
+def dependency_count(content: Dict[str, object]) -> str:
+    runtime, dev = len(content['dependencies']), len(content['devDependencies'])
+    return f"{runtime + dev} dependencies ({runtime} runtime: {', '.join(content['dependencies'])}; {dev} dev)"
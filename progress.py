@@ -0,0 +1,125 @@
+"""Structured progress events and cancellation for long conversions."""
+
+import sys
+import time
+import queue
+import threading
+from typing import Any, Dict, Optional
+
+class Cancelled(Exception):
+    """Raised inside a conversion once its cancel token has been set"""
+
+class CancelToken:
+    """Thread-safe flag a caller sets to stop a running conversion"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+class Progress:
+    """Publishes progress events as dicts onto a thread-safe queue
+
+    Events: file_fetched (bytes), frames_found (total), nodes_pruned (frame, nodes, bytes),
+    frame_parsed (frame, nodes), image_queued (frame, name), image_done (name, bytes),
+    file_written (path, bytes), done (ok).
+    """
+
+    def __init__(self, events: Optional[queue.Queue] = None):
+        self.events = events if events is not None else queue.Queue()
+
+    def publish(self, event: str, **data: Any):
+        self.events.put({'event': event, 'time': time.monotonic(), **data})
+
+def publish(progress: Optional[Progress], event: str, **data: Any):
+    """Publish an event if the caller asked for progress"""
+    if progress is not None:
+        progress.publish(event, **data)
+
+def check(cancel: Optional[CancelToken]):
+    """Raise Cancelled if the caller cancelled the conversion"""
+    if cancel is not None and cancel.cancelled:
+        raise Cancelled()
+
+class ProgressState:
+    """Running totals folded from the event stream"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.frames_total = 0
+        self.frames = 0
+        self.images_queued = 0
+        self.images = 0
+        self.bytes = 0
+        self.files = 0
+        self.pruned = 0
+
+    def update(self, event: Dict[str, Any]):
+        kind = event['event']
+        if kind == 'frames_found':
+            self.frames_total = event['total']
+        elif kind == 'nodes_pruned':
+            self.pruned += event['nodes']
+        elif kind == 'frame_parsed':
+            self.frames += 1
+        elif kind == 'image_queued':
+            self.images_queued += 1
+        elif kind == 'image_done':
+            self.images += 1
+            self.bytes += event.get('bytes', 0)
+        elif kind == 'file_written':
+            self.files += 1
+            self.bytes += event.get('bytes', 0)
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = self.bytes / elapsed
+        line = f"frames {self.frames}/{self.frames_total}  images {self.images}/{self.images_queued}  files {self.files}  {self.bytes / 1e6:.1f} MB  {rate / 1e6:.2f} MB/s"
+        if self.pruned:
+            line += f"  pruned {self.pruned}"
+
+        # Images dominate the run time, so estimate the remainder from their rate
+        remaining = self.images_queued - self.images
+        if self.images and remaining > 0:
+            line += f"  ETA {remaining * elapsed / self.images:.0f}s"
+        return line
+
+class ProgressLine:
+    """Renders a live, single-line progress summary for the CLI from a background thread"""
+
+    def __init__(self, progress: Progress, stream=None, interval: float = 0.2):
+        self.progress = progress
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.state = ProgressState()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._drain()
+        self.stream.write(f"\r{self.state.summary()}\n")
+        self.stream.flush()
+
+    def _drain(self):
+        while True:
+            try:
+                self.state.update(self.progress.events.get_nowait())
+            except queue.Empty:
+                return
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._drain()
+            self.stream.write(f"\r{self.state.summary()}\033[K")
+            self.stream.flush()
@@ -0,0 +1,103 @@
+"""Early pruning of layers that cannot show up in the output.
+
+Runs on each list of siblings before anything is styled, downloaded or emitted:
+hidden layers, layers that paint nothing, zero-area layers and layers masked away
+are dropped with their whole subtree. Rules can be switched off one by one.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import codec
+from spatial import bounds, intersects
+
+# occluded and outside are applied by spatial.cull
+PRUNE_RULES = ('hidden', 'transparent', 'empty', 'masked', 'occluded', 'outside')
+
+def prune_rules(keep: Iterable[str] = ()) -> FrozenSet[str]:
+    """Rules in effect when the layers matched by `keep` are kept"""
+    return frozenset(PRUNE_RULES) - set(keep or ())
+
+def visible_paint(paint: Dict[str, Any]) -> bool:
+    if not paint.get('visible', True) or paint.get('opacity', 1) <= 0:
+        return False
+    if paint.get('type') == 'SOLID':
+        return paint.get('color', {}).get('a', 1) > 0
+    if paint.get('type', '').startswith('GRADIENT'):
+        return any(stop['color'].get('a', 1) > 0 for stop in paint.get('gradientStops', []))
+    return True
+
+def paints(node: Dict[str, Any]) -> bool:
+    """Whether a layer draws anything itself: a visible fill, stroke or effect"""
+    if node.get('type') == 'TEXT' and not node.get('characters'):
+        return False
+    if any(visible_paint(fill) for fill in node.get('fills', [])):
+        return True
+    if node.get('strokeWeight', 1) > 0 and any(visible_paint(stroke) for stroke in node.get('strokes', [])):
+        return True
+    return any(effect.get('visible', True) for effect in node.get('effects', []))
+
+def prune_reason(node: Dict[str, Any], rules: FrozenSet[str], interactive: bool = False) -> Optional[str]:
+    """The rule dropping a layer, or None to keep it
+
+    Interactive elements (inputs, buttons ...) do something even when they draw
+    nothing, only hiding them removes them.
+    """
+    if 'hidden' in rules and (node.get('visible', True) is False or node.get('opacity', 1) <= 0):
+        return 'hidden'
+    if interactive:
+        return None
+
+    box = node.get('absoluteBoundingBox') or {}
+    width, height = box.get('width', 1), box.get('height', 1)
+    # Lines have no area, only their stroke
+    if 'empty' in rules and ((width <= 0 and height <= 0) or (width * height <= 0 and not paints(node))):
+        return 'empty'
+    if 'transparent' in rules and not node.get('children') and not paints(node):
+        return 'transparent'
+    return None
+
+def subtree_size(node: Dict[str, Any]) -> Tuple[int, int]:
+    """Layers and JSON bytes of a subtree"""
+    layers, stack = 0, [node]
+    while stack:
+        layer = stack.pop()
+        layers += 1
+        stack.extend(layer.get('children', []))
+    return layers, len(codec.dumps(node))
+
+def record(stats: Dict[str, List[int]], rule: str, node: Dict[str, Any]):
+    layers, size = subtree_size(node)
+    entry = stats.setdefault(rule, [0, 0])
+    entry[0] += layers
+    entry[1] += size
+
+def prune(children: List[Dict[str, Any]], rules: FrozenSet[str], stats: Dict[str, List[int]],
+          interactive=lambda node: False) -> List[Dict[str, Any]]:
+    """Siblings left once the pruning rules are applied, adding the dropped layers and bytes to `stats`
+
+    A mask layer is not drawn itself, it clips the siblings above it: those entirely
+    outside of it go as well.
+    """
+    kept = []
+    mask = None
+
+    for node in children:
+        rule = prune_reason(node, rules, interactive(node))
+        if rule is None and 'masked' in rules:
+            box = bounds(node)
+            if node.get('isMask'):
+                mask, rule = box, 'masked'
+            elif mask is not None and box is not None and not intersects(mask, box):
+                rule = 'masked'
+        if rule is None:
+            kept.append(node)
+        else:
+            record(stats, rule, node)
+
+    return kept
+
+def prune_summary(stats: Dict[str, List[int]]) -> str:
+    layers = sum(entry[0] for entry in stats.values())
+    size = sum(entry[1] for entry in stats.values())
+    rules = ', '.join(f'{rule} {entry[0]}' for rule, entry in sorted(stats.items(), key=lambda item: -item[1][0]))
+    return f"Pruned {layers} layers ({size / 1024:.0f} KB of JSON): {rules}"
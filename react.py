@@ -1,17 +1,220 @@
 """React code generation module."""
 
 import os
+import re
 import json
-from typing import Dict, List, Any
+import contextvars
+from typing import Dict, List, Any, Set, Tuple
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
+from themes import DEFAULT_THEME, get_theme, theme_imports
+from utils import pixels
+from fonts import FONTS_DIR, build_fonts, font_face_css, preload_links, write_fonts
+from packages import dependency_count, imported_packages, source_packages, write_package_json
+from ir import Frame, Node, walk
+from progress import Cancelled, check, publish
+from tracing import span
+
+VOID_TAGS = {'img', 'input', 'hr'}
+BUCKET_SIZE = 512
+# Folder of src/components holding one component per reused Figma component
+SHARED_DIR = 'shared'
+# Identifiers the generated frame and App files declare or import themselves
+RESERVED_NAMES = {'React', 'Frame', 'VirtualFrame', 'VirtualNode', 'App', 'AppContainer', 'Suspense', 'Page'}
+# Style that depends on where a node is used rather than on what it is
+PLACEMENT = {'position', 'left', 'top', 'right', 'bottom', 'transform', 'width', 'height', 'maxWidth',
+             'minWidth', 'minHeight', 'flex', 'flexShrink', 'alignSelf', 'justifySelf', 'zIndex'}
+
+VIRTUAL_FRAME_RUNTIME = """import React, { useEffect, useRef, useState } from 'react'
+
+export interface VirtualNode {
+  Component: React.ComponentType
+  bounds: [number, number, number, number] | null
+}
+
+interface VirtualFrameProps {
+  nodes: VirtualNode[]
+  buckets: Record<string, number[]>
+  bucketSize: number
+  height: number
+  overscan?: number
+  className?: string
+}
+
+const sameIndices = (a: number[], b: number[]) => a.length === b.length && a.every((value, i) => value === b[i])
+
+const VirtualFrame: React.FC<VirtualFrameProps> = ({ nodes, buckets, bucketSize, height, overscan = 256, className }) => {
+  const ref = useRef<HTMLDivElement>(null)
+  const [visible, setVisible] = useState<number[]>([])
+
+  useEffect(() => {
+    let scheduled = 0
+
+    const update = () => {
+      scheduled = 0
+      const element = ref.current
+      if (!element) return
+
+      // Viewport expressed in frame coordinates, grown by the overscan margin
+      const rect = element.getBoundingClientRect()
+      const left = -rect.left - overscan
+      const top = -rect.top - overscan
+      const right = window.innerWidth - rect.left + overscan
+      const bottom = window.innerHeight - rect.top + overscan
+
+      const found = new Set<number>()
+      nodes.forEach((node, index) => node.bounds === null && found.add(index))
+
+      if (right > 0 && bottom > 0) {
+        for (let col = Math.floor(Math.max(left, 0) / bucketSize); col <= Math.floor(right / bucketSize); col++) {
+          for (let row = Math.floor(Math.max(top, 0) / bucketSize); row <= Math.floor(bottom / bucketSize); row++) {
+            for (const index of buckets[`${col}:${row}`] ?? []) {
+              const [x, y, w, h] = nodes[index].bounds!
+              if (x < right && x + w > left && y < bottom && y + h > top) found.add(index)
+            }
+          }
+        }
+      }
+
+      // Keep document order so the stacking of absolutely positioned nodes is unchanged
+      const next = Array.from(found).sort((a, b) => a - b)
+      setVisible((current) => (sameIndices(current, next) ? current : next))
+    }
+
+    const schedule = () => {
+      if (!scheduled) scheduled = window.requestAnimationFrame(update)
+    }
+
+    update()
+    window.addEventListener('scroll', schedule, { passive: true, capture: true })
+    window.addEventListener('resize', schedule, { passive: true })
+    return () => {
+      window.cancelAnimationFrame(scheduled)
+      window.removeEventListener('scroll', schedule, { capture: true })
+      window.removeEventListener('resize', schedule)
+    }
+  }, [nodes, buckets, bucketSize, overscan])
+
+  return (
+    <div
+      ref={ref}
+      className={className}
+      style={{
+        position: 'relative',
+        width: '100%',
+        height,
+        contain: 'layout paint',
+        contentVisibility: 'auto',
+        containIntrinsicSize: `auto ${height}px`
+      }}
+    >
+      {visible.map((index) => {
+        const { Component } = nodes[index]
+        return <Component key={index} />
+      })}
+    </div>
+  )
+}
+
+export default VirtualFrame
+"""
 
-def create_react_app(output_path: str):
-    """Create a React app structure with cyberpunk theme"""
+def clean_output(output_path: str):
+    """Remove a previously generated app while keeping the downloaded assets"""
+    for entry in os.listdir(output_path):
+        path = os.path.join(output_path, entry)
+        if entry == 'src':
+            for sub in os.listdir(path):
+                if sub == 'assets':
+                    continue
+                sub_path = os.path.join(path, sub)
+                shutil.rmtree(sub_path) if os.path.isdir(sub_path) else os.remove(sub_path)
+        elif os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+def component_name(name: str, used: Set[str]) -> str:
+    """Turn a Figma layer name into a unique PascalCase component name"""
+    parts = re.findall(r'[A-Za-z0-9]+', name)
+    ident = ''.join(part[:1].upper() + part[1:] for part in parts) or 'Component'
+    if ident[0].isdigit():
+        ident = f'Component{ident}'
+
+    base, n = ident, 2
+    while ident in used:
+        ident = f'{base}{n}'
+        n += 1
+    used.add(ident)
+    return ident
+
+@lru_cache(maxsize=None)
+def css_property(key: str) -> str:
+    """CSS name of a style key, backgroundColor -> background-color"""
+    return re.sub('([A-Z])', lambda m: '-' + m.group(1).lower(), key)
+
+def css_block(styles: Dict[str, Any]) -> str:
+    """Render a style dict as CSS declarations for a styled-components block"""
+    return '\n  '.join(f"{css_property(k)}: {v};" for k, v in styles.items())
+
+def route_path(name: str) -> str:
+    """Turn a frame component name into a kebab-case route path"""
+    return re.sub('([a-z0-9])([A-Z])', r'\1-\2', name).lower()
+
+def vite_config(frame_names: List[str] = None, dependencies: List[str] = None) -> str:
+    """Generate vite.config.ts, splitting each frame into its own chunk when routed
+
+    The dev server pre-bundles the declared dependencies up front instead of
+    discovering them while the first page loads.
+    """
+    chunks = ''
+    optimize = ''
+
+    if dependencies:
+        optimize = f"""
+  optimizeDeps: {{
+    include: {json.dumps(dependencies)}
+  }},"""
+
+    if frame_names:
+        chunks = f"""
+    rollupOptions: {{
+      output: {{
+        manualChunks(id: string) {{
+          if (id.includes('/node_modules/')) return 'vendor'
+          const frame = {json.dumps(frame_names)}.find(
+            (name) => id.includes(`/src/components/${{name}}/`) || id.endsWith(`/src/components/${{name}}.tsx`)
+          )
+          return frame ? `frame-${{frame}}` : undefined
+        }}
+      }}
+    }},"""
+
+    return f"""import {{ defineConfig }} from 'vite'
+import react from '@vitejs/plugin-react'
+
+export default defineConfig({{
+  plugins: [react()],{optimize}
+  server: {{
+    port: 5173,
+    open: true
+  }},
+  build: {{
+    outDir: 'build',{chunks}
+    sourcemap: true
+  }}
+}})"""
+
+def create_react_app(output_path: str, theme: str = DEFAULT_THEME, fonts: List[Dict[str, Any]] = None):
+    """Create a React app structure with the selected runtime theme and self-hosted fonts"""
     try:
+        theme = get_theme(theme)
+        
         # Clean up any existing files
         if os.path.exists(output_path):
-            shutil.rmtree(output_path)
+            clean_output(output_path)
         
         # Create directory structure
         os.makedirs(output_path, exist_ok=True)
@@ -21,66 +224,6 @@ def create_react_app(output_path: str):
         os.makedirs(os.path.join(output_path, 'src', 'assets'), exist_ok=True)
         os.makedirs(os.path.join(output_path, 'src', 'styles'), exist_ok=True)
         
-        # Create package.json
-        package_json = {
-            "name": "jarvis-interface",
-            "version": "0.1.0",
-            "private": True,
-            "type": "module",
-            "dependencies": {
-                "react": "^18.2.0",
-                "react-dom": "^18.2.0",
-                "styled-components": "^6.0.7",
-                "framer-motion": "^10.16.1",
-                "@mui/material": "^5.14.5",
-                "@emotion/react": "^11.11.1",
-                "@emotion/styled": "^11.11.0"
-            },
-            "scripts": {
-                "dev": "vite",
-                "build": "tsc && vite build",
-                "serve": "vite preview",
-                "lint": "eslint src --ext ts,tsx",
-                "format": "prettier --write 'src/**/*.{ts,tsx}'",
-                "test": "vitest"
-            },
-            "devDependencies": {
-                "@types/react": "^18.2.21",
-                "@types/react-dom": "^18.2.7",
-                "@types/styled-components": "^5.1.26",
-                "@typescript-eslint/eslint-plugin": "^6.5.0",
-                "@typescript-eslint/parser": "^6.5.0",
-                "@vitejs/plugin-react": "^4.0.4",
-                "eslint": "^8.48.0",
-                "prettier": "^3.0.3",
-                "typescript": "^5.2.2",
-                "vite": "^4.4.9",
-                "vitest": "^0.34.3"
-            }
-        }
-        
-        with open(os.path.join(output_path, 'package.json'), 'w') as f:
-            json.dump(package_json, f, indent=2)
-        
-        # Create vite.config.ts
-        vite_config = """import { defineConfig } from 'vite'
-import react from '@vitejs/plugin-react'
-
-export default defineConfig({
-  plugins: [react()],
-  server: {
-    port: 5173,
-    open: true
-  },
-  build: {
-    outDir: 'build',
-    sourcemap: true
-  }
-})"""
-        
-        with open(os.path.join(output_path, 'vite.config.ts'), 'w') as f:
-            f.write(vite_config)
-        
         # Create tsconfig.json
         tsconfig = {
             "compilerOptions": {
@@ -122,14 +265,15 @@ export default defineConfig({
         with open(os.path.join(output_path, 'tsconfig.node.json'), 'w') as f:
             json.dump(tsconfig_node, f, indent=2)
         
-        # Create index.html
-        index_html = """<!DOCTYPE html>
+        # Create index.html, preloading the most used self-hosted fonts
+        fonts = fonts or []
+        preloads = ''.join(f"\n    {link}" for link in preload_links(fonts))
+        index_html = f"""<!DOCTYPE html>
 <html lang="en">
   <head>
     <meta charset="UTF-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>JARVIS Interface</title>
-    <link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;500;600;700&family=Rajdhani:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <title>JARVIS Interface</title>{preloads}
   </head>
   <body>
     <div id="root"></div>
@@ -141,37 +285,11 @@ export default defineConfig({
             f.write(index_html)
         
         # Create main.tsx
-        main_tsx = """import React from 'react'
+        font_import = "import './styles/fonts.css'\n" if fonts else ''
+        main_tsx = f"""import React from 'react'
 import ReactDOM from 'react-dom/client'
 import App from './App'
-import './styles/index.css'
-import './styles/cyberpunk.css'
-
-// Create particles
-const createParticles = () => {
-  const particles = document.querySelector('.particles')
-  for (let i = 0; i < 50; i++) {
-    const particle = document.createElement('div')
-    particle.className = 'particle'
-    particle.style.left = `${Math.random() * 100}%`
-    particle.style.top = `${Math.random() * 100}%`
-    particle.style.animationDelay = `${Math.random() * 3}s`
-    particles?.appendChild(particle)
-  }
-}
-
-// Custom cursor
-const updateCursor = (e: MouseEvent) => {
-  const cursor = document.querySelector('.cursor')
-  if (cursor) {
-    cursor.setAttribute('style', `top: ${e.pageY - 10}px; left: ${e.pageX - 10}px;`)
-  }
-}
-
-// Initialize effects
-document.addEventListener('DOMContentLoaded', createParticles)
-document.addEventListener('mousemove', updateCursor)
-
+{theme_imports(theme)}{font_import}{theme['effects']}
 ReactDOM.createRoot(document.getElementById('root')!).render(
   <React.StrictMode>
     <App />
@@ -181,42 +299,35 @@ ReactDOM.createRoot(document.getElementById('root')!).render(
         with open(os.path.join(output_path, 'src', 'main.tsx'), 'w') as f:
             f.write(main_tsx)
         
+        # Create vite-env.d.ts so asset imports type-check
+        with open(os.path.join(output_path, 'src', 'vite-env.d.ts'), 'w') as f:
+            f.write('/// <reference types="vite/client" />\n')
+        
         # Create App.tsx
-        app_tsx = """import React from 'react'
+        layers = ''.join(f"      {layer}\n" for layer in theme['layers'])
+        overlays = ''.join(f"      {layer}\n" for layer in theme['overlays'])
+        app_tsx = f"""import React from 'react'
 import styled from 'styled-components'
-import './styles/index.css'
-import './styles/cyberpunk.css'
-
+{theme_imports(theme)}
 const AppContainer = styled.div`
   min-height: 100vh;
   display: flex;
   flex-direction: column;
   align-items: center;
   justify-content: center;
-  background-color: var(--dark-bg);
-  color: var(--neon-blue);
+  background-color: var(--app-bg);
+  color: var(--app-fg);
   position: relative;
   overflow: hidden;
 `
 
-const App: React.FC = () => {
+const App: React.FC = () => {{
   return (
     <AppContainer>
-      <div className="cyber-grid" />
-      <div className="particles" />
-      <div className="cursor" />
-      <motion.h1
-        initial={{ opacity: 0, y: -20 }}
-        animate={{ opacity: 1, y: 0 }}
-        transition={{ duration: 0.8 }}
-        className="glow"
-      >
-        JARVIS Interface
-      </motion.h1>
-      <div className="scan-line" />
-    </AppContainer>
+{layers}      <h1 className="glow">JARVIS Interface</h1>
+{overlays}    </AppContainer>
   )
-}
+}}
 
 export default App"""
         
@@ -224,242 +335,543 @@ export default App"""
             f.write(app_tsx)
         
         # Create styles
-        index_css = """
-:root {
-  --neon-blue: #00f3ff;
-  --neon-purple: #9d00ff;
-  --neon-pink: #ff00f7;
-  --dark-bg: #0a0a0f;
-  --grid-color: rgba(0, 243, 255, 0.1);
-}
-
-body {
-  margin: 0;
-  font-family: 'Rajdhani', 'Orbitron', sans-serif;
-  -webkit-font-smoothing: antialiased;
-  -moz-osx-font-smoothing: grayscale;
-  background-color: var(--dark-bg);
-}"""
-        
         with open(os.path.join(output_path, 'src', 'styles', 'index.css'), 'w') as f:
-            f.write(index_css)
+            f.write(theme['index_css'])
         
-        # Create cyberpunk.css
-        cyberpunk_css = """
-.cyber-grid {
-  position: fixed;
-  top: 0;
-  left: 0;
-  width: 100vw;
-  height: 100vh;
-  background-image: 
-    linear-gradient(var(--grid-color) 1px, transparent 1px),
-    linear-gradient(90deg, var(--grid-color) 1px, transparent 1px);
-  background-size: 30px 30px;
-  z-index: -1;
-  animation: gridMove 20s linear infinite;
-}
-
-@keyframes gridMove {
-  from { transform: translateY(0); }
-  to { transform: translateY(30px); }
-}
-
-.glow {
-  text-shadow: 0 0 10px var(--neon-blue),
-               0 0 20px var(--neon-blue),
-               0 0 30px var(--neon-blue);
-  animation: pulse 2s infinite;
-}
-
-@keyframes pulse {
-  0% { opacity: 1; }
-  50% { opacity: 0.7; }
-  100% { opacity: 1; }
-}
-
-.scan-line {
-  position: absolute;
-  width: 100%;
-  height: 2px;
-  background: var(--neon-blue);
-  opacity: 0.5;
-  animation: scan 2s linear infinite;
-}
-
-@keyframes scan {
-  from { transform: translateY(-100vh); }
-  to { transform: translateY(100vh); }
-}
-
-.particles {
-  position: fixed;
-  top: 0;
-  left: 0;
-  width: 100%;
-  height: 100%;
-  pointer-events: none;
-  z-index: -1;
-}
-
-.particle {
-  position: absolute;
-  background: var(--neon-blue);
-  width: 2px;
-  height: 2px;
-  border-radius: 50%;
-  animation: float 3s infinite;
-}
-
-@keyframes float {
-  0% { transform: translateY(0) translateX(0); }
-  50% { transform: translateY(-20px) translateX(10px); }
-  100% { transform: translateY(0) translateX(0); }
-}
+        if theme['stylesheet'] is not None:
+            with open(os.path.join(output_path, 'src', 'styles', 'theme.css'), 'w') as f:
+                f.write(theme['stylesheet'])
 
-.cursor {
-  width: 20px;
-  height: 20px;
-  border: 2px solid var(--neon-blue);
-  border-radius: 50%;
-  position: fixed;
-  pointer-events: none;
-  z-index: 9999;
-  mix-blend-mode: screen;
-  animation: cursorPulse 2s infinite;
-}
+        if fonts:
+            with open(os.path.join(output_path, 'src', 'styles', 'fonts.css'), 'w') as f:
+                f.write(font_face_css(fonts))
+            write_fonts(fonts, output_path)
 
-@keyframes cursorPulse {
-  0% { transform: scale(1); }
-  50% { transform: scale(1.5); }
-  100% { transform: scale(1); }
-}"""
-        
-        with open(os.path.join(output_path, 'src', 'styles', 'cyberpunk.css'), 'w') as f:
-            f.write(cyberpunk_css)
+        # Declare only the packages the sources import
+        package = write_package_json(output_path)
+        with open(os.path.join(output_path, 'vite.config.ts'), 'w') as f:
+            f.write(vite_config(dependencies=list(package['dependencies'])))
         
         return True
     except Exception as e:
         print(f"Error creating React app: {str(e)}")
         return False
 
-def react_code(figma_data: List[Dict[str, Any]], output_path: str = None) -> bool:
-    """Generate React components from Figma data"""
-    try:
-        base_path = output_path if output_path else '.'
-        
-        # Create React app structure
-        if not create_react_app(base_path):
-            return False
-            
-        # Generate components from figma_data
-        components_dir = os.path.join(base_path, 'src', 'components')
-        os.makedirs(components_dir, exist_ok=True)
-        
-        for frame_data in figma_data:
-            frame_name = frame_data['frame']['name'].replace(' ', '')
-            frame_bg = frame_data['frame'].get('backgroundColor', '#ffffff')
-            
-            # Create frame component
-            frame_component = f"""import React from 'react'
+def image_props(component: Node, src: str = 'src', src2x: str = 'src2x', indent: str = '      ', prop: bool = False) -> str:
+    """Build the lazy-loading, dimension-hinted attributes of an image element, whose src may come from a prop"""
+    props = []
+
+    if component.image or prop:
+        props.append(f'src={{{src}}}')
+        if component.image2x:
+            props.append(f'srcSet={{`${{{src}}} 1x, ${{{src2x}}} 2x`}}')
+
+    props.append(f"width={{{component.box[2]}}}")
+    props.append(f"height={{{component.box[3]}}}")
+    props.append(f"alt={json.dumps(component.label)}")
+    props.append('loading="lazy"')
+    props.append('decoding="async"')
+
+    if component.placeholder:
+        props.append("onLoad={(e) => { e.currentTarget.style.backgroundImage = 'none' }}")
+
+    return ''.join(f'\n{indent}{prop}' for prop in props)
+
+def prop_name(name: str, used: Set[str]) -> str:
+    """Turn a layer name into a unique camelCase prop name"""
+    ident = component_name(name, used)
+    return ident[0].lower() + ident[1:]
+
+def shape(node: Node, root: bool = True) -> tuple:
+    """Everything about a subtree except where it is placed, its text and its image files"""
+    style = tuple((key, value) for key, value in node.style.items() if not (root and key in PLACEMENT))
+    return (node.tag, node.input_type, style, tuple(shape(child, False) for child in node.children))
+
+def shared_components(frames: List[Frame]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Find the Figma components used more than once and what each instance overrides
+
+    Instances of a component with the same shape share one React component, the
+    first one found being its master. Text and images that differ between them
+    become props. Returns the masters by component name and the uses by instance id.
+    """
+    groups = {}
+
+    def collect(nodes: List[Node]):
+        for node in nodes:
+            if node.component:
+                # Nested instances are part of their outer component
+                groups.setdefault((node.component, shape(node)), []).append(node)
+            elif node.children:
+                collect(node.children)
+
+    for frame_data in frames:
+        collect(frame_data.components)
+
+    masters = {}
+    uses = {}
+    used = set(RESERVED_NAMES)
+
+    for instances in groups.values():
+        if len(instances) < 2:
+            continue
+        master = instances[0]
+        name = component_name(master.name, used)
+        nodes = list(walk([master]))
+        trees = [list(walk([instance])) for instance in instances]
+        props = {}
+        prop_names = {'ClassName', 'Children', 'Key', 'Ref'}
+
+        for index, node in enumerate(nodes):
+            if any(tree[index].text != node.text for tree in trees):
+                props[node.id] = {'text': prop_name(node.name, prop_names)}
+            elif node.tag == 'img' and any((tree[index].image, tree[index].image2x) != (node.image, node.image2x) for tree in trees):
+                base = prop_name(node.name, prop_names)
+                props[node.id] = {'src': f'{base}Src', 'src2x': f'{base}Src2x'}
+
+        masters[name] = {'node': master, 'props': props}
+
+        for tree in trees:
+            use = {'name': name, 'text': {}, 'images': {}}
+            for index, node in enumerate(nodes):
+                override, other = props.get(node.id), tree[index]
+                if not override:
+                    continue
+                if 'text' in override and other.text != node.text:
+                    use['text'][override['text']] = other.text
+                # An instance whose render failed to download keeps the master's image
+                elif 'src' in override and other.image and (other.image, other.image2x) != (node.image, node.image2x):
+                    use['images'][override['src']] = other.image
+                    # The master's srcSet needs a 2x file, the 1x one stands in when there is no 2x render
+                    if node.image2x:
+                        use['images'][override['src2x']] = other.image2x or other.image
+            uses[tree[0].id] = use
+
+    return masters, uses
+
+def instance_code(node: Node, use: Dict[str, Any], ident: str, indent: str, shared: str, assets: str) -> Tuple[str, str, str]:
+    """Imports, placement wrapper and element of an instance of a shared component"""
+    imports = f"import {use['name']} from '{shared}/{use['name']}'\n"
+    attrs = ''
+
+    for prop, text in use['text'].items():
+        attrs += f' {prop}={{{json.dumps(text)}}}'
+    for prop, path in use['images'].items():
+        imports += f"import {ident}_{prop} from '{assets}/{path}'\n"
+        attrs += f' {prop}={{{ident}_{prop}}}'
+
+    placement = {key: value for key, value in node.style.items() if key in PLACEMENT}
+    block = f"""const {ident} = styled({use['name']})`
+  {css_block(placement)}
+`
+"""
+    return imports, block, f"{indent}<{ident}{attrs} />"
+
+def component_code(component: Node, comp_name: str, uses: Dict[str, Any] = None, props: Dict[str, Dict[str, str]] = None) -> str:
+    """Generate the source of a component file, nested layers included
+
+    Instances listed in `uses` render their shared component. With `props` the file
+    is such a shared component: its placement comes from the caller's className and
+    the listed nodes take their text or image from props.
+    """
+    uses = uses or {}
+    shared = props is not None
+    imports = ''
+    blocks = []
+    defaults = []
+    images = 0
+    used = {comp_name}
+
+    def element(node: Node, depth: int) -> str:
+        nonlocal imports, images
+        tag = node.tag
+        root = not blocks
+        styles = {key: value for key, value in node.style.items() if not (root and shared and key in PLACEMENT)}
+        # Nested layers are named after themselves, unique within the file
+        ident = f'Styled{component_name(node.name, used) if blocks else comp_name}'
+        # Parents are declared before their children
+        index = len(blocks)
+        blocks.append('')
+        indent = '  ' * (depth + 2)
+        attrs = ' className={className}' if root and shared else ''
+        override = (props or {}).get(node.id, {})
+
+        if not root and node.id in uses:
+            use_imports, blocks[index], markup = instance_code(node, uses[node.id], ident, indent, f'../{SHARED_DIR}', '../../assets')
+            imports += ''.join(line for line in use_imports.splitlines(True) if line not in imports)
+            return markup
+
+        if tag == 'img':
+            images += 1
+            src, src2x = ('src', 'src2x') if images == 1 else (f'src{images}', f'src{images}_2x')
+            if node.image:
+                imports += f"import {src} from '../../assets/{node.image}'\n"
+            if node.image2x:
+                imports += f"import {src2x} from '../../assets/{node.image2x}'\n"
+            if 'src' in override:
+                # A render that failed to download leaves nothing imported to default to
+                defaults.append((override['src'], src if node.image else None))
+                if node.image2x:
+                    defaults.append((override['src2x'], src2x))
+                src, src2x = override['src'], override['src2x']
+            if node.placeholder:
+                styles['backgroundImage'] = f'url("{node.placeholder}")'
+                styles['backgroundSize'] = 'cover'
+            attrs += image_props(node, src, src2x, indent + '  ', 'src' in override)
+        elif tag == 'input':
+            attrs += f' type="{node.input_type or "text"}"'
+
+        blocks[index] = f"""const {ident} = styled.{tag}`
+  {css_block(styles)}
+`
+"""
+
+        if tag in VOID_TAGS:
+            closing = f'\n{indent}/>' if tag == 'img' else ' />'
+            return f"{indent}<{ident}{attrs}{closing}"
+
+        content = ''
+        if 'text' in override:
+            defaults.append((override['text'], json.dumps(node.text)))
+            content = f"{indent}  {{{override['text']}}}\n"
+        elif node.text:
+            content = f'{indent}  {{{json.dumps(node.text)}}}\n'
+        content += ''.join(f'{element(child, depth + 1)}\n' for child in node.children)
+        if not content:
+            return f"{indent}<{ident}{attrs} />"
+        return f"""{indent}<{ident}{attrs}>
+{content}{indent}</{ident}>"""
+
+    markup = element(component, 0)
+    styled = '\n'.join(blocks)
+
+    if shared:
+        fields = ''.join(f"  {prop}?: string\n" for prop, _ in defaults)
+        params = ', '.join(['className'] + [prop if value is None else f'{prop} = {value}' for prop, value in defaults])
+        signature = f"""interface {comp_name}Props {{
+  className?: string
+{fields}}}
+
+const {comp_name}: React.FC<{comp_name}Props> = ({{ {params} }}) => {{"""
+    else:
+        signature = f"const {comp_name}: React.FC = () => {{"
+
+    return f"""import React from 'react'
 import styled from 'styled-components'
+{imports}
+{styled}
+{signature}
+  return (
+{markup}
+  )
+}}
+
+export default {comp_name}"""
 
+def frame_imports(frame_name: str, comp_names: List[str], local: Dict[str, Tuple[str, str]]) -> str:
+    """Imports of a frame's node components and the definitions kept in the frame file"""
+    lines = [f"import {name} from './{frame_name}/{name}'\n" for name in comp_names if name not in local]
+    for use_imports, _ in local.values():
+        lines += use_imports.splitlines(True)
+    definitions = ''.join(f'\n{definition}' for _, definition in local.values())
+    return ''.join(dict.fromkeys(lines)) + definitions
+
+def frame_code(frame_data: Frame, frame_name: str, comp_names: List[str], local: Dict[str, Tuple[str, str]] = None) -> str:
+    """Generate a frame component that mounts all of its children at once"""
+    imports = frame_imports(frame_name, comp_names, local or {})
+    children = ''.join(f"      <{name} />\n" for name in comp_names)
+
+    return f"""import React from 'react'
+import styled from 'styled-components'
+{imports}
 const Frame = styled.div`
   position: relative;
   width: 100%;
-  height: 100vh;
-  background-color: {frame_bg};
+  height: {frame_data.height}px;
+  background-color: {frame_data.background_color};
   overflow: hidden;
 `
 
 const {frame_name}: React.FC = () => {{
   return (
     <Frame>
-      {{components.map((comp, index) => (
-        <Component key={{{{index}}}} {{...comp}} />
-      ))}}
-    </Frame>
+{children}    </Frame>
   )
 }}
 
 export default {frame_name}"""
-            
-            with open(os.path.join(components_dir, f'{frame_name}.tsx'), 'w') as f:
-                f.write(frame_component)
-            
-            # Create components for each element in the frame
-            for component in frame_data['components']:
-                comp_name = component['name'].replace(' ', '')
-                styles = component['style']
-                style_string = '\n  '.join([f'{k}: {v};' for k, v in styles.items()])
-                
-                component_code = f"""import React from 'react'
+
+def spatial_buckets(bounds: List[Any], size: int = BUCKET_SIZE) -> Dict[str, List[int]]:
+    """Index node bounds into a grid of size x size buckets keyed by 'col:row'"""
+    buckets = {}
+
+    for index, box in enumerate(bounds):
+        if box is None:
+            continue
+        x, y, width, height = box
+        for col in range(x // size, (x + max(width, 1) - 1) // size + 1):
+            for row in range(y // size, (y + max(height, 1) - 1) // size + 1):
+                buckets.setdefault(f'{col}:{row}', []).append(index)
+
+    return buckets
+
+def virtual_frame_code(frame_data: Frame, frame_name: str, comp_names: List[str], local: Dict[str, Tuple[str, str]] = None) -> str:
+    """Generate a frame component that only mounts the nodes intersecting the viewport"""
+    imports = frame_imports(frame_name, comp_names, local or {})
+    bounds = []
+
+    for component in frame_data.components:
+        style = component.style
+        if all(str(style.get(key, '')).endswith('px') for key in ('left', 'top', 'width', 'height')):
+            bounds.append(tuple(pixels(style[key]) for key in ('left', 'top', 'width', 'height')))
+        else:
+            # Percentage or right/bottom anchored nodes cannot be indexed, keep them mounted
+            bounds.append(None)
+
+    nodes = ''.join(
+        f"  {{ Component: {name}, bounds: {list(box) if box else 'null'} }},\n"
+        for name, box in zip(comp_names, bounds)
+    )
+
+    return f"""import React from 'react'
 import styled from 'styled-components'
+import VirtualFrame, {{ VirtualNode }} from '../runtime/VirtualFrame'
+{imports}
+const nodes: VirtualNode[] = [
+{nodes}]
+
+const buckets: Record<string, number[]> = {json.dumps(spatial_buckets(bounds), separators=(',', ':'))}
 
-const Styled{comp_name} = styled.{component['type']}`
-  {style_string}
+const Frame = styled(VirtualFrame)`
+  background-color: {frame_data.background_color};
+  overflow: hidden;
 `
 
-const {comp_name}: React.FC = () => {{
-  return (
-    <Styled{comp_name}>
-      {component.get('text', '')}
-    </Styled{comp_name}>
-  )
+const {frame_name}: React.FC = () => {{
+  return <Frame nodes={{nodes}} buckets={{buckets}} bucketSize={{{BUCKET_SIZE}}} height={{{frame_data.height}}} />
 }}
 
-export default {comp_name}"""
-                
-                with open(os.path.join(components_dir, f'{comp_name}.tsx'), 'w') as f:
-                    f.write(component_code)
-        
-        # Update App.tsx to use the generated components
-        app_code = """import React from 'react'
+export default {frame_name}"""
+
+def write_source(path: str, text: str, progress=None):
+    """Write a generated source file and report it"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    publish(progress, 'file_written', path=path, bytes=len(text.encode('utf-8')))
+
+def render_frame(frame_data: Frame, frame_name: str, virtualize: bool = False, uses: Dict[str, Any] = None) -> List[Tuple[str, str]]:
+    """Source files of a frame and of its nodes, by path relative to src/components; runs inside a pool worker"""
+    uses = uses or {}
+    files = []
+
+    with span('react_frame', frame=frame_name):
+        # Create components for each element in the frame
+        comp_names = []
+        local = {}
+        used = {frame_name} | RESERVED_NAMES | {use['name'] for use in uses.values()}
+
+        for component in frame_data.components:
+            comp_name = component_name(component.name, used)
+            comp_names.append(comp_name)
+            if component.id in uses:
+                # Instances of shared components need no file of their own
+                use_imports, block, markup = instance_code(component, uses[component.id], f'Styled{comp_name}', '', f'./{SHARED_DIR}', '../assets')
+                local[comp_name] = (use_imports, f"{block}\nconst {comp_name}: React.FC = () => {markup}\n")
+            else:
+                files.append((os.path.join(frame_name, f'{comp_name}.tsx'), component_code(component, comp_name, uses)))
+
+        # Create frame component
+        if virtualize:
+            frame_component = virtual_frame_code(frame_data, frame_name, comp_names, local)
+        else:
+            frame_component = frame_code(frame_data, frame_name, comp_names, local)
+        files.append((f'{frame_name}.tsx', frame_component))
+
+    return files
+
+def emit_frame(frame_data: Frame, frame_name: str, components_dir: str, virtualize: bool = False, progress=None, uses: Dict[str, Any] = None) -> List[Tuple[str, str]]:
+    """Write a frame component and the components of its nodes, returning the files written"""
+    files = render_frame(frame_data, frame_name, virtualize, uses)
+    os.makedirs(os.path.join(components_dir, frame_name), exist_ok=True)
+    for path, text in files:
+        write_source(os.path.join(components_dir, path), text, progress)
+    return files
+
+def emit_frames(jobs: List[Tuple[Frame, str]], components_dir: str, virtualize: bool = False, uses: Dict[str, Any] = None,
+                workers: int = None, progress=None, cancel=None) -> List[List[Tuple[str, str]]]:
+    """Emit (frame, name) jobs on a bounded thread pool, returning their files in frame order
+
+    Every frame is built from its own nodes, the shared components and its name
+    alone, and writes into its own folder, so the output is the same whatever the
+    number of workers. Writing releases the GIL, which is where the pool pays off.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    emit = partial(emit_frame, components_dir=components_dir, virtualize=virtualize, progress=progress, uses=uses)
+    emitted = []
+
+    if workers == 1:
+        for frame_data, frame_name in jobs:
+            check(cancel)
+            emitted.append(emit(frame_data, frame_name))
+        return emitted
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # Each frame runs in a copy of the caller's context, which carries its job output capture
+        for future in [executor.submit(contextvars.copy_context().run, emit, frame_data, frame_name) for frame_data, frame_name in jobs]:
+            check(cancel)
+            emitted.append(future.result())
+    finally:
+        executor.shutdown(wait=not (cancel is not None and cancel.cancelled), cancel_futures=True)
+    return emitted
+
+def app_code(frame_names: List[str], theme: Dict[str, Any], routes: bool = False) -> str:
+    """Generate App.tsx mounting every frame, or one lazily loaded route per frame"""
+    imports = ''
+    entries = ''
+    elements = ''
+    for frame_name in frame_names:
+        if routes:
+            # One lazily loaded chunk per frame, addressed by a hash route
+            entries += f"  {{ name: '{frame_name}', path: '/{route_path(frame_name)}', load: () => import('./components/{frame_name}') }},\n"
+        else:
+            imports += f"import {frame_name} from './components/{frame_name}'\n"
+            elements += f"      <{frame_name} />\n"
+
+    code = f"""import React{', { Suspense, lazy, useEffect, useState }' if routes else ''} from 'react'
 import styled from 'styled-components'
-import './styles/index.css'
-import './styles/cyberpunk.css'
-"""
+{theme_imports(theme)}{imports}"""
 
-        # Import all frame components
-        for frame_data in figma_data:
-            frame_name = frame_data['frame']['name'].replace(' ', '')
-            app_code += f"import {frame_name} from './components/{frame_name}'\n"
+    if routes:
+        code += f"""
+const frames = [
+{entries}]
+
+const pages = frames.map((frame) => lazy(frame.load))
+
+const currentIndex = () => {{
+  const index = frames.findIndex((frame) => frame.path === window.location.hash.slice(1))
+  return index === -1 ? 0 : index
+}}
+"""
 
-        app_code += """
+    code += """
 const AppContainer = styled.div`
   min-height: 100vh;
   display: flex;
   flex-direction: column;
-  background-color: var(--dark-bg);
-  color: var(--neon-blue);
+  background-color: var(--app-bg);
+  color: var(--app-fg);
   position: relative;
   overflow: hidden;
 `
 
 const App: React.FC = () => {
-  return (
-    <AppContainer>
-      <div className="cyber-grid" />
-      <div className="particles" />
-      <div className="cursor" />
 """
 
-        # Add all frame components
-        for frame_data in figma_data:
-            frame_name = frame_data['frame']['name'].replace(' ', '')
-            app_code += f"      <{frame_name} />\n"
+    if routes:
+        code += """  const [index, setIndex] = useState(currentIndex)
+
+  useEffect(() => {
+    const onHashChange = () => setIndex(currentIndex())
+    window.addEventListener('hashchange', onHashChange)
+    return () => window.removeEventListener('hashchange', onHashChange)
+  }, [])
+
+  useEffect(() => {
+    // Prefetch the neighbouring frames once the browser is idle
+    const prefetch = () => [index - 1, index + 1].forEach((i) => frames[i]?.load())
+    const idle = window.requestIdleCallback ?? ((callback: () => void) => window.setTimeout(callback, 200))
+    idle(prefetch)
+  }, [index])
+
+  const Page = pages[index]
 
-        app_code += """      <div className="scan-line" />
-    </AppContainer>
+"""
+        elements = """      <nav>
+        {frames.map((frame) => (
+          <a key={frame.path} href={`#${frame.path}`}>{frame.name}</a>
+        ))}
+      </nav>
+      <Suspense fallback={null}>
+        <Page />
+      </Suspense>
+"""
+
+    code += """  return (
+    <AppContainer>
+"""
+    code += ''.join(f"      {layer}\n" for layer in theme['layers'])
+    code += elements
+    code += ''.join(f"      {layer}\n" for layer in theme['overlays'])
+    code += """    </AppContainer>
   )
 }
 
 export default App"""
+    return code
+
+def react_code(figma_data: List[Frame], output_path: str = None, routes: bool = False, virtualize: bool = False, theme: str = DEFAULT_THEME, progress=None, cancel=None, fonts_dir: str = None, workers: int = None) -> bool:
+    """Generate React components from Figma data, optionally routed per frame or viewport-virtualized
+
+    Frames are emitted on a bounded pool of `workers` threads, then App.tsx is
+    built in one pass over the frame names.
+    """
+    try:
+        base_path = output_path if output_path else '.'
 
-        with open(os.path.join(base_path, 'src', 'App.tsx'), 'w') as f:
-            f.write(app_code)
+        # Subset the fonts the design and the theme draw with
+        with span('fonts'):
+            fonts = build_fonts(figma_data, get_theme(theme)['fonts'], fonts_dir or FONTS_DIR)
+        
+        # Create React app structure
+        with span('create_react_app'):
+            if not create_react_app(base_path, theme, fonts):
+                return False
+        theme = get_theme(theme)
+            
+        # Generate components from figma_data
+        components_dir = os.path.join(base_path, 'src', 'components')
+        os.makedirs(components_dir, exist_ok=True)
+        
+        # One component per Figma component used more than once, instances pass their overrides as props
+        with span('shared_components'):
+            masters, uses = shared_components(figma_data)
+        shared = []
+        if masters:
+            shared_dir = os.path.join(components_dir, SHARED_DIR)
+            os.makedirs(shared_dir, exist_ok=True)
+            for name, master in masters.items():
+                check(cancel)
+                shared.append(component_code(master['node'], name, props=master['props']))
+                write_source(os.path.join(shared_dir, f'{name}.tsx'), shared[-1], progress)
+        
+        # Names are given in frame order up front, so that frames can be rendered in any order
+        # Frames are named apart from the shared components they import and from the shared folder,
+        # which would clash with a frame folder on case-insensitive file systems
+        used_frames = RESERVED_NAMES | set(masters) | ({SHARED_DIR.title()} if masters else set())
+        frame_names = [component_name(frame_data.name, used_frames) for frame_data in figma_data]
+
+        rendered = emit_frames(list(zip(figma_data, frame_names)), components_dir, virtualize, uses, workers, progress, cancel)
+        
+        if virtualize:
+            os.makedirs(os.path.join(base_path, 'src', 'runtime'), exist_ok=True)
+            write_source(os.path.join(base_path, 'src', 'runtime', 'VirtualFrame.tsx'), VIRTUAL_FRAME_RUNTIME, progress)
+
+        # Update App.tsx to use the generated components
+        app = app_code(frame_names, theme, routes)
+        write_source(os.path.join(base_path, 'src', 'App.tsx'), app, progress)
+
+        # Declare only the packages the generated sources import, scanning what is still in memory
+        sources = shared + [app, VIRTUAL_FRAME_RUNTIME if virtualize else '']
+        sources += [text for files in rendered for _, text in files]
+        package = write_package_json(base_path, source_packages(sources) | imported_packages(os.path.join(base_path, 'src'), False))
+        print(f"Declared {dependency_count(package)}")
+        write_source(os.path.join(base_path, 'vite.config.ts'),
+                     vite_config(frame_names if routes else None, list(package['dependencies'])), progress)
         
         return True
+    except Cancelled:
+        raise
     except Exception as e:
         print(f"Error generating React code: {str(e)}")
         return False 
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Record a conversion's HTTP traffic to an archive and replay it offline.
+
+An archive is a folder with data.bin, the response bodies appended back to back
+(identical bodies stored once), and index.json mapping each request to the
+offset, length and status of its body. Replay memory-maps data.bin, so a
+response costs one dict lookup and a slice. Tokens are never written.
+"""
+
+import os
+import mmap
+import hashlib
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from typing import Any, Dict, Tuple
+
+import requests
+
+import codec
+
+INDEX = 'index.json'
+DATA = 'data.bin'
+
+def request_key(url: str, params: Dict[str, Any] = None) -> str:
+    """Stable key of a GET request, independent of host, headers and parameter order"""
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query) + [(k, str(v)) for k, v in (params or {}).items()])
+    return f"{parts.path}?{urlencode(query)}" if query else parts.path
+
+def make_response(url: str, status: int, content: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers['Content-Type'] = content_type
+    response._content = content
+    return response
+
+class Recorder:
+    """Transport that performs real requests and appends every response to an archive"""
+
+    def __init__(self, path: str, session=None):
+        self.path = path
+        self.session = session or requests
+        self.index: Dict[str, list] = {}
+        self.blobs: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._data = open(os.path.join(path, DATA), 'wb')
+
+    def get(self, url: str, headers: Dict[str, str] = None, params: Dict[str, Any] = None, timeout: float = None, **kwargs):
+        response = self.session.get(url, headers=headers, params=params, timeout=timeout, **kwargs)
+        self.add(request_key(url, params), response.status_code, response.content, response.headers.get('Content-Type', ''))
+        return response
+
+    def add(self, key: str, status: int, content: bytes, content_type: str):
+        digest = hashlib.sha1(content).hexdigest()
+        with self._lock:
+            if digest not in self.blobs:
+                self.blobs[digest] = (self._data.tell(), len(content))
+                self._data.write(content)
+            offset, length = self.blobs[digest]
+            self.index[key] = [offset, length, status, content_type]
+
+    def close(self):
+        """Flush the bodies and write the index"""
+        with self._lock:
+            self._data.close()
+            codec.dump({'version': 1, 'requests': self.index}, os.path.join(self.path, INDEX))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class Replayer:
+    """Transport that answers requests from an archive without touching the network"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = codec.load(os.path.join(path, INDEX))['requests']
+        self._file = open(os.path.join(path, DATA), 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses empty files, and an archive without bodies needs no map
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def get(self, url: str, headers: Dict[str, str] = None, params: Dict[str, Any] = None, timeout: float = None, **kwargs):
+        entry = self.index.get(request_key(url, params))
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"Request not in replay archive: {url}")
+        offset, length, status, content_type = entry
+        return make_response(url, status, self._data[offset:offset + length], content_type)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
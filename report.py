@@ -0,0 +1,193 @@
+"""Size report and budgets for a generated React app.
+
+Measures what react.react_code wrote, per frame and per component: JSX bytes,
+CSS bytes (the styled-components blocks) and the bytes of the assets each one
+imports. Budgets cap these per frame; exceeding one fails the run.
+"""
+
+import os
+import re
+import json
+from typing import Any, Dict, List, Tuple
+
+STYLED_BLOCK = re.compile(r'styled(?:\.\w+|\([^)]*\))`(.*?)`', re.S)
+IMPORT = re.compile(r"""^import\s+(\w+)\s+from\s+'([^']+)'""", re.M)
+SIZE = re.compile(r'^\s*([\d.]+)\s*(b|kb|mb|gb)?\s*$', re.I)
+UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3}
+
+# Budget name -> what it limits
+BUDGETS = {
+    'frame': 'total bytes of a frame: its code, shared components and assets',
+    'code': 'JSX and CSS bytes of a frame',
+    'css': 'CSS bytes of a frame',
+    'assets': 'asset bytes of a frame',
+    'asset': 'bytes of any single asset'
+}
+
+def parse_size(text: str) -> int:
+    """Bytes of a size such as 512000, 500KB or 2.5MB"""
+    match = SIZE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid size '{text}', expected e.g. 500KB or 2MB")
+    return int(float(match.group(1)) * UNITS[(match.group(2) or 'b').lower()])
+
+def parse_budgets(entries: List[str]) -> Dict[str, int]:
+    """Budgets from NAME=SIZE strings, raising ValueError on unknown names or sizes"""
+    budgets = {}
+    for entry in entries or []:
+        name, _, size = entry.partition('=')
+        if name not in BUDGETS:
+            raise ValueError(f"Unknown budget '{name}', expected one of: {', '.join(BUDGETS)}")
+        budgets[name] = parse_size(size)
+    return budgets
+
+def human(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+def source_sizes(path: str) -> Tuple[int, int, List[str]]:
+    """JSX bytes, CSS bytes and imported local modules/assets of a source file"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    total = len(source.encode('utf-8'))
+    css = sum(len(block.encode('utf-8')) for block in STYLED_BLOCK.findall(source))
+    imports = [os.path.normpath(os.path.join(os.path.dirname(path), target))
+               for _, target in IMPORT.findall(source) if target.startswith('.')]
+    return total - css, css, imports
+
+def component_entry(path: str, name: str) -> Dict[str, Any]:
+    jsx, css, imports = source_sizes(path)
+    assets = [target for target in imports if os.path.splitext(target)[1] and os.path.isfile(target)]
+    modules = [target for target in imports if not os.path.splitext(target)[1]]
+    return {
+        'name': name,
+        'path': path,
+        'jsx': jsx,
+        'css': css,
+        'assets': assets,
+        'asset_bytes': sum(os.path.getsize(asset) for asset in set(assets)),
+        'modules': modules
+    }
+
+def bundle_report(app_path: str, top: int = 10) -> Dict[str, Any]:
+    """Sizes of every frame and component of a generated app, and the largest contributors"""
+    from react import SHARED_DIR
+
+    components_dir = os.path.join(app_path, 'src', 'components')
+    shared_dir = os.path.join(components_dir, SHARED_DIR)
+    shared = {}
+    frames = []
+    asset_files = set()
+
+    if os.path.isdir(shared_dir):
+        for file in sorted(os.listdir(shared_dir)):
+            if file.endswith('.tsx'):
+                entry = component_entry(os.path.join(shared_dir, file), file[:-4])
+                shared[os.path.normpath(os.path.splitext(entry['path'])[0])] = entry
+
+    for file in sorted(os.listdir(components_dir)) if os.path.isdir(components_dir) else []:
+        if not file.endswith('.tsx'):
+            continue
+        name = file[:-4]
+        frame_file = component_entry(os.path.join(components_dir, file), name)
+        components = [frame_file]
+        frame_dir = os.path.join(components_dir, name)
+        if os.path.isdir(frame_dir):
+            components += [component_entry(os.path.join(frame_dir, f), f[:-4]) for f in sorted(os.listdir(frame_dir)) if f.endswith('.tsx')]
+
+        # Shared components ship with every frame that uses them
+        used = sorted({module for component in components for module in component['modules'] if module in shared})
+        assets = {asset for component in components + [shared[module] for module in used] for asset in component['assets']}
+        jsx = sum(component['jsx'] for component in components)
+        css = sum(component['css'] for component in components)
+        shared_bytes = sum(shared[module]['jsx'] + shared[module]['css'] for module in used)
+        asset_bytes = sum(os.path.getsize(asset) for asset in assets)
+        asset_files |= assets
+
+        frames.append({
+            'name': name,
+            'components': len(components) - 1,
+            'shared': [shared[module]['name'] for module in used],
+            'jsx': jsx,
+            'css': css,
+            'shared_bytes': shared_bytes,
+            'assets': len(assets),
+            'asset_bytes': asset_bytes,
+            'largest_asset': max((os.path.getsize(asset) for asset in assets), default=0),
+            'total': jsx + css + shared_bytes + asset_bytes,
+            'items': [{key: component[key] for key in ('name', 'jsx', 'css', 'asset_bytes')} for component in components]
+        })
+
+    everything = [dict(item, frame=frame['name']) for frame in frames for item in frame['items']]
+    everything += [{'name': entry['name'], 'frame': 'shared', 'jsx': entry['jsx'], 'css': entry['css'], 'asset_bytes': entry['asset_bytes']}
+                   for entry in shared.values()]
+    asset_files.update(asset for entry in shared.values() for asset in entry['assets'])
+
+    package = {}
+    if os.path.isfile(os.path.join(app_path, 'package.json')):
+        with open(os.path.join(app_path, 'package.json'), encoding='utf-8') as f:
+            package = json.load(f)
+
+    fonts_dir = os.path.join(app_path, 'public', 'fonts')
+    fonts = sum(os.path.getsize(os.path.join(fonts_dir, f)) for f in os.listdir(fonts_dir)) if os.path.isdir(fonts_dir) else 0
+
+    return {
+        'app': os.path.abspath(app_path),
+        'totals': {
+            'frames': len(frames),
+            'components': sum(frame['components'] for frame in frames),
+            'shared': len(shared),
+            'jsx': sum(item['jsx'] for item in everything),
+            'css': sum(item['css'] for item in everything),
+            'assets': len(asset_files),
+            'asset_bytes': sum(os.path.getsize(asset) for asset in asset_files),
+            'fonts': fonts,
+            'dependencies': len(package.get('dependencies', {})),
+            'dev_dependencies': len(package.get('devDependencies', {}))
+        },
+        'frames': frames,
+        'shared': [{key: entry[key] for key in ('name', 'jsx', 'css', 'asset_bytes')} for entry in shared.values()],
+        'largest_components': sorted(everything, key=lambda item: -(item['jsx'] + item['css'] + item['asset_bytes']))[:top],
+        'largest_assets': [{'path': os.path.relpath(asset, app_path), 'bytes': os.path.getsize(asset)}
+                           for asset in sorted(asset_files, key=lambda asset: -os.path.getsize(asset))[:top]]
+    }
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, int]) -> List[str]:
+    """Messages for every frame over one of the budgets"""
+    measures = {
+        'frame': lambda frame: frame['total'],
+        'code': lambda frame: frame['jsx'] + frame['css'],
+        'css': lambda frame: frame['css'],
+        'assets': lambda frame: frame['asset_bytes'],
+        'asset': lambda frame: frame['largest_asset']
+    }
+    violations = []
+    for frame in report['frames']:
+        for name, limit in budgets.items():
+            size = measures[name](frame)
+            if size > limit:
+                violations.append(f"{frame['name']}: {name} {human(size)} exceeds the {human(limit)} budget")
+    return violations
+
+def print_report(report: Dict[str, Any], top: int = 5):
+    print(f"{'frame':<28} {'comps':>6} {'JSX':>10} {'CSS':>10} {'shared':>10} {'assets':>7} {'asset size':>11} {'total':>10}")
+    for frame in report['frames']:
+        print(f"{frame['name'][:28]:<28} {frame['components']:>6} {human(frame['jsx']):>10} {human(frame['css']):>10} "
+              f"{human(frame['shared_bytes']):>10} {frame['assets']:>7} {human(frame['asset_bytes']):>11} {human(frame['total']):>10}")
+    totals = report['totals']
+    print(f"\n{totals['frames']} frames, {totals['components']} components, {totals['shared']} shared: "
+          f"JSX {human(totals['jsx'])}, CSS {human(totals['css'])}, {totals['assets']} assets {human(totals['asset_bytes'])}, "
+          f"fonts {human(totals['fonts'])}, {totals['dependencies']} dependencies")
+    if report['largest_assets']:
+        print("Largest assets: " + ', '.join(f"{asset['path']} ({human(asset['bytes'])})" for asset in report['largest_assets'][:top]))
+    if report['largest_components']:
+        print("Largest components: " + ', '.join(
+            f"{item['frame']}/{item['name']} ({human(item['jsx'] + item['css'] + item['asset_bytes'])})"
+            for item in report['largest_components'][:top]))
+
+def write_report(report: Dict[str, Any], path: str, violations: List[str] = None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({**report, 'violations': violations or []}, f, indent=2)
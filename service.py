@@ -0,0 +1,308 @@
+"""Long-running conversion service with a job queue and warm caches.
+
+Usage: python service.py [--port 8765] [--workers 4] [--root service-jobs]
+
+    POST   /jobs              {"file": "<url or id>", "token": "...", "target": "react", "theme": "lean", "archive": true}
+    GET    /jobs/<id>         status, progress and result of a job
+    GET    /jobs/<id>/archive zip of the generated project once the job is done
+    DELETE /jobs/<id>         cancel a queued or running job
+    GET    /stats             queue, job and cache counters
+
+The token may also be sent as an X-FIGMA-TOKEN header. Submitting a job identical to
+one that is still queued or running returns the existing job instead of a new one.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import queue
+import uuid
+import shutil
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+import core
+from tkforge import convert_figma_to_react, convert_figma_to_static, convert_figma_to_tk
+from batch import TARGETS, JobOutput
+from themes import THEMES, DEFAULT_THEME
+from progress import CancelToken, Progress, ProgressState
+from session import SharedTransport
+from utils import LRUCache, extract_figma_id
+from prune import PRUNE_RULES
+
+# Options that change the generated output, and so take part in deduplication
+JOB_OPTIONS = ('target', 'theme', 'routes', 'virtualize', 'archive', 'keep')
+
+class Job:
+    def __init__(self, key: str, spec: Dict[str, Any], token: str, root: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.spec = spec
+        self.token = token
+        self.output = os.path.join(root, self.id)
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.archive = None
+        self.log = io.StringIO()
+        self.progress = Progress()
+        self.state = ProgressState()
+        self.cancel = CancelToken()
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Several handler threads may poll the same job, only one drains its events at a time
+        with self._lock:
+            while True:
+                try:
+                    self.state.update(self.progress.events.get_nowait())
+                except queue.Empty:
+                    break
+
+        data = {
+            'id': self.id,
+            'status': self.status,
+            **self.spec,
+            'created': self.created,
+            'progress': self.state.summary() if self.started else None
+        }
+        if self.finished:
+            data['seconds'] = round(self.finished - self.started, 3)
+        if self.status == 'done':
+            data['output'] = os.path.abspath(self.output)
+            data['archive'] = f'/jobs/{self.id}/archive' if self.archive else None
+        if self.status == 'failed':
+            data['log'] = self.log.getvalue().strip().splitlines()[-20:]
+        return data
+
+class ConversionService:
+    """Runs conversion jobs on a bounded pool over one warm, shared transport"""
+
+    def __init__(self, root: str = 'service-jobs', workers: int = 4, max_queue: int = 64, max_requests: int = 16,
+                 cache_bytes: int = 512 * 1024 * 1024, ttl: float = 60, tk_workers: int = None, history: int = 1000):
+        self.root = root
+        self.max_queue = max_queue
+        self.history = history
+        self.jobs: Dict[str, Job] = {}
+        self.active: Dict[str, Job] = {}
+        self.transport = SharedTransport(max_requests=max_requests, ttl=ttl,
+                                         cache=LRUCache(cache_bytes, size=lambda entry: len(entry[0].content)))
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.tk_workers = tk_workers
+        self.tk_pool = None
+        self.output = JobOutput(sys.stdout)
+        self._lock = threading.Lock()
+
+    def start(self):
+        core.transport = self.transport
+        sys.stdout = self.output
+        os.makedirs(self.root, exist_ok=True)
+
+    def stop(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for job in list(self.active.values()):
+            job.cancel.cancel()
+        sys.stdout = self.output.stream
+        if self.tk_pool is not None:
+            self.tk_pool.shutdown()
+        self.transport.close()
+
+    def submit(self, request: Dict[str, Any], token: str = None) -> Job:
+        """Queue a job, or return the identical job already queued or running
+
+        Raises ValueError for invalid requests and OverflowError when the queue is full.
+        """
+        token = request.get('token') or token
+        if not request.get('file'):
+            raise ValueError("Missing 'file'")
+        if not token:
+            raise ValueError("Missing token, send 'token' or an X-FIGMA-TOKEN header")
+
+        spec = {'file': extract_figma_id(request['file']), 'target': request.get('target', 'react'),
+                'theme': request.get('theme', DEFAULT_THEME), 'routes': bool(request.get('routes')),
+                'virtualize': bool(request.get('virtualize')), 'archive': bool(request.get('archive')),
+                'keep': sorted(set(request.get('keep') or []))}
+        if spec['target'] not in TARGETS:
+            raise ValueError(f"Unknown target '{spec['target']}', expected one of: {', '.join(TARGETS)}")
+        if spec['theme'] not in THEMES:
+            raise ValueError(f"Unknown theme '{spec['theme']}', expected one of: {', '.join(THEMES)}")
+        if set(spec['keep']) - set(PRUNE_RULES):
+            raise ValueError(f"Unknown pruning rule in 'keep', expected some of: {', '.join(PRUNE_RULES)}")
+
+        key = hashlib.sha1(json.dumps([token, spec['file']] + [spec[k] for k in JOB_OPTIONS]).encode()).hexdigest()
+
+        with self._lock:
+            if key in self.active:
+                return self.active[key]
+            if len(self.active) >= self.max_queue:
+                raise OverflowError("Too many jobs queued")
+
+            job = Job(key, spec, token, self.root)
+            self.jobs[job.id] = job
+            self.active[key] = job
+
+        self.pool.submit(self.run, job)
+        return job
+
+    def run(self, job: Job):
+        if job.cancel.cancelled:
+            return self.finish(job, 'cancelled')
+
+        job.status = 'running'
+        job.started = time.time()
+        self.output.capture(job.log)
+        spec = job.spec
+
+        try:
+            if spec['target'] == 'react':
+                ok = convert_figma_to_react(spec['file'], job.token, job.output, spec['routes'], spec['virtualize'],
+                                            spec['theme'], job.progress, job.cancel, keep=spec['keep'])
+            elif spec['target'] == 'static':
+                ok = convert_figma_to_static(spec['file'], job.token, job.output, spec['theme'], job.progress, job.cancel,
+                                             keep=spec['keep'])
+            else:
+                ok = convert_figma_to_tk(spec['file'], job.token, job.output, spec['target'] == 'tk-layout', None,
+                                         job.progress, job.cancel, self.tk_executor(), spec['keep'])
+            if ok and spec['archive']:
+                job.archive = shutil.make_archive(job.output, 'zip', job.output)
+        except Exception as e:
+            print(f"Error converting {spec['file']}: {str(e)}")
+            ok = False
+        finally:
+            self.output.capture(None)
+
+        self.finish(job, 'done' if ok else 'cancelled' if job.cancel.cancelled else 'failed')
+
+    def finish(self, job: Job, status: str):
+        job.status = status
+        job.finished = time.time()
+        job.started = job.started or job.finished
+        with self._lock:
+            if self.active.get(job.key) is job:
+                del self.active[job.key]
+            # Forget the oldest finished jobs, their outputs stay on disk
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in finished[:max(0, len(finished) - self.history)]:
+                del self.jobs[old.id]
+
+    def tk_executor(self):
+        """Process pool for Tk rendering, created on the first Tk job and shared by all"""
+        with self._lock:
+            if self.tk_pool is None:
+                self.tk_pool = ProcessPoolExecutor(max_workers=self.tk_workers)
+            return self.tk_pool
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is not None and job.status in ('queued', 'running'):
+            job.cancel.cancel()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in list(self.jobs.values()):
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        cache = self.transport.cache
+        return {'jobs': statuses, 'active': len(self.active),
+                'cache': {'entries': len(cache), 'bytes': cache.bytes, 'hits': cache.hits, 'misses': cache.misses}}
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data: Any, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def job(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            return self.server.service.jobs.get(parts[1]), parts[2:]
+        return None, None
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/stats':
+            return self.send_json(service.stats())
+
+        job, rest = self.job()
+        if job is None:
+            return self.send_json({'error': 'Not found'}, 404)
+        if rest == ['archive']:
+            if not job.archive:
+                return self.send_json({'error': 'No archive for this job'}, 404)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/zip')
+            self.send_header('Content-Length', str(os.path.getsize(job.archive)))
+            self.send_header('Content-Disposition', f'attachment; filename="{job.id}.zip"')
+            self.end_headers()
+            with open(job.archive, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile)
+            return
+        self.send_json(job.to_dict())
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            return self.send_json({'error': 'Not found'}, 404)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            job = self.server.service.submit(request, self.headers.get('X-FIGMA-TOKEN'))
+        except (ValueError, AttributeError) as e:
+            return self.send_json({'error': str(e)}, 400)
+        except OverflowError as e:
+            return self.send_json({'error': str(e)}, 503)
+        self.send_json(job.to_dict(), 202)
+
+    def do_DELETE(self):
+        job, rest = self.job()
+        if job is None or rest:
+            return self.send_json({'error': 'Not found'}, 404)
+        self.send_json(self.server.service.cancel(job.id).to_dict())
+
+def serve(service: ConversionService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """Start the service and return its HTTP server, call serve_forever() on it to run"""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    service.start()
+    return server
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Serve Figma conversions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--root", default="service-jobs", help="Folder receiving one output folder per job")
+    parser.add_argument("--workers", type=int, default=4, help="Jobs converted concurrently")
+    parser.add_argument("--queue", type=int, default=64, help="Jobs queued or running before new ones are refused")
+    parser.add_argument("--requests", type=int, default=16, help="Figma API and image requests in flight across all jobs")
+    parser.add_argument("--cache-mb", type=int, default=512, help="Memory for cached Figma documents and images")
+    parser.add_argument("--ttl", type=float, default=60, help="Seconds a fetched Figma document stays fresh")
+    args = parser.parse_args()
+
+    service = ConversionService(args.root, args.workers, args.queue, args.requests, args.cache_mb * 1024 * 1024, args.ttl)
+    server = serve(service, args.host, args.port)
+    print(f"🚀 Conversion service listening on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
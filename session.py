@@ -0,0 +1,56 @@
+"""Shared HTTP transport for running many conversions in one process."""
+
+import time
+import hashlib
+import threading
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from replay import request_key
+from utils import LRUCache
+
+def make_session(pool_size: int = 16) -> requests.Session:
+    """A session whose connection pool holds `pool_size` keep-alive connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class SharedTransport:
+    """Transport for core shared by concurrent conversions
+
+    Reuses one connection pool, caches successful responses per token and caps the
+    number of requests in flight across all conversions at `max_requests`. API
+    responses expire after `ttl` seconds so edits to a design are picked up; image
+    downloads from signed CDN URLs never change and stay until evicted.
+    """
+
+    def __init__(self, session: requests.Session = None, max_requests: int = 16, cache: LRUCache = None, ttl: float = None):
+        self.session = session or make_session(max_requests)
+        self.cache = cache if cache is not None else LRUCache(size=lambda entry: len(entry[0].content))
+        self.ttl = ttl
+        self._budget = threading.BoundedSemaphore(max_requests)
+
+    def get(self, url: str, headers: Dict[str, str] = None, params: Dict[str, Any] = None, timeout: float = None, **kwargs):
+        # Responses are only shared between callers presenting the same token
+        token = (headers or {}).get('X-FIGMA-TOKEN', '')
+        key = (hashlib.sha1(token.encode()).hexdigest(), request_key(url, params))
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            response, expires = entry
+            if expires is None or expires > time.monotonic():
+                return response
+
+        with self._budget:
+            response = self.session.get(url, headers=headers, params=params, timeout=timeout, **kwargs)
+        if response.status_code == 200:
+            expires = time.monotonic() + self.ttl if self.ttl is not None and key[1].startswith('/v1/') else None
+            self.cache.put(key, (response, expires))
+        return response
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,137 @@
+"""Spatial index over node bounds: occlusion culling and stacking order.
+
+A uniform grid maps each cell to the boxes overlapping it, so finding the boxes
+that contain a point or intersect a box only looks at the few boxes sharing its
+cells instead of every sibling.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Box = Tuple[float, float, float, float]
+
+CELL_SIZE = 256
+# Node types whose fill paints their whole bounding box
+RECTANGULAR = {'RECTANGLE', 'FRAME', 'COMPONENT', 'INSTANCE'}
+
+class GridIndex:
+    """Boxes (x, y, width, height) bucketed into square cells"""
+
+    def __init__(self, cell: int = CELL_SIZE):
+        self.cell = cell
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.boxes: List[Box] = []
+
+    def span(self, box: Box) -> Iterable[Tuple[int, int]]:
+        x, y, width, height = box
+        cell = self.cell
+        for col in range(int(x // cell), int((x + max(width, 1) - 1) // cell) + 1):
+            for row in range(int(y // cell), int((y + max(height, 1) - 1) // cell) + 1):
+                yield col, row
+
+    def insert(self, box: Box) -> int:
+        """Add a box and return its id, the insertion order"""
+        id = len(self.boxes)
+        self.boxes.append(box)
+        for key in self.span(box):
+            self.cells.setdefault(key, []).append(id)
+        return id
+
+    def at(self, x: float, y: float) -> List[int]:
+        """Ids of the boxes containing a point"""
+        return [id for id in self.cells.get((int(x // self.cell), int(y // self.cell)), ())
+                if contains(self.boxes[id], (x, y, 0, 0))]
+
+    def query(self, box: Box) -> Set[int]:
+        """Ids of the boxes overlapping a box"""
+        found = set()
+        for key in self.span(box):
+            for id in self.cells.get(key, ()):
+                if id not in found and intersects(self.boxes[id], box):
+                    found.add(id)
+        return found
+
+def contains(outer: Box, inner: Box) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+def intersects(a: Box, b: Box) -> bool:
+    """Whether two boxes share some area, touching edges do not count"""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+def bounds(node: Dict[str, Any]) -> Optional[Box]:
+    box = node.get('absoluteBoundingBox') or node.get('absoluteRenderBounds')
+    return (box['x'], box['y'], box['width'], box['height']) if box else None
+
+def painted_bounds(node: Dict[str, Any]) -> Optional[Box]:
+    """Area a node draws on, shadows and blurs included"""
+    box = node.get('absoluteRenderBounds') or node.get('absoluteBoundingBox')
+    return (box['x'], box['y'], box['width'], box['height']) if box else None
+
+def is_opaque(node: Dict[str, Any]) -> bool:
+    """Whether a node hides everything below its bounding box"""
+    if node.get('type') not in RECTANGULAR or not node.get('visible', True) or node.get('isMask'):
+        return False
+    if node.get('opacity', 1) < 1 or node.get('blendMode', 'PASS_THROUGH') not in ('PASS_THROUGH', 'NORMAL'):
+        return False
+    # Rounded, rotated or blurred boxes leave the corners or edges of what is below visible
+    if node.get('cornerRadius') or node.get('rectangleCornerRadii') or node.get('rotation'):
+        return False
+    if any(effect.get('type') in ('LAYER_BLUR', 'BACKGROUND_BLUR') and effect.get('visible', True) for effect in node.get('effects', [])):
+        return False
+    return any(
+        fill.get('type') == 'SOLID' and fill.get('visible', True) and fill.get('opacity', 1) >= 1 and
+        fill.get('color', {}).get('a', 1) >= 1 and fill.get('blendMode', 'NORMAL') == 'NORMAL'
+        for fill in node.get('fills', [])
+    )
+
+def cull(children: List[Dict[str, Any]], clip: Box = None, occlusion: bool = True,
+         cell: int = CELL_SIZE) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Siblings left after dropping those outside `clip` or covered by an opaque sibling above them
+
+    Later siblings paint over earlier ones, so the list is walked from the top down
+    and each node is only tested against the opaque nodes above it that contain its
+    centre. Returns the kept children, in order, and the dropped ones per reason.
+    """
+    occluders = GridIndex(cell)
+    kept = []
+    dropped = {'outside': [], 'occluded': []}
+
+    for node in reversed(children):
+        box = painted_bounds(node)
+        if box is None:
+            kept.append(node)
+            continue
+        if clip is not None and not intersects(clip, box):
+            dropped['outside'].append(node)
+            continue
+        x, y, width, height = box
+        if any(contains(occluders.boxes[id], box) for id in occluders.at(x + width / 2, y + height / 2)):
+            dropped['occluded'].append(node)
+            continue
+        kept.append(node)
+        if occlusion and is_opaque(node):
+            occluders.insert(bounds(node))
+
+    kept.reverse()
+    return kept, dropped
+
+def stacking(boxes: List[Optional[Box]], cell: int = CELL_SIZE) -> List[int]:
+    """Stacking level of each box in paint order, 0 unless it overlaps a box painted before it
+
+    A box overlapping others sits one level above the highest of them, so explicit
+    z-indexes are only needed where elements actually overlap.
+    """
+    index = GridIndex(cell)
+    levels = []
+    ids = []
+
+    for box in boxes:
+        if box is None:
+            levels.append(0)
+            continue
+        below = index.query(box)
+        levels.append(max((levels[ids[id]] for id in below), default=-1) + 1)
+        ids.append(len(levels) - 1)
+        index.insert(box)
+
+    return levels
@@ -3,16 +3,23 @@
 import os
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import List
+
+from ir import Frame
+from themes import CYBERPUNK_FONTS
+from fonts import FONTS_DIR, build_fonts, font_face_css, preload_links, write_fonts
+from packages import write_package_json
 
 from .templates.app_template import generate_app_template
 from .styles.cyberpunk import generate_cyberpunk_styles
 from .utils.file_utils import create_directory, write_file
 
 class ReactGenerator:
-    def __init__(self, output_path: str):
+    def __init__(self, output_path: str, fonts_dir: str = None):
         self.output_path = output_path
         self.app_path = os.path.join(output_path, 'ReactApp')
+        self.fonts_dir = fonts_dir or FONTS_DIR
+        self.fonts = []
     
     def create_directory_structure(self):
         """Create the React app directory structure."""
@@ -27,17 +34,17 @@ class ReactGenerator:
         for directory in directories:
             create_directory(os.path.join(self.app_path, directory))
     
-    def create_index_html(self):
-        """Create the index.html file."""
-        content = """<!DOCTYPE html>
+    def create_index_html(self, preloads: List[str] = None):
+        """Create the index.html file, with optional font preload links."""
+        head = ''.join(f"\n    {link}" for link in preloads or [])
+        content = f"""<!DOCTYPE html>
 <html lang="en">
   <head>
     <meta charset="utf-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1" />
     <meta name="theme-color" content="#000000" />
     <meta name="description" content="Generated by Figma to React Converter" />
-    <title>JARVIS Interface</title>
-    <link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;500;600;700&family=Rajdhani:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <title>JARVIS Interface</title>{head}
   </head>
   <body>
     <div class="cyber-grid"></div>
@@ -50,52 +57,23 @@ class ReactGenerator:
         write_file(os.path.join(self.app_path, 'public', 'index.html'), content)
     
     def create_package_json(self):
-        """Create package.json with required dependencies."""
-        content = {
-            "name": "jarvis-interface",
-            "version": "0.1.0",
-            "private": True,
-            "dependencies": {
-                "react": "^18.2.0",
-                "react-dom": "^18.2.0",
-                "styled-components": "^6.0.7",
-                "framer-motion": "^10.16.1",
-                "@mui/material": "^5.14.5",
-                "@emotion/react": "^11.11.1",
-                "@emotion/styled": "^11.11.0"
-            },
-            "scripts": {
-                "start": "vite",
-                "build": "tsc && vite build",
-                "serve": "vite preview",
-                "lint": "eslint src --ext ts,tsx",
-                "format": "prettier --write 'src/**/*.{ts,tsx}'",
-                "test": "vitest"
-            },
-            "devDependencies": {
-                "@types/react": "^18.2.21",
-                "@types/react-dom": "^18.2.7",
-                "@types/styled-components": "^5.1.26",
-                "@typescript-eslint/eslint-plugin": "^6.5.0",
-                "@typescript-eslint/parser": "^6.5.0",
-                "@vitejs/plugin-react": "^4.0.4",
-                "eslint": "^8.48.0",
-                "prettier": "^3.0.3",
-                "typescript": "^5.2.2",
-                "vite": "^4.4.9",
-                "vitest": "^0.34.3"
-            }
-        }
-        write_file(os.path.join(self.app_path, 'package.json'), json.dumps(content, indent=2))
+        """Create package.json declaring only the packages the written sources import."""
+        return write_package_json(self.app_path)
     
     def create_app_component(self):
         """Create the main App component."""
         content = generate_app_template()
         write_file(os.path.join(self.app_path, 'src', 'App.tsx'), content)
     
+    def create_fonts(self, figma_data: List[Frame] = None):
+        """Self-host the fonts the design and the cyberpunk styles draw with."""
+        self.fonts = build_fonts(figma_data or [], CYBERPUNK_FONTS, self.fonts_dir)
+        if self.fonts:
+            write_fonts(self.fonts, self.app_path)
+    
     def create_styles(self):
         """Create cyberpunk styles."""
-        content = generate_cyberpunk_styles()
+        content = font_face_css(self.fonts) + generate_cyberpunk_styles()
         write_file(os.path.join(self.app_path, 'src', 'styles', 'cyberpunk.css'), content)
     
     def create_vite_config(self):
@@ -141,16 +119,18 @@ export default defineConfig({
         }
         write_file(os.path.join(self.app_path, 'tsconfig.json'), json.dumps(content, indent=2))
     
-    def generate(self, figma_data: List[Dict[str, Any]] = None) -> bool:
+    def generate(self, figma_data: List[Frame] = None) -> bool:
         """Generate the complete React application."""
         try:
             self.create_directory_structure()
-            self.create_index_html()
-            self.create_package_json()
+            self.create_fonts(figma_data)
+            self.create_index_html(preload_links(self.fonts))
             self.create_app_component()
             self.create_styles()
             self.create_vite_config()
             self.create_tsconfig()
+            # Last, once every source it scans is written
+            self.create_package_json()
             
             if figma_data:
                 # TODO: Process Figma data to generate components
@@ -0,0 +1,230 @@
+"""Static HTML/CSS export of parsed frames, with no client-side JavaScript.
+
+Each frame becomes an HTML page with its own extracted stylesheet. Identical node
+styles share one class, and stylesheets and images are published under content
+hashed names so they can be cached forever. Text files also get precompressed
+.gz (and, when brotli is installed, .br) copies for the web server to send as is.
+"""
+
+import os
+import gzip
+import html
+import shutil
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+from ir import Frame, Node, walk
+from themes import DEFAULT_THEME, get_theme
+from fonts import FONTS_DIR, build_fonts, font_face_css, preload_links
+from progress import Cancelled, check, publish
+from tracing import span
+from react import VOID_TAGS, component_name, css_block, route_path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SITE_DIR = 'site'
+# Downloaded renders, kept next to the site so reruns do not fetch them again
+IMAGES_DIR = 'site-images'
+COMPRESSED_TYPES = ('.html', '.css', '.svg', '.json', '.txt')
+# Smaller files gain nothing from compression once headers are counted
+MIN_COMPRESS_SIZE = 512
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:8]
+
+def hashed_name(name: str, data: bytes) -> str:
+    """File name with the hash of its content before the extension, logo.png -> logo.1a2b3c4d.png"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{content_hash(data)}{ext}'
+
+def write_file(path: str, data: bytes, progress=None) -> List[str]:
+    """Write a published file and its precompressed copies, returning the paths written"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    publish(progress, 'file_written', path=path, bytes=len(data))
+    written = [path]
+
+    if not path.endswith(COMPRESSED_TYPES) or len(data) < MIN_COMPRESS_SIZE:
+        return written
+
+    # mtime=0 keeps the .gz files identical across runs
+    copies = [('.gz', gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        copies.append(('.br', brotli.compress(data, quality=11)))
+    for ext, compressed in copies:
+        if len(compressed) < len(data):
+            with open(path + ext, 'wb') as f:
+                f.write(compressed)
+            written.append(path + ext)
+    return written
+
+class StaticPage:
+    """HTML and CSS of one frame, with one class per distinct node style"""
+
+    def __init__(self, assets: Dict[str, str]):
+        self.assets = assets
+        self.classes: Dict[Tuple, str] = {}
+        self.rules: List[str] = []
+
+    def class_name(self, style: Dict[str, Any]) -> str:
+        key = tuple(style.items())
+        if key not in self.classes:
+            name = f'n{len(self.classes)}'
+            self.classes[key] = name
+            self.rules.append(f".{name} {{\n  {css_block(style)}\n}}\n")
+        return self.classes[key]
+
+    def attributes(self, node: Node) -> str:
+        attrs = []
+        if node.tag == 'img':
+            if node.image in self.assets:
+                attrs.append(f'src="{self.assets[node.image]}"')
+                if node.image2x in self.assets:
+                    attrs.append(f'srcset="{self.assets[node.image]} 1x, {self.assets[node.image2x]} 2x"')
+            attrs += [f'width="{node.box[2]}"', f'height="{node.box[3]}"', f'alt="{html.escape(node.label)}"',
+                      'loading="lazy"', 'decoding="async"']
+        elif node.tag == 'input':
+            attrs.append(f'type="{node.input_type or "text"}"')
+            if node.checked:
+                attrs.append('checked')
+        return ''.join(f' {attr}' for attr in attrs)
+
+    def element(self, node: Node, depth: int) -> str:
+        indent = '  ' * depth
+        attrs = f' class="{self.class_name(node.style)}"' if node.style else ''
+        attrs += self.attributes(node)
+
+        if node.tag in VOID_TAGS:
+            return f'{indent}<{node.tag}{attrs}>\n'
+
+        text = html.escape(node.text) if node.text else ''
+        if node.tag == 'select' and text:
+            text = f'<option>{text}</option>'
+        if not node.children:
+            return f'{indent}<{node.tag}{attrs}>{text}</{node.tag}>\n'
+
+        content = f'{indent}  {text}\n' if text else ''
+        content += ''.join(self.element(child, depth + 1) for child in node.children)
+        return f'{indent}<{node.tag}{attrs}>\n{content}{indent}</{node.tag}>\n'
+
+def frame_css(frame_data: Frame, page: StaticPage) -> str:
+    rules = '\n'.join(page.rules)
+    return f""".frame {{
+  position: relative;
+  width: 100%;
+  height: {frame_data.height}px;
+  background-color: {frame_data.background_color};
+  overflow: hidden;
+}}
+
+{rules}"""
+
+def html_layer(layer: str) -> str:
+    """A theme layer written for JSX as HTML, <div className="x" /> -> <div class="x"></div>"""
+    tag = layer[1:].split(' ')[0]
+    return layer.replace('className=', 'class=').replace(' />', f'></{tag}>')
+
+def page_html(title: str, stylesheets: List[str], body: str, head: str = '', nav: str = '') -> str:
+    links = ''.join(f'\n    <link rel="stylesheet" href="{href}">' for href in stylesheets)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{html.escape(title)}</title>{head}{links}
+  </head>
+  <body>
+{nav}{body}  </body>
+</html>
+"""
+
+def publish_assets(frames: List[Frame], images_dir: str, site_path: str, progress=None) -> Dict[str, str]:
+    """Copy the downloaded renders under content hashed names, returning their site paths by download path"""
+    assets = {}
+    folder = os.path.join(site_path, 'assets')
+    os.makedirs(folder, exist_ok=True)
+
+    for path in sorted({image for frame in frames for node in walk(frame.components) for image in (node.image, node.image2x) if image}):
+        source = os.path.join(images_dir, path)
+        if not os.path.isfile(source):
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        name = hashed_name(os.path.basename(path), data)
+        # The same render downloaded for several nodes is published once
+        if not os.path.exists(os.path.join(folder, name)):
+            write_file(os.path.join(folder, name), data, progress)
+        assets[path] = f'assets/{name}'
+
+    return assets
+
+def static_code(figma_data: List[Frame], output_path: str = None, images_dir: str = None, theme: str = DEFAULT_THEME, progress=None, cancel=None, fonts_dir: str = None) -> bool:
+    """Write the frames as static HTML pages with one stylesheet each and no JavaScript
+
+    The first frame is index.html, the others are named after their frames. The
+    theme's stylesheets and effect layers are kept, its scripts are not.
+    """
+    try:
+        base_path = output_path if output_path else '.'
+        site_path = os.path.join(base_path, SITE_DIR)
+        images_dir = images_dir or os.path.join(base_path, IMAGES_DIR)
+        theme = get_theme(theme)
+
+        if os.path.exists(site_path):
+            shutil.rmtree(site_path)
+        os.makedirs(os.path.join(site_path, 'css'))
+
+        with span('fonts'):
+            fonts = build_fonts(figma_data, theme['fonts'], fonts_dir or FONTS_DIR)
+        if fonts:
+            os.makedirs(os.path.join(site_path, 'fonts'))
+            for face in fonts:
+                shutil.copyfile(face['source'], os.path.join(site_path, 'fonts', face['file']))
+
+        with span('static_assets'):
+            assets = publish_assets(figma_data, images_dir, site_path, progress)
+
+        # Shared by every page: resets, theme and font faces
+        base_css = theme['index_css'] + (theme['stylesheet'] or '') + '\n' + font_face_css(fonts, '../fonts')
+        base_css = base_css.encode('utf-8')
+        base_href = f"css/{hashed_name('base.css', base_css)}"
+        write_file(os.path.join(site_path, base_href), base_css, progress)
+        head = ''.join(f"\n    {link}" for link in preload_links(fonts, 'fonts'))
+
+        used = set()
+        pages = []
+        for index, frame_data in enumerate(figma_data):
+            name = component_name(frame_data.name, used)
+            pages.append((name, 'index.html' if index == 0 else f'{route_path(name)}.html'))
+
+        nav = ''
+        if len(pages) > 1:
+            links = ''.join(f'      <a href="{file}">{html.escape(name)}</a>\n' for name, file in pages)
+            nav = f'    <nav>\n{links}    </nav>\n'
+
+        layers = ''.join(f'    {html_layer(layer)}\n' for layer in theme['layers'])
+        overlays = ''.join(f'    {html_layer(layer)}\n' for layer in theme['overlays'])
+
+        for frame_data, (name, file) in zip(figma_data, pages):
+            check(cancel)
+            with span('static_frame', frame=name):
+                page = StaticPage(assets)
+                nodes = ''.join(page.element(node, 3) for node in frame_data.components)
+                body = f'{layers}    <main class="frame">\n{nodes}    </main>\n{overlays}'
+
+                css = frame_css(frame_data, page).encode('utf-8')
+                css_href = f"css/{hashed_name(f'{route_path(name)}.css', css)}"
+                write_file(os.path.join(site_path, css_href), css, progress)
+                write_file(os.path.join(site_path, file), page_html(frame_data.name, [base_href, css_href], body, head, nav).encode('utf-8'), progress)
+
+        print(f"Wrote {len(pages)} static pages, {len(set(assets.values()))} assets"
+              f"{', gzip and brotli' if brotli is not None else ', gzip'} copies of text files")
+        return True
+    except Cancelled:
+        raise
+    except Exception as e:
+        print(f"Error generating static site: {str(e)}")
+        return False
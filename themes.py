@@ -0,0 +1,265 @@
+"""Runtime themes for the generated React app."""
+
+from typing import Dict, Any
+
+# Self-hosted families and weights of the theme text, see fonts.build_fonts
+CYBERPUNK_FONTS = {'Rajdhani': [400, 700], 'Orbitron': [400, 700]}
+
+# Figma sizes include borders and padding, set once here instead of on every node
+BOX_SIZING_CSS = """
+*, *::before, *::after {
+  box-sizing: border-box;
+}
+"""
+
+CYBERPUNK_INDEX_CSS = BOX_SIZING_CSS + """
+:root {
+  --neon-blue: #00f3ff;
+  --neon-purple: #9d00ff;
+  --neon-pink: #ff00f7;
+  --dark-bg: #0a0a0f;
+  --grid-color: rgba(0, 243, 255, 0.1);
+  --app-bg: var(--dark-bg);
+  --app-fg: var(--neon-blue);
+}
+
+body {
+  margin: 0;
+  font-family: 'Rajdhani', 'Orbitron', sans-serif;
+  -webkit-font-smoothing: antialiased;
+  -moz-osx-font-smoothing: grayscale;
+  background-color: var(--dark-bg);
+}"""
+
+CYBERPUNK_CSS = """
+.cyber-grid {
+  position: fixed;
+  top: 0;
+  left: 0;
+  width: 100vw;
+  height: 100vh;
+  background-image:
+    linear-gradient(var(--grid-color) 1px, transparent 1px),
+    linear-gradient(90deg, var(--grid-color) 1px, transparent 1px);
+  background-size: 30px 30px;
+  z-index: -1;
+  animation: gridMove 20s linear infinite;
+}
+
+@keyframes gridMove {
+  from { transform: translateY(0); }
+  to { transform: translateY(30px); }
+}
+
+.glow {
+  text-shadow: 0 0 10px var(--neon-blue),
+               0 0 20px var(--neon-blue),
+               0 0 30px var(--neon-blue);
+  animation: pulse 2s infinite;
+}
+
+@keyframes pulse {
+  0% { opacity: 1; }
+  50% { opacity: 0.7; }
+  100% { opacity: 1; }
+}
+
+.scan-line {
+  position: absolute;
+  width: 100%;
+  height: 2px;
+  background: var(--neon-blue);
+  opacity: 0.5;
+  animation: scan 2s linear infinite;
+}
+
+@keyframes scan {
+  from { transform: translateY(-100vh); }
+  to { transform: translateY(100vh); }
+}
+
+.particles {
+  position: fixed;
+  top: 0;
+  left: 0;
+  width: 100%;
+  height: 100%;
+  pointer-events: none;
+  z-index: -1;
+}
+
+.particle {
+  position: absolute;
+  background: var(--neon-blue);
+  width: 2px;
+  height: 2px;
+  border-radius: 50%;
+  animation: float 3s infinite;
+}
+
+@keyframes float {
+  0% { transform: translateY(0) translateX(0); }
+  50% { transform: translateY(-20px) translateX(10px); }
+  100% { transform: translateY(0) translateX(0); }
+}
+
+.cursor {
+  width: 20px;
+  height: 20px;
+  border: 2px solid var(--neon-blue);
+  border-radius: 50%;
+  position: fixed;
+  top: 0;
+  left: 0;
+  pointer-events: none;
+  z-index: 9999;
+  mix-blend-mode: screen;
+  will-change: transform;
+  animation: cursorPulse 2s infinite;
+}
+
+@keyframes cursorPulse {
+  0% { scale: 1; }
+  50% { scale: 1.5; }
+  100% { scale: 1; }
+}
+
+@media (prefers-reduced-motion: reduce) {
+  .cyber-grid, .glow, .scan-line, .particle, .cursor {
+    animation: none;
+  }
+
+  .scan-line, .particles, .cursor {
+    display: none;
+  }
+}"""
+
+# Particles and the cursor are created outside of React so they never re-render,
+# and the cursor is moved with a transform at most once per animation frame
+CYBERPUNK_EFFECTS = """
+const reducedMotion = window.matchMedia('(prefers-reduced-motion: reduce)').matches
+
+// Create particles
+const createParticles = () => {
+  const particles = document.createElement('div')
+  particles.className = 'particles'
+  for (let i = 0; i < 50; i++) {
+    const particle = document.createElement('div')
+    particle.className = 'particle'
+    particle.style.left = `${Math.random() * 100}%`
+    particle.style.top = `${Math.random() * 100}%`
+    particle.style.animationDelay = `${Math.random() * 3}s`
+    particles.appendChild(particle)
+  }
+  document.body.appendChild(particles)
+}
+
+// Custom cursor
+const createCursor = () => {
+  const cursor = document.createElement('div')
+  cursor.className = 'cursor'
+  document.body.appendChild(cursor)
+
+  let x = 0
+  let y = 0
+  let scheduled = false
+
+  const render = () => {
+    scheduled = false
+    cursor.style.transform = `translate3d(${x - 10}px, ${y - 10}px, 0)`
+  }
+
+  document.addEventListener('mousemove', (e: MouseEvent) => {
+    x = e.clientX
+    y = e.clientY
+    if (!scheduled) {
+      scheduled = true
+      requestAnimationFrame(render)
+    }
+  }, { passive: true })
+}
+
+// Initialize effects
+if (!reducedMotion) {
+  createParticles()
+  createCursor()
+}
+"""
+
+STATIC_CSS = """
+.cyber-grid {
+  position: fixed;
+  top: 0;
+  left: 0;
+  width: 100vw;
+  height: 100vh;
+  background-image:
+    linear-gradient(var(--grid-color) 1px, transparent 1px),
+    linear-gradient(90deg, var(--grid-color) 1px, transparent 1px);
+  background-size: 30px 30px;
+  z-index: -1;
+}
+
+.glow {
+  text-shadow: 0 0 10px var(--neon-blue),
+               0 0 20px var(--neon-blue),
+               0 0 30px var(--neon-blue);
+}"""
+
+LEAN_INDEX_CSS = BOX_SIZING_CSS + """
+:root {
+  --app-bg: #ffffff;
+  --app-fg: inherit;
+}
+
+body {
+  margin: 0;
+  font-family: system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
+  -webkit-font-smoothing: antialiased;
+  -moz-osx-font-smoothing: grayscale;
+}"""
+
+THEMES = {
+    # Animated grid, particles, custom cursor and scan line
+    "cyberpunk": {
+        "fonts": CYBERPUNK_FONTS,
+        "index_css": CYBERPUNK_INDEX_CSS,
+        "stylesheet": CYBERPUNK_CSS,
+        "effects": CYBERPUNK_EFFECTS,
+        "layers": ['<div className="cyber-grid" />'],
+        "overlays": ['<div className="scan-line" />']
+    },
+    # Same look without any animation or script
+    "static": {
+        "fonts": CYBERPUNK_FONTS,
+        "index_css": CYBERPUNK_INDEX_CSS,
+        "stylesheet": STATIC_CSS,
+        "effects": "",
+        "layers": ['<div className="cyber-grid" />'],
+        "overlays": []
+    },
+    # Zero runtime overhead: no web fonts, effect layers or extra stylesheet
+    "lean": {
+        "fonts": {},
+        "index_css": LEAN_INDEX_CSS,
+        "stylesheet": None,
+        "effects": "",
+        "layers": [],
+        "overlays": []
+    }
+}
+
+DEFAULT_THEME = "cyberpunk"
+
+def get_theme(name: str = None) -> Dict[str, Any]:
+    """Look up a runtime theme by name"""
+    if name not in THEMES and name is not None:
+        raise ValueError(f"Unknown theme '{name}', expected one of: {', '.join(THEMES)}")
+    return THEMES[name or DEFAULT_THEME]
+
+def theme_imports(theme: Dict[str, Any]) -> str:
+    """Stylesheet imports of a theme for main.tsx and App.tsx"""
+    imports = "import './styles/index.css'\n"
+    if theme["stylesheet"] is not None:
+        imports += "import './styles/theme.css'\n"
+    return imports
@@ -1,6 +1,13 @@
-import threading
+import os
+import json
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from core import parse_file
-from utils import write_file
+from ir import walk
+from utils import write_file, pixels
+from progress import check, publish
+from tracing import span
+from tk_runtime import ENTRY_CLASS, TEXT_CLASS, RUNTIME, LAUNCHER
 
 def text(i):
     return f'''
@@ -72,13 +79,13 @@ spinbox_{c}.place(x={i['x']}, y={i['y']}, width={i['width']}, height={i['height'
 '''
 
 def rectangle(i):
-    o = f'''outline="{i['stroke_color']}", width="{i['strokeWeight']}"''' if not i['strokes'] == [] and i.get('stroke_color') else 'outline=""'
+    o = f'''outline="{i['stroke_color']}", width="{i['strokeWeight']}"''' if i.get('stroke_color') else 'outline=""'
     return f'''
 canvas.create_rectangle({i['x']}, {i['y']}, {i['x'] + i['width']}, {i['y'] + i['height']}, fill='{i['background']}', {o})
 '''
 
 def oval(i):
-    o = f'''outline="{i['stroke_color']}", width="{i['strokeWeight']}"''' if not i['strokes'] == [] and i.get('stroke_color') else 'outline=""'
+    o = f'''outline="{i['stroke_color']}", width="{i['strokeWeight']}"''' if i.get('stroke_color') else 'outline=""'
     return f'''
 canvas.create_oval({i['x']}, {i['y']}, {i['x'] + i['width']}, {i['y'] + i['height']}, fill="{i['background']}", {o})
 '''
@@ -134,7 +141,97 @@ elements = {
     "listbox": listbox
 }
 
-def tk_code(file, token, out=None):
+TK_ASSETS = 'TkForge/assets'
+
+def tk_items(frame_data):
+    """Convert a frame from parse_file into the items and window settings used by the Tk emitters"""
+    items = []
+
+    # Tk has no flow layout, nested and auto-layout nodes are placed by their frame box
+    for component in walk(frame_data.components):
+        style = component.style
+        kind = component.kind if component.kind in elements else 'rectangle'
+        x, y, width, height = component.box
+        item = {
+            'type': kind,
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'background': style.get('backgroundColor'),
+            'foreground': style.get('color', '#000000'),
+            'text': component.text,
+            'font': style.get('fontFamily', 'Arial').replace('inherit', 'Arial'),
+            'font_size': pixels(style.get('fontSize', 16)),
+            'image': component.image,
+            'stroke_color': component.stroke_color,
+            'strokeWeight': component.stroke_weight
+        }
+
+        if kind in ['textbox', 'textarea']:
+            if component.label:
+                item['placeholder'] = component.label
+        elif kind == 'scale':
+            item.update({'from': 0, 'to': 100, 'orient': 'HORIZONTAL' if item['width'] >= item['height'] else 'VERTICAL'})
+        elif kind in ['button', 'image'] and not item['image']:
+            # Nothing was rendered for it, fall back to a plain box
+            item['type'] = 'rectangle'
+
+        items.append(item)
+
+    return (items, (
+        frame_data.width,
+        frame_data.height,
+        frame_data.background_color,
+        frame_data.name,
+        frame_data.index,
+        any(item['type'] == 'textbox' and 'placeholder' in item for item in items),
+        any(item['type'] == 'textarea' and 'placeholder' in item for item in items)
+    ))
+
+def tk_layout(data):
+    """Encode a frame as the compact item list read by the shared Tk runtime"""
+    counts = {}
+    items = []
+
+    def name(kind):
+        counts[kind] = counts.get(kind, 0) + 1
+        return f'{kind}_{counts[kind]}'
+
+    def outline(i):
+        return (i['stroke_color'], i['strokeWeight']) if i.get('stroke_color') else ('', 0)
+
+    for i in data[0]:
+        kind = i['type']
+        x, y, w, h = i['x'], i['y'], i['width'], i['height']
+
+        if kind == 'text':
+            items.append(['t', x, y, i['text'], i['background'] or 'black', i['font'], i['font_size']])
+        elif kind == 'rectangle':
+            items.append(['r', x, y, x + w, y + h, i['background'] or '', *outline(i)])
+        elif kind in ['circle', 'oval']:
+            items.append(['o', x, y, x + w, y + h, i['background'] or '', *outline(i)])
+        elif kind == 'line':
+            items.append(['l', x, y, x + w, y + h, i['background'] or 'black', i['strokeWeight']])
+        elif kind == 'image':
+            items.append(['i', int(x + w / 2), int(y + h / 2), i['image']])
+        elif kind == 'button':
+            items.append(['b', x, y, w, h, i['image'], name(kind)])
+        elif kind in ['textbox', 'textarea']:
+            items.append(['e' if kind == 'textbox' else 'a', x, y, w, h, i['background'] or 'white', i['foreground'], i.get('placeholder'), name(kind)])
+        elif kind == 'spinbox':
+            items.append(['s', x, y, w, h, name(kind)])
+        elif kind == 'label':
+            items.append(['L', x, y, i['text'], i['background'] or 'black', i['font'], i['font_size'], name(kind)])
+        elif kind == 'scale':
+            items.append(['S', x, y, i['from'], i['to'], i['orient'], name(kind)])
+        elif kind == 'listbox':
+            items.append(['x', x, y, int(w / 6.1), int(h / 15.5), name(kind)])
+
+    return {'window': list(data[1][:4]), 'items': items}
+
+def generate_gui(data):
+    """Generate the script of one frame; widget numbering is local to the frame"""
     counts = {
         "button": 0,
         "image": 0,
@@ -146,17 +243,7 @@ def tk_code(file, token, out=None):
         "listbox": 0
     }
 
-    parsed = parse_file(file, token, True, out)
-    multiple = False
-    
-    if parsed == [] or parsed == '[]':
-        return None
-
-    if len(parsed) > 1:
-        multiple = True
-    
-    def generate_gui(data):
-        template = f'''# Code generated by TkForge <https://github.com/axorax/tkforge>
+    template = f'''# Code generated by TkForge <https://github.com/axorax/tkforge>
 # Donate to support TkForge! <https://www.patreon.com/axorax>
 
 import os
@@ -185,100 +272,97 @@ canvas = tk.Canvas(
 
 canvas.place(x=0, y=0)
 '''
-        
-        if data[1][5]:
-            template += '''
-class TkForge_Entry(tk.Entry):
-    def __init__(self, master=None, placeholder="Enter text", placeholder_fg='grey', **kwargs):
-        super().__init__(master, **kwargs)
-        
-        self.p, self.p_fg, self.fg = placeholder, placeholder_fg, self.cget("fg")
-        self.putp()
-        self.bind("<FocusIn>", self.toggle)
-        self.bind("<FocusOut>", self.toggle)
-
-    def putp(self):
-        self.delete(0, tk.END)
-        self.insert(0, self.p)
-        self.config(fg=self.p_fg)
-        self.p_a = True
-
-    def toggle(self, event):
-        if self.p_a:
-            self.delete(0, tk.END)
-            self.config(fg=self.fg)
-            self.p_a = False
-        elif not self.get(): self.putp()
-
-    def get(self): return '' if self.p_a else super().get()
-
-    def is_placeholder(self, b):
-        self.p_a = b
-        self.config(fg=self.p_fg if b == True else self.fg)
-
-    def get_placeholder(self): return self.p
-'''
-
-        if data[1][6]:
-            template += '''
-class TkForge_Text(tk.Text):
-    def __init__(self, master=None, placeholder="Enter text", placeholder_fg='grey', **kwargs):
-        super().__init__(master, **kwargs)
-        
-        self.p, self.p_fg, self.fg = placeholder, placeholder_fg, self.cget("fg")
-        self.putp()
-        self.bind("<FocusIn>", self.toggle)
-        self.bind("<FocusOut>", self.toggle)
-
-    def putp(self):
-        self.delete('1.0', tk.END)
-        self.insert('1.0', self.p)
-        self.config(fg=self.p_fg)
-        self.p_a = True
-
-    def toggle(self, event):
-        if self.p_a:
-            self.delete('1.0', tk.END)
-            self.config(fg=self.fg)
-            self.p_a = False
-        elif self.get('1.0', tk.END).replace(' ', '').replace('\\n', '') == '': self.putp()
-
-    def get(self, i1='1.0', i2=tk.END): return '' if self.p_a else super().get(i1, i2)
-
-    def is_placeholder(self, b):
-        self.p_a = b
-        self.config(fg=self.p_fg if b == True else self.fg)
-
-    def get_placeholder(self): return self.p
-'''
-
-        for item in data[0]:
-            if item['type'] in ['textbox', 'textarea'] and 'placeholder' in item:
-                counts[item['type']] += 1
-                template += elements[item['type']](item, counts[item['type']], True)  
-            elif item['type'] == 'label':
-                counts[item['type']] += 1
-                template += elements[item['type']](item, counts[item['type']], data[1][2])
-            elif item['type'] in list(counts.keys()):
-                counts[item['type']] += 1
-                template += elements[item['type']](item, counts[item['type']])
-            else:
-                template += elements[item['type']](item)
-
-        template += '\nwindow.resizable(False, False)\nwindow.mainloop()\n'
-
-        if multiple:
-            write_file(template, out, data[1][4])
-        else:
-            write_file(template, out)
     
-    threads = []
-    for data_item in parsed:
-        thread = threading.Thread(target=generate_gui, args=(data_item,))
-        thread.start()
-        threads.append(thread)
+    if data[1][5]:
+        template += ENTRY_CLASS
+
+    if data[1][6]:
+        template += TEXT_CLASS
+
+    parts = [template]
+    for item in data[0]:
+        if item['type'] in ['textbox', 'textarea'] and 'placeholder' in item:
+            counts[item['type']] += 1
+            parts.append(elements[item['type']](item, counts[item['type']], True))
+        elif item['type'] == 'label':
+            counts[item['type']] += 1
+            parts.append(elements[item['type']](item, counts[item['type']], data[1][2]))
+        elif item['type'] in counts:
+            counts[item['type']] += 1
+            parts.append(elements[item['type']](item, counts[item['type']]))
+        else:
+            parts.append(elements[item['type']](item))
+
+    parts.append('\nwindow.resizable(False, False)\nwindow.mainloop()\n')
+    return ''.join(parts)
+
+def render_frame(frame_data, layout=False):
+    """Build the output of one parsed frame; runs inside a pool worker"""
+    with span('tk_frame', frame=frame_data.index):
+        data = tk_items(frame_data)
+        if layout:
+            return data[1][4], json.dumps(tk_layout(data), separators=(',', ':'))
+        return data[1][4], generate_gui(data)
+
+def tk_code(file, token, out=None, layout=False, workers=None, processes=False, progress=None, cancel=None, executor=None, keep=()):
+    # Tk shows PNG renders at their final size, not originals in any format and size
+    parsed = parse_file(file, token, True, out, TK_ASSETS, False, progress, cancel, keep, image_fills=False)
     
-    for thread in threads:
-        thread.join()
+    if parsed == [] or parsed == '[]':
+        return None
+
+    return tk_generate(parsed, out, layout, workers, processes, progress, cancel, executor)
+
+def tk_generate(parsed, out=None, layout=False, workers=None, processes=False, progress=None, cancel=None, executor=None):
+    """Render every frame on a bounded pool and write the results in frame order
+
+    A caller-owned `executor` (e.g. shared by a batch run) is used as is and left running.
+    """
+    multiple = len(parsed) > 1
+    workers = max(1, min(workers or os.cpu_count() or 1, len(parsed)))
+    render = partial(render_frame, layout=layout)
+
+    rendered = []
+
+    if executor is not None:
+        futures = [executor.submit(render, frame_data) for frame_data in parsed]
+        try:
+            for future in futures:
+                check(cancel)
+                rendered.append(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    elif workers == 1:
+        for frame_data in parsed:
+            check(cancel)
+            rendered.append(render(frame_data))
+    else:
+        # Processes sidestep the GIL but need a __main__ guard in the calling script
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        executor = pool(max_workers=workers)
+        try:
+            for future in [executor.submit(render, frame_data) for frame_data in parsed]:
+                check(cancel)
+                rendered.append(future.result())
+        finally:
+            executor.shutdown(wait=not (cancel is not None and cancel.cancelled), cancel_futures=True)
+
+    if layout:
+        write_file(RUNTIME, out, name='tkforge_runtime.py')
+
+    with span('tk_write'):
+        write_frames(rendered, out, layout, multiple, progress)
 
     return True
+
+def write_frames(rendered, out=None, layout=False, multiple=False, progress=None):
+    """Write rendered frames in frame order"""
+    for frame_index, text in rendered:
+        file_name = f'frame_{frame_index}' if multiple else 'main'
+        if layout:
+            write_file(text, out, name=f'layouts/{file_name}.json')
+            write_file(LAUNCHER.format(layout=f'{file_name}.json'), out, name=f'{file_name}.py')
+        else:
+            write_file(text, out, frame_index if multiple else None)
+        publish(progress, 'file_written', path=f'{file_name}.py', bytes=len(text))
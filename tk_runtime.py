@@ -0,0 +1,173 @@
+"""Shared runtime for the layout files written by tk.tk_code(..., layout=True)."""
+
+ENTRY_CLASS = '''
+class TkForge_Entry(tk.Entry):
+    def __init__(self, master=None, placeholder="Enter text", placeholder_fg='grey', **kwargs):
+        super().__init__(master, **kwargs)
+        
+        self.p, self.p_fg, self.fg = placeholder, placeholder_fg, self.cget("fg")
+        self.putp()
+        self.bind("<FocusIn>", self.toggle)
+        self.bind("<FocusOut>", self.toggle)
+
+    def putp(self):
+        self.delete(0, tk.END)
+        self.insert(0, self.p)
+        self.config(fg=self.p_fg)
+        self.p_a = True
+
+    def toggle(self, event):
+        if self.p_a:
+            self.delete(0, tk.END)
+            self.config(fg=self.fg)
+            self.p_a = False
+        elif not self.get(): self.putp()
+
+    def get(self): return '' if self.p_a else super().get()
+
+    def is_placeholder(self, b):
+        self.p_a = b
+        self.config(fg=self.p_fg if b == True else self.fg)
+
+    def get_placeholder(self): return self.p
+'''
+
+TEXT_CLASS = '''
+class TkForge_Text(tk.Text):
+    def __init__(self, master=None, placeholder="Enter text", placeholder_fg='grey', **kwargs):
+        super().__init__(master, **kwargs)
+        
+        self.p, self.p_fg, self.fg = placeholder, placeholder_fg, self.cget("fg")
+        self.putp()
+        self.bind("<FocusIn>", self.toggle)
+        self.bind("<FocusOut>", self.toggle)
+
+    def putp(self):
+        self.delete('1.0', tk.END)
+        self.insert('1.0', self.p)
+        self.config(fg=self.p_fg)
+        self.p_a = True
+
+    def toggle(self, event):
+        if self.p_a:
+            self.delete('1.0', tk.END)
+            self.config(fg=self.fg)
+            self.p_a = False
+        elif self.get('1.0', tk.END).replace(' ', '').replace('\\n', '') == '': self.putp()
+
+    def get(self, i1='1.0', i2=tk.END): return '' if self.p_a else super().get(i1, i2)
+
+    def is_placeholder(self, b):
+        self.p_a = b
+        self.config(fg=self.p_fg if b == True else self.fg)
+
+    def get_placeholder(self): return self.p
+'''
+
+# Generated frames are plain data: the runtime creates every canvas item in one
+# pass and fills in images from the event loop once the window is up
+RUNTIME = '''# Runtime generated by TkForge <https://github.com/axorax/tkforge>
+# Donate to support TkForge! <https://www.patreon.com/axorax>
+
+import os
+import sys
+import json
+import tkinter as tk
+from collections import deque
+
+IMAGE_BATCH = 8
+
+def base_path():
+    return getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+
+def load_asset(path):
+    return os.path.join(base_path(), "assets", path)
+
+def load_layout(name):
+    with open(os.path.join(base_path(), "layouts", name), encoding="utf-8") as f:
+        return json.load(f)
+''' + ENTRY_CLASS + TEXT_CLASS + '''
+def build(window, layout):
+    width, height, bg, title = layout["window"]
+    window.geometry(f"{width}x{height}")
+    window.configure(bg=bg)
+    window.title(title)
+
+    canvas = tk.Canvas(window, bg=bg, width=width, height=height, bd=0, highlightthickness=0, relief="ridge")
+    canvas.place(x=0, y=0)
+
+    rectangle, oval, line = canvas.create_rectangle, canvas.create_oval, canvas.create_line
+    text, image = canvas.create_text, canvas.create_image
+    widgets = {}
+    pending = deque()
+    photos = []
+
+    for item in layout["items"]:
+        kind = item[0]
+        if kind == "r":
+            rectangle(item[1], item[2], item[3], item[4], fill=item[5], outline=item[6], width=item[7])
+        elif kind == "o":
+            oval(item[1], item[2], item[3], item[4], fill=item[5], outline=item[6], width=item[7])
+        elif kind == "l":
+            line(item[1], item[2], item[3], item[4], fill=item[5], width=item[6])
+        elif kind == "t":
+            text(item[1], item[2], anchor="nw", text=item[3], fill=item[4], font=(item[5], -item[6]))
+        elif kind == "i":
+            pending.append((item[3], canvas.create_image(item[1], item[2]), None))
+        elif kind == "b":
+            button = tk.Button(window, relief="flat", borderwidth=0, highlightthickness=0, command=lambda n=item[6]: print(f"{n} has been pressed!"))
+            button.place(x=item[1], y=item[2], width=item[3], height=item[4])
+            pending.append((item[5], None, button))
+            widgets[item[6]] = button
+        elif kind in "ea":
+            if item[7] is not None:
+                cls = TkForge_Entry if kind == "e" else TkForge_Text
+                widget = cls(window, bd=0, bg=item[5], fg=item[6], placeholder=item[7], insertbackground=item[6], highlightthickness=0)
+            else:
+                cls = tk.Entry if kind == "e" else tk.Text
+                widget = cls(window, bd=0, bg=item[5], fg=item[6], insertbackground=item[6], highlightthickness=0)
+            widget.place(x=item[1], y=item[2], width=item[3], height=item[4])
+            widgets[item[8]] = widget
+        elif kind == "s":
+            widgets[item[5]] = tk.Spinbox(window)
+            widgets[item[5]].place(x=item[1], y=item[2], width=item[3], height=item[4])
+        elif kind == "L":
+            widgets[item[7]] = tk.Label(window, text=item[3], fg=item[4], bg=bg, font=(item[5], -item[6]))
+            widgets[item[7]].place(x=item[1], y=item[2])
+        elif kind == "S":
+            widgets[item[6]] = tk.Scale(window, from_=item[3], to=item[4], orient=getattr(tk, item[5]))
+            widgets[item[6]].place(x=item[1], y=item[2])
+        elif kind == "x":
+            widgets[item[5]] = tk.Listbox(window, width=item[3], height=item[4])
+            widgets[item[5]].place(x=item[1], y=item[2])
+
+    def load_images():
+        for _ in range(min(IMAGE_BATCH, len(pending))):
+            path, item_id, button = pending.popleft()
+            photo = tk.PhotoImage(file=load_asset(path))
+            photos.append(photo)
+            if button is None:
+                canvas.itemconfigure(item_id, image=photo)
+            else:
+                button.configure(image=photo)
+        if pending:
+            window.after_idle(load_images)
+
+    window.after_idle(load_images)
+    window.photos = photos
+    return canvas, widgets
+
+def run(name):
+    window = tk.Tk()
+    canvas, widgets = build(window, load_layout(name))
+    window.resizable(False, False)
+    window.mainloop()
+'''
+
+LAUNCHER = '''# Code generated by TkForge <https://github.com/axorax/tkforge>
+# Donate to support TkForge! <https://www.patreon.com/axorax>
+
+from tkforge_runtime import run
+
+run("{layout}")
+'''
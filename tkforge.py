@@ -1,16 +1,26 @@
 import os
 import sys
-import threading
-from core import parse_file
-from react import react_code
-from utils import extract_figma_id, has_update
+import argparse
+import multiprocessing
+from themes import THEMES, DEFAULT_THEME
+from progress import Cancelled, CancelToken, Progress, ProgressLine
+from prune import PRUNE_RULES
+from report import BUDGETS, parse_budgets, bundle_report, check_budgets, print_report, write_report
+import tracing
+from utils import extract_figma_id, check_update_in_background
 
-def convert_figma_to_react(file_id: str, token: str, output_path: str = None) -> bool:
+# core, react and tk (and requests with them) are imported where they are used, so
+# that --help, argument errors and the first progress output do not wait for them
+
+def convert_figma_to_react(file_id: str, token: str, output_path: str = None, routes: bool = False, virtualize: bool = False, theme: str = DEFAULT_THEME, progress: Progress = None, cancel: CancelToken = None, fonts_dir: str = None, keep=(), workers: int = None) -> bool:
     """Convert a Figma design to a React website"""
     try:
+        from core import parse_file
+        from react import react_code
+
         # Parse Figma file
         print("Fetching Figma design...")
-        figma_data = parse_file(file_id, token, True, output_path)
+        figma_data = parse_file(file_id, token, True, output_path, progress=progress, cancel=cancel, keep=keep)
         if not figma_data:
             print("Failed to fetch Figma design. Please check your file ID and token.")
             return False
@@ -18,30 +28,165 @@ def convert_figma_to_react(file_id: str, token: str, output_path: str = None) ->
         # Generate React code
         print("Generating React website...")
         app_path = os.path.join(output_path if output_path else '.', 'reactapp')
-        return react_code(figma_data, app_path)
+        with tracing.span('react_code'):
+            return react_code(figma_data, app_path, routes, virtualize, theme, progress, cancel, fonts_dir, workers)
+    except Cancelled:
+        print("Conversion cancelled.")
+        return False
     except Exception as e:
         print(f"Error converting Figma to React: {str(e)}")
         return False
 
+def convert_figma_to_static(file_id: str, token: str, output_path: str = None, theme: str = DEFAULT_THEME, progress: Progress = None, cancel: CancelToken = None, fonts_dir: str = None, keep=()) -> bool:
+    """Convert a Figma design to static HTML/CSS pages"""
+    try:
+        from core import parse_file
+        from static import IMAGES_DIR, static_code
+
+        print("Fetching Figma design...")
+        # Pages load images natively, the inline placeholders would be thrown away
+        figma_data = parse_file(file_id, token, True, output_path, IMAGES_DIR, progress=progress, cancel=cancel, keep=keep, placeholders=False)
+        if not figma_data:
+            print("Failed to fetch Figma design. Please check your file ID and token.")
+            return False
+
+        print("Generating static site...")
+        with tracing.span('static_code'):
+            return static_code(figma_data, output_path, theme=theme, progress=progress, cancel=cancel, fonts_dir=fonts_dir)
+    except Cancelled:
+        print("Conversion cancelled.")
+        return False
+    except Exception as e:
+        print(f"Error converting Figma to static HTML: {str(e)}")
+        return False
+
+def convert_figma_to_tk(file_id: str, token: str, output_path: str = None, layout: bool = False, workers: int = None, progress: Progress = None, cancel: CancelToken = None, executor=None, keep=()) -> bool:
+    """Convert a Figma design to a Tkinter GUI"""
+    try:
+        from tk import tk_code
+
+        print("Fetching Figma design and generating Tkinter code...")
+        if tk_code(file_id, token, output_path, layout, workers, True, progress, cancel, executor, keep) is None:
+            print("Failed to fetch Figma design. Please check your file ID and token.")
+            return False
+        return True
+    except Cancelled:
+        print("Conversion cancelled.")
+        return False
+    except Exception as e:
+        print(f"Error converting Figma to Tkinter: {str(e)}")
+        return False
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python tkforge.py <figma_file_url_or_id> <figma_token> [output_path]")
-        sys.exit(1)
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Convert a Figma design to a React website")
+    parser.add_argument("file", help="Figma file URL or ID")
+    parser.add_argument("token", help="Figma access token")
+    parser.add_argument("output_path", nargs="?", default=None, help="Output path, defaults to the current directory")
+    parser.add_argument("--target", choices=["react", "static", "tk", "tk-layout"], default="react", help="Output to generate; 'static' writes HTML/CSS pages without JavaScript, 'tk-layout' writes layout files plus one shared Tk runtime")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for Tk generation and threads emitting React frames, defaults to the CPU count")
+    parser.add_argument("--routes", action="store_true", help="Emit one lazily loaded route per frame instead of a single page")
+    parser.add_argument("--virtualize", action="store_true", help="Only mount the nodes intersecting the viewport, for frames with thousands of layers")
+    parser.add_argument("--theme", choices=list(THEMES), default=DEFAULT_THEME, help="Runtime theme of the generated app, 'lean' adds no effects at all")
+    parser.add_argument("--keep", action="append", choices=PRUNE_RULES, default=[], metavar="RULE", help=f"Keep the layers a pruning rule would skip, may be repeated: {', '.join(PRUNE_RULES)}")
+    parser.add_argument("--fonts-dir", default=None, help="Folder of .ttf/.otf/.woff2 files to self-host and subset, defaults to TKFORGE_FONTS_DIR or ./fonts")
+    parser.add_argument("--report", metavar="REPORT_JSON", default=None, help="Write the size report of the generated React app as JSON")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=SIZE", help=f"Fail when a frame exceeds a size budget, e.g. assets=2MB; may be repeated: {', '.join(BUDGETS)}")
+    parser.add_argument("--profile", metavar="TRACE_JSON", default=None, help="Record timings, bytes and memory of every stage, write a Chrome trace to TRACE_JSON and print a summary")
+    session = parser.add_mutually_exclusive_group()
+    session.add_argument("--record", metavar="ARCHIVE", default=None, help="Save every Figma API response and image to the ARCHIVE folder")
+    session.add_argument("--replay", metavar="ARCHIVE", default=None, help="Answer all requests from a recorded ARCHIVE, without network access")
+    args = parser.parse_args()
+
+    # The size report measures the React bundle, other targets would pass any budget unchecked
+    if args.target != "react" and (args.budget or args.report):
+        parser.error(f"--budget and --report only apply to --target react, not {args.target}")
+    try:
+        budgets = parse_budgets(args.budget)
+    except ValueError as e:
+        parser.error(str(e))
     
-    file_id = extract_figma_id(sys.argv[1])
-    token = sys.argv[2]
-    output_path = sys.argv[3] if len(sys.argv) > 3 else None
+    file_id = extract_figma_id(args.file)
+    token = args.token
+    output_path = args.output_path
     
     print("\nFigma to React Converter")
     print("=======================")
     
-    if convert_figma_to_react(file_id, token, output_path):
+    progress = Progress()
+    cancel = CancelToken()
+    progress_line = ProgressLine(progress).start()
+
+    if args.profile:
+        tracing.enable()
+
+    update = check_update_in_background()
+
+    if args.record or args.replay:
+        import core
+        from replay import Recorder, Replayer
+        core.transport = Recorder(args.record) if args.record else Replayer(args.replay)
+
+    try:
+        if args.target == "static":
+            ok = convert_figma_to_static(file_id, token, output_path, args.theme, progress, cancel, args.fonts_dir, args.keep)
+        elif args.target != "react":
+            ok = convert_figma_to_tk(file_id, token, output_path, args.target == "tk-layout", args.workers, progress, cancel, keep=args.keep)
+        else:
+            ok = convert_figma_to_react(file_id, token, output_path, args.routes, args.virtualize, args.theme, progress, cancel, args.fonts_dir, args.keep, args.workers)
+    except KeyboardInterrupt:
+        # Stop the parser threads too, they would otherwise keep downloading
+        cancel.cancel()
+        ok = False
+    finally:
+        progress_line.stop()
+        if args.record or args.replay:
+            core.transport.close()
+
+    if args.profile:
+        tracing.disable()
+        tracing.export(args.profile)
+        print(f"\n{tracing.summary()}")
+        print(f"\n⏱  Trace written to: {os.path.abspath(args.profile)} (open in chrome://tracing or Perfetto)")
+
+    if args.target == "static":
+        if ok:
+            print("\n✨ Successfully converted Figma design to a static site!")
+            print(f"📁 Output saved to: {os.path.abspath(os.path.join(output_path if output_path else '.', 'site'))}")
+        else:
+            print("\n❌ Failed to convert Figma design to a static site.")
+    elif args.target != "react":
+        if ok:
+            print("\n✨ Successfully converted Figma design to Tkinter code!")
+            print(f"📁 Output saved to: {os.path.abspath(os.path.join(output_path if output_path else '.', 'TkForge'))}")
+        else:
+            print("\n❌ Failed to convert Figma design to Tkinter code.")
+    elif ok:
         print("\n✨ Successfully converted Figma design to React website!")
         app_path = os.path.join(output_path if output_path else '.', 'reactapp')
         print(f"📁 Output saved to: {os.path.abspath(app_path)}")
+
+        print("\nBundle size report:")
+        report = bundle_report(app_path)
+        print_report(report)
+        violations = check_budgets(report, budgets)
+        for violation in violations:
+            print(f"❌ Over budget: {violation}")
+        if args.report:
+            write_report(report, args.report, violations)
+            print(f"📄 Report written to: {os.path.abspath(args.report)}")
+        ok = not violations
+
         print("\nTo run the website:")
         print(f"1. cd {app_path}")
         print("2. npm install")
-        print("3. npm start")
+        print("3. npm run dev")
     else:
         print("\n❌ Failed to convert Figma design to React website.")
+
+    # Never wait for the update check, it is reported only if it already finished
+    if update.done() and update.result():
+        print("\n⬆  A new version of TkForge is available: https://github.com/axorax/tkforge/releases")
+
+    # Failed conversions and frames over budget fail CI runs
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,162 @@
+"""Low-overhead tracing spans for profiling a conversion (tkforge.py --profile)."""
+
+import os
+import json
+import time
+import threading
+import tracemalloc
+from typing import Any, Dict, List
+
+_enabled = False
+_memory = False
+_lock = threading.Lock()
+_spans: List[tuple] = []
+# Spans in progress on any thread, whose peak memory tracemalloc.reset_peak would otherwise lose
+_open: List['Span'] = []
+_counters: Dict[str, int] = {}
+_epoch = 0.0
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, n: int):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    """A timed region of the pipeline, recorded when the with-block exits"""
+    __slots__ = ('name', 'args', 'start', 'bytes', 'peak')
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.bytes = 0
+        self.peak = 0
+
+    def __enter__(self):
+        if _memory:
+            with _lock:
+                # Hand the peak so far to the open spans, then measure this one from here
+                peak = tracemalloc.get_traced_memory()[1]
+                for other in _open:
+                    other.peak = max(other.peak, peak)
+                tracemalloc.reset_peak()
+                self.peak = tracemalloc.get_traced_memory()[0]
+                _open.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        memory = (0, 0)
+        with _lock:
+            if _memory and self in _open:
+                current, peak = tracemalloc.get_traced_memory()
+                self.peak = max(self.peak, peak)
+                _open.remove(self)
+                # The enclosing spans reached at least this peak too
+                for other in _open:
+                    other.peak = max(other.peak, self.peak)
+                memory = (current, self.peak)
+            _spans.append((self.name, self.start, end, threading.get_ident(), self.args, self.bytes, memory))
+        return False
+
+    def add_bytes(self, n: int):
+        self.bytes += n
+
+def span(name: str, /, **args: Any):
+    """Time a stage: `with span('parse_frame', frame=1) as s: ...`"""
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, args)
+
+def count(name: str, key: str = None, n: int = 1):
+    """Increment a named counter, e.g. count('nodes', 'TEXT') for the nodes of a type"""
+    if _enabled:
+        if key is not None:
+            name = f'{name}.{key}'
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+def enable(memory: bool = True):
+    """Start recording spans, optionally tracking memory with tracemalloc"""
+    global _enabled, _memory, _epoch
+    _spans.clear()
+    _counters.clear()
+    _open.clear()
+    _epoch = time.perf_counter()
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+def disable():
+    """Stop recording; already recorded spans are kept for export"""
+    global _enabled
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def chrome_trace() -> Dict[str, Any]:
+    """Recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+    pid = os.getpid()
+    events = []
+
+    for name, start, end, tid, args, size, memory in _spans:
+        event_args = dict(args)
+        if size:
+            event_args['bytes'] = size
+        if _memory:
+            event_args['traced_memory'], event_args['peak_memory'] = memory
+        events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': round((start - _epoch) * 1e6, 1),
+            'dur': round((end - start) * 1e6, 1),
+            'pid': pid,
+            'tid': tid,
+            'args': event_args
+        })
+
+    for name, value in sorted(_counters.items()):
+        events.append({'name': name, 'ph': 'C', 'ts': 0, 'pid': pid, 'args': {'count': value}})
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def summary() -> str:
+    """Per-stage table of calls, wall time, bytes and memory, followed by the counters"""
+    stages: Dict[str, List[float]] = {}
+
+    for name, start, end, _, _, size, memory in _spans:
+        stage = stages.setdefault(name, [0, 0.0, 0.0, 0, 0])
+        stage[0] += 1
+        stage[1] += end - start
+        stage[2] = max(stage[2], end - start)
+        stage[3] += size
+        stage[4] = max(stage[4], memory[1])
+
+    lines = [f"{'stage':<20} {'calls':>7} {'total':>10} {'mean':>10} {'max':>10} {'bytes':>12} {'peak mem':>10}"]
+    for name, (calls, total, longest, size, peak) in sorted(stages.items(), key=lambda item: -item[1][1]):
+        lines.append(
+            f"{name:<20} {calls:>7} {total:>9.3f}s {total / calls * 1000:>8.1f}ms {longest:>9.3f}s "
+            f"{size:>12,} {peak / 1e6:>8.1f}MB"
+        )
+
+    if _counters:
+        lines.append('')
+        lines.extend(f"{name:<32} {value:>10,}" for name, value in sorted(_counters.items()))
+
+    return '\n'.join(lines)
+
+def export(path: str):
+    """Write the Chrome trace to a file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(), f)
@@ -1,27 +1,56 @@
 import os
-import requests
+import time
+import threading
+from collections import OrderedDict
 from urllib.parse import urlparse
 
+import codec
+
 VERSION = "2.1.1"
 BASE_URL = "https://raw.githubusercontent.com/Axorax/tkforge/refs/heads/main/"
+UPDATE_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'tkforge', 'update.json')
+UPDATE_TTL = 24 * 60 * 60
 
-def has_update():
+def latest_version(timeout=3, ttl=UPDATE_TTL, cache=UPDATE_CACHE):
+    """Latest published version, read from a disk cache younger than `ttl` seconds when possible"""
+    try:
+        cached = codec.load(cache)
+        if time.time() - cached['checked'] < ttl:
+            return cached['version']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # requests is only needed here, keep it out of startup
+    import requests
+    response = requests.get(f"{BASE_URL}VERSION.txt", timeout=timeout)
+    response.raise_for_status()
+    version = response.text.strip()
+
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        codec.dump({'checked': time.time(), 'version': version}, cache)
+    except OSError:
+        pass
+    return version
+
+def has_update(timeout=3, ttl=UPDATE_TTL):
     try:
-        global VERSION
-        response = requests.get(f"{BASE_URL}VERSION.txt")
-        response.raise_for_status()
-        online_version = response.text.strip()
         version_tuple = tuple(map(int, VERSION.split('.')))
-        online_version_tuple = tuple(map(int, online_version.split('.')))
-        if online_version_tuple > version_tuple:
-            return True
-        else:
-            return False
-    except requests.RequestException as _:
+        online_version_tuple = tuple(map(int, latest_version(timeout, ttl).split('.')))
+        return online_version_tuple > version_tuple
+    except Exception:
         return False
 
-def rgb_to_hex(r, g, b):
-    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+def check_update_in_background():
+    """Run has_update on a daemon thread; the returned Future resolves to its result"""
+    from concurrent.futures import Future
+    future = Future()
+    threading.Thread(target=lambda: future.set_result(has_update()), daemon=True).start()
+    return future
+
+def rgb_to_hex(r, g, b, a=None):
+    alpha = f"{int(a*255):02x}" if a is not None and a < 1 else ""
+    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}{alpha}"
 
 def get_foreground_color(r, g, b):
     def linearize(c):
@@ -31,20 +60,29 @@ def get_foreground_color(r, g, b):
     luminance = 0.2126 * linearize(r) + 0.7152 * linearize(g) + 0.0722 * linearize(b)
     return '#000000' if luminance > 0.179 else '#ffffff'
 
-def write_file(text, out=None, frame=None):
+def pixels(value):
+    try:
+        return int(float(str(value).replace('px', '')))
+    except ValueError:
+        return 0
+
+def write_file(text, out=None, frame=None, name=None):
     if out is None:
         folder_path = 'TkForge'
     else:
         folder_path = os.path.join(out, 'TkForge')
 
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-    
-    if frame is not None:
+    if name is not None:
+        folder_path = os.path.join(folder_path, os.path.dirname(name))
+        file_name = os.path.basename(name)
+    elif frame is not None:
         file_name = f'frame_{frame}.py'
     else:
         file_name = 'main.py'
 
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path, exist_ok=True)
+
     with open(os.path.join(folder_path, file_name), 'w', encoding='utf-8') as file:
         file.write(text)
 
@@ -64,3 +102,39 @@ def extract_figma_id(url):
             if file_index + 1 < len(path_parts):
                 return path_parts[file_index + 1]
     return url
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by the total size of its values"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, size=len):
+        self.max_bytes = max_bytes
+        self.size = size
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = self.size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.bytes -= self._items.popitem(last=False)[1][1]
+
+    def __len__(self):
+        return len(self._items)